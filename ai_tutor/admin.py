@@ -2,8 +2,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Count, Avg
 from .models import (
-    AITutorSession, AITutorMessage, AIGeneratedContent, 
-    PersonalizedRecommendation
+    AITutorSession, AITutorMessage, AITokenUsage, AIGeneratedContent, 
+    GenerationJob, PersonalizedRecommendation
 )
 
 
@@ -35,7 +35,8 @@ class AITutorSessionAdmin(admin.ModelAdmin):
     )
     search_fields = ('user__username', 'title', 'session_id')
     readonly_fields = (
-        'session_id', 'total_messages', 'started_at', 'ended_at', 'last_activity'
+        'session_id', 'total_messages', 'started_at', 'ended_at', 'last_activity',
+        'context_summary', 'summary_tokens', 'summarized_through'
     )
     
     fieldsets = (
@@ -50,6 +51,10 @@ class AITutorSessionAdmin(admin.ModelAdmin):
         ('Metrics', {
             'fields': ('total_messages', 'user_satisfaction')
         }),
+        ('Conversation Summary', {
+            'fields': ('context_summary', 'summary_tokens', 'summarized_through'),
+            'classes': ('collapse',)
+        }),
         ('Timestamps', {
             'fields': ('started_at', 'ended_at', 'last_activity'),
             'classes': ('collapse',)
@@ -211,11 +216,12 @@ class AIGeneratedContentAdmin(admin.ModelAdmin):
     )
     list_filter = (
         'content_type', 'status', 'target_level', 'ai_model',
-        'human_rating', 'created_at'
+        'prompt_template', 'human_rating', 'created_at'
     )
     search_fields = ('title', 'content', 'prompt')
     readonly_fields = (
-        'created_at', 'updated_at', 'usage_count', 'last_used'
+        'created_at', 'updated_at', 'usage_count', 'last_used', 'content_hash',
+        'prompt_template', 'prompt_version'
     )
     
     fieldsets = (
@@ -223,7 +229,10 @@ class AIGeneratedContentAdmin(admin.ModelAdmin):
             'fields': ('content_type', 'title', 'content')
         }),
         ('Generation Details', {
-            'fields': ('prompt', 'ai_model', 'generation_parameters')
+            'fields': (
+                'prompt', 'prompt_template', 'prompt_version', 'ai_model',
+                'generation_parameters', 'content_hash'
+            )
         }),
         ('Metadata', {
             'fields': ('target_level', 'topic_tags')
@@ -295,11 +304,12 @@ class AIGeneratedContentAdmin(admin.ModelAdmin):
             percentage = obj.quality_score * 100
             color = 'green' if percentage >= 80 else 'orange' if percentage >= 60 else 'red'
             return format_html(
-                '<span style="color: {};">{:.1f}%</span>',
-                color, percentage
+                '<span style="color: {};">{}%</span>',
+                color, f'{percentage:.1f}'
             )
         return "-"
     quality_score_display.short_description = 'Quality'
+    quality_score_display.admin_order_field = 'quality_score'
     
     def human_rating_display(self, obj):
         if obj.human_rating:
@@ -379,7 +389,8 @@ class PersonalizedRecommendationAdmin(admin.ModelAdmin):
             'viewed': 'blue',
             'accepted': 'green',
             'dismissed': 'red',
-            'completed': 'darkgreen'
+            'completed': 'darkgreen',
+            'expired': 'darkgray'
         }
         color = colors.get(obj.status, 'gray')
         return format_html(
@@ -401,10 +412,46 @@ class PersonalizedRecommendationAdmin(admin.ModelAdmin):
         percentage = obj.confidence_score * 100
         color = 'green' if percentage >= 80 else 'orange' if percentage >= 60 else 'red'
         return format_html(
-            '<span style="color: {};">{:.1f}%</span>',
-            color, percentage
+            '<span style="color: {};">{}%</span>',
+            color, f'{percentage:.1f}'
         )
     confidence_score_display.short_description = 'Confidence'
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user')
+
+
+@admin.register(AITokenUsage)
+class AITokenUsageAdmin(admin.ModelAdmin):
+    """Admin for daily AI Token Usage (maintained with the tutor messages)"""
+    
+    list_display = ('user', 'day', 'tokens', 'requests', 'updated_at')
+    list_filter = ('day',)
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'day', 'tokens', 'requests', 'updated_at')
+    date_hierarchy = 'day'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    """Admin for Generation Jobs (processed by run_generation_jobs)"""
+    
+    list_display = ('topic', 'kind', 'difficulty', 'user', 'status', 'attempts', 'total_tokens', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind', 'difficulty', 'created_at')
+    search_fields = ('topic', 'user__username', 'last_error')
+    readonly_fields = (
+        'user', 'kind', 'topic', 'difficulty', 'status', 'attempts', 'available_at', 'last_error',
+        'content', 'total_tokens', 'created_at', 'started_at', 'finished_at'
+    )
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'content')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AiTutorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_tutor'
+
+    def ready(self):
+        from . import consumers  # noqa: F401  (registers domain event consumers)
+        from . import prompts  # noqa: F401  (compiles the prompt templates)
+        from . import signals  # noqa: F401
@@ -0,0 +1,27 @@
+"""Recommendation consumers for learning-activity domain events"""
+from django.utils import timezone
+
+from events.bus import subscribe, QUIZ_COMPLETED, COURSE_COMPLETED
+from .models import PersonalizedRecommendation
+
+
+def _complete_recommendations(user_id, target_object_type, target_object_id):
+    # update() skips auto_now, and sweep_recommendations ages answered rows by updated_at
+    now = timezone.now()
+    PersonalizedRecommendation.objects.filter(
+        user_id=user_id,
+        target_object_type=target_object_type,
+        target_object_id=target_object_id
+    ).exclude(
+        status__in=['completed', 'dismissed']
+    ).update(status='completed', responded_at=now, updated_at=now)
+
+
+@subscribe(COURSE_COMPLETED)
+def complete_course_recommendations(event):
+    _complete_recommendations(event.payload['user_id'], 'course', event.payload['course_id'])
+
+
+@subscribe(QUIZ_COMPLETED)
+def complete_quiz_recommendations(event):
+    _complete_recommendations(event.payload['user_id'], 'quiz', event.payload['quiz_id'])
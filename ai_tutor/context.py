@@ -0,0 +1,99 @@
+"""
+Token-budgeted conversation context for tutor prompts.
+
+Each message stores its ``token_count`` when it is written, so building a
+prompt never re-tokenizes the history. ``build_context`` reads only the
+messages newer than the session's rolling summary, newest first by id on the
+``(session, id)`` index, and at most ``MAX_TAIL_MESSAGES`` of them. It keeps
+as many as fit in ``AI_CONTEXT_TOKENS``. Everything older, including
+messages beyond the tail cap, is folded into the summary, which is capped at
+``AI_SUMMARY_TOKENS`` and stored on the session, so they are never read
+again. Prompt cost stays flat however long a session runs.
+"""
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .models import estimate_tokens
+
+MESSAGE_OVERHEAD = 4  # tokens of chat formatting around every message
+MAX_TAIL_MESSAGES = 50
+MIN_LINE_TOKENS = 3  # of the shortest summary line, which bounds the lines a summary can hold
+SUMMARY_SNIPPET = 160  # characters kept from each side of a summarized turn
+
+_sentence_end = re.compile(r'(?<=[.!?])\s')
+
+
+@dataclass
+class Context:
+    """Recent chat messages plus the summary of everything before them"""
+    history: list
+    summary: str = ''
+    
+    @property
+    def notes(self):
+        if not self.summary:
+            return ()
+        return (f'Summary of the earlier conversation:\n{self.summary}',)
+    
+    def __bool__(self):
+        return bool(self.history or self.summary)
+
+
+def snippet(text):
+    """The first sentence of a message, shortened for the summary"""
+    first = _sentence_end.split(' '.join(text.split()), 1)[0]
+    if len(first) > SUMMARY_SNIPPET:
+        first = first[:SUMMARY_SNIPPET - 3].rstrip() + '...'
+    return first
+
+
+def summarize(summary, messages, limit):
+    """Append older messages to a summary, dropping its oldest lines past ``limit`` tokens"""
+    lines = summary.splitlines() if summary else []
+    for message in messages:
+        speaker = 'Tutor' if message['sender'] == 'ai' else 'Learner'
+        lines.append(f"- {speaker}: {snippet(message['content'])}")
+    while lines and estimate_tokens('\n'.join(lines)) > limit:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+def build_context(session, budget=None, summary_limit=None):
+    """The history to send with the session's next question, within ``budget`` tokens"""
+    budget = settings.AI_CONTEXT_TOKENS if budget is None else budget
+    summary_limit = settings.AI_SUMMARY_TOKENS if summary_limit is None else summary_limit
+    
+    tail = session.messages.exclude(sender='system')
+    if session.summarized_through:
+        tail = tail.filter(id__gt=session.summarized_through)
+    fields = ('id', 'sender', 'content', 'token_count')
+    rows = list(tail.order_by('-id').values(*fields)[:MAX_TAIL_MESSAGES])
+    
+    available = budget - summary_limit
+    kept = 0
+    for row in rows:
+        cost = (row['token_count'] or estimate_tokens(row['content'])) + MESSAGE_OVERHEAD
+        if cost > available:
+            break
+        available -= cost
+        kept += 1
+    
+    overflow = rows[kept:]
+    if len(rows) == MAX_TAIL_MESSAGES:
+        # Unsummarized messages past the tail cap overflow too. Only the
+        # newest of them can survive in the capped summary, so read only those.
+        older = tail.filter(id__lt=rows[-1]['id']).order_by('-id').values(*fields)
+        overflow += older[:summary_limit // MIN_LINE_TOKENS + 1]
+    if overflow:
+        session.context_summary = summarize(session.context_summary, reversed(overflow), summary_limit)
+        session.summary_tokens = estimate_tokens(session.context_summary)
+        session.summarized_through = overflow[0]['id']
+        session.save(update_fields=['context_summary', 'summary_tokens', 'summarized_through'])
+    
+    history = [
+        {'role': 'assistant' if row['sender'] == 'ai' else 'user', 'content': row['content']}
+        for row in reversed(rows[:kept])
+    ]
+    return Context(history=history, summary=session.context_summary)
@@ -0,0 +1,312 @@
+"""
+Resilient gateway in front of the AI provider.
+
+Views and the generation worker call the provider through
+``get_gateway(endpoint)`` rather than directly, so a slow or failing
+``AI_API_URL`` costs a request thread a bounded amount of time. Calls still
+share the provider's pooled keep-alive clients. Each endpoint (``'tutor'``,
+``'generate'``) takes its settings from ``AI_ENDPOINTS``:
+
+* ``timeout``: seconds allowed per provider request.
+* ``retries``: how often connection errors, timeouts, 429s and 5xx are
+  retried, after a full-jitter exponential backoff. A stream is only
+  retried before its first token.
+* ``hedge_after``: if an async completion has not finished after this many
+  seconds, an identical second request is raced against it and the first
+  answer wins. ``0`` disables hedging.
+
+A circuit breaker per endpoint opens after ``AI_CIRCUIT_FAILURES``
+consecutive failed calls. While it is open, calls fail at once with
+``CircuitOpen``, and the tutor answers from the response cache or the
+offline intents (``fallback_completion``). After ``AI_CIRCUIT_COOLDOWN``
+seconds one trial call is let through, and its success closes the circuit.
+
+Every call's latency is added to a histogram per endpoint and outcome, both
+in the worker (``Gateway.stats()``) and in shared daily counters in the
+Django cache, which ``provider_latency_stats`` reports.
+"""
+import asyncio
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .providers import OfflineProvider, ProviderError, get_provider
+
+RETRY_BASE_DELAY = 0.25  # seconds, doubled on every retry
+RETRY_MAX_DELAY = 4.0
+BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))  # upper bounds in seconds
+OUTCOMES = ('ok', 'error')
+STATS_KEY = 'ai_latency:{day}:{name}'
+STATS_TTL = 60 * 60 * 24 * 35
+
+
+class CircuitOpen(ProviderError):
+    """Calls to the provider are failing; this one was not attempted"""
+
+
+def backoff(retry):
+    """Full-jitter delay before retry number ``retry`` (from 0)"""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** retry))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call"""
+
+    def __init__(self, failures, cooldown):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if self.trial_at is not None else 'open'
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.cooldown:
+                return False
+            # A trial that never reported back (e.g. cancelled) is replaced after a cooldown
+            if self.trial_at is not None and now - self.trial_at < self.cooldown:
+                return False
+            self.trial_at = now
+            return True
+
+    def record(self, success):
+        with self._lock:
+            self.trial_at = None
+            if success:
+                self.consecutive = 0
+                self.opened_at = None
+                return
+            self.consecutive += 1
+            if self.opened_at is not None or self.consecutive >= self.failures:
+                self.opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    """Call counts per latency bucket (see ``BUCKETS``)"""
+
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts else [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        index = bisect_left(BUCKETS, seconds)
+        self.counts[index] += 1
+        return index
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket that holds the given fraction of calls"""
+        target = fraction * self.total
+        running = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            running += count
+            if count and running >= target:
+                return bound
+        return 0.0
+
+
+class Gateway:
+    """Provider calls for one endpoint, with timeouts, retries, a circuit breaker and metrics"""
+
+    def __init__(self, provider, endpoint, timeout, retries=0, hedge_after=0.0, breaker=None):
+        self.provider = provider
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker(settings.AI_CIRCUIT_FAILURES, settings.AI_CIRCUIT_COOLDOWN)
+        self.latency = {outcome: LatencyHistogram() for outcome in OUTCOMES}
+        self.rejected = self.retried = self.hedged = 0
+
+    @property
+    def name(self):
+        return self.provider.name
+
+    @property
+    def model(self):
+        return self.provider.model
+
+    def stats(self):
+        return {
+            'endpoint': self.endpoint,
+            'circuit': self.breaker.state,
+            'calls': {outcome: histogram.total for outcome, histogram in self.latency.items()},
+            'p50': self.latency['ok'].percentile(0.5),
+            'p95': self.latency['ok'].percentile(0.95),
+            'rejected': self.rejected,
+            'retried': self.retried,
+            'hedged': self.hedged,
+        }
+
+    def _start(self):
+        if not self.breaker.allow():
+            self.rejected += 1
+            _count(f'{self.endpoint}:rejected')
+            raise CircuitOpen(f'the AI provider is failing, {self.endpoint} calls are paused')
+        return time.perf_counter()
+
+    def _finish(self, started, error=None):
+        # A request the provider rejected as invalid says nothing about its health
+        self.breaker.record(error is None or not error.retryable)
+        outcome = 'ok' if error is None else 'error'
+        bucket = self.latency[outcome].observe(time.perf_counter() - started)
+        _count(f'{self.endpoint}:{outcome}:{bucket}')
+
+    def _retry(self, error, retry, streamed=False):
+        if error.retryable and not streamed and retry < self.retries:
+            self.retried += 1
+            return True
+        return False
+
+    def complete(self, messages, **params):
+        started = self._start()
+        for retry in range(self.retries + 1):
+            try:
+                completion = self.provider.complete(messages, timeout=self.timeout, **params)
+            except ProviderError as exc:
+                if self._retry(exc, retry):
+                    time.sleep(backoff(retry))
+                    continue
+                self._finish(started, exc)
+                raise
+            self._finish(started)
+            return completion
+
+    def stream(self, messages, **params):
+        started = self._start()
+        for retry in range(self.retries + 1):
+            streamed = False
+            try:
+                for item in self.provider.stream(messages, timeout=self.timeout, **params):
+                    streamed = True
+                    yield item
+            except ProviderError as exc:
+                if self._retry(exc, retry, streamed):
+                    time.sleep(backoff(retry))
+                    continue
+                self._finish(started, exc)
+                raise
+            self._finish(started)
+            return
+
+    async def acomplete(self, messages, **params):
+        started = self._start()
+        for retry in range(self.retries + 1):
+            try:
+                completion = await self._hedged(messages, params)
+            except ProviderError as exc:
+                if self._retry(exc, retry):
+                    await asyncio.sleep(backoff(retry))
+                    continue
+                self._finish(started, exc)
+                raise
+            self._finish(started)
+            return completion
+
+    async def astream(self, messages, **params):
+        started = self._start()
+        for retry in range(self.retries + 1):
+            streamed = False
+            try:
+                async for item in self.provider.astream(messages, timeout=self.timeout, **params):
+                    streamed = True
+                    yield item
+            except ProviderError as exc:
+                if self._retry(exc, retry, streamed):
+                    await asyncio.sleep(backoff(retry))
+                    continue
+                self._finish(started, exc)
+                raise
+            self._finish(started)
+            return
+
+    async def _hedged(self, messages, params):
+        """One completion, raced against a second request if it is slower than ``hedge_after``"""
+        if not self.hedge_after:
+            return await self.provider.acomplete(messages, timeout=self.timeout, **params)
+
+        tasks = [asyncio.ensure_future(self.provider.acomplete(messages, timeout=self.timeout, **params))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                self.hedged += 1
+                tasks.append(asyncio.ensure_future(self.provider.acomplete(messages, timeout=self.timeout, **params)))
+            error = None
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    return await finished
+                except ProviderError as exc:
+                    error = exc
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def fallback_completion(messages):
+    """An offline answer from the intent library, for when the provider is unavailable"""
+    completion = OfflineProvider().complete(messages)
+    completion.fallback = True
+    return completion
+
+
+async def afallback_completion(messages):
+    # The intent matcher may need to (re)load course content from the database
+    return await sync_to_async(fallback_completion)(messages)
+
+
+def _count(name):
+    key = STATS_KEY.format(day=timezone.localdate().isoformat(), name=name)
+    if not cache.add(key, 1, STATS_TTL):
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def shared_stats(day, endpoint):
+    """Latency histograms by outcome, and rejected calls, recorded by every worker on ``day``"""
+    names = [f'{endpoint}:{outcome}:{index}' for outcome in OUTCOMES for index in range(len(BUCKETS))]
+    names.append(f'{endpoint}:rejected')
+    keys = {STATS_KEY.format(day=day.isoformat(), name=name): name for name in names}
+    values = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+    histograms = {
+        outcome: LatencyHistogram([values.get(f'{endpoint}:{outcome}:{index}', 0) for index in range(len(BUCKETS))])
+        for outcome in OUTCOMES
+    }
+    return histograms, values.get(f'{endpoint}:rejected', 0)
+
+
+_gateways = {}
+_lock = threading.Lock()
+
+
+def get_gateway(endpoint):
+    """The gateway for ``endpoint`` (a key of ``AI_ENDPOINTS``) in this worker process"""
+    provider = get_provider()
+    gateway = _gateways.get(endpoint)
+    if gateway is None or gateway.provider is not provider:
+        with _lock:
+            gateway = _gateways.get(endpoint)
+            if gateway is None or gateway.provider is not provider:
+                gateway = _gateways[endpoint] = Gateway(provider, endpoint, **settings.AI_ENDPOINTS[endpoint])
+    return gateway
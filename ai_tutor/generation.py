@@ -0,0 +1,279 @@
+"""
+Background generation of AI content.
+
+Views only ``submit()`` a ``GenerationJob`` and return its id straight away;
+the ``run_generation_jobs`` worker makes the slow provider calls. Each cycle
+it claims due jobs with ``skip_locked``, so several workers can run side by
+side. It groups compatible jobs (same kind and level) into batches of up to
+``AI_GENERATION_BATCH_SIZE`` topics and asks for a whole batch in one
+provider call. Batches run on a pool of ``AI_GENERATION_CONCURRENCY``
+threads, which bounds the provider calls one worker has in flight.
+
+Provider calls go through the ``'generate'`` gateway, which retries
+transient errors and fails fast while the provider is down. Results are
+stored as draft ``AIGeneratedContent`` and linked from the job, which
+clients poll or follow over SSE. Failed jobs are retried with exponential
+backoff, like outbox events.
+
+Prompts come from the ``generation.<kind>`` templates in ``ai_tutor.prompts``.
+Generated content is addressed by ``content_hash``, a hash of the template
+key (id, version and values), model, parameters and level, so each distinct
+request has one row. A request
+matching approved or published content is answered with it (and its
+``usage_count`` bumped) without calling the provider, both on submit and
+when the worker claims the job. Regenerating an unapproved match replaces
+that row's content.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AIGeneratedContent, AITokenUsage, GenerationJob, generation_hash
+from .gateway import get_gateway
+from .prompts import get_template
+from .providers import ProviderError, get_provider
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30  # seconds, doubled on every failed attempt
+STALE_AFTER = timedelta(minutes=10)  # running jobs of a worker that died are claimed again
+
+REUSABLE_STATUSES = ('approved', 'published')
+
+
+def submit(user, kind, topic, difficulty='beginner'):
+    """
+    Queue a generation job for the worker, or complete it at once with
+    matching approved content.
+    """
+    job = GenerationJob(user=user, kind=kind, topic=topic[:200], difficulty=difficulty)
+    existing = AIGeneratedContent.objects.filter(
+        content_hash=request_hash(job, get_provider().model), status__in=REUSABLE_STATUSES
+    ).first()
+    if existing is not None:
+        existing.increment_usage()
+        job.content = existing
+        job.status = 'completed'
+        job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def prompt_template(kind):
+    return get_template(f'generation.{kind}')
+
+
+def build_prompt(kind, difficulty, topics):
+    """Chat messages asking for one piece of content per topic"""
+    template = prompt_template(kind)
+    if len(topics) == 1:
+        return template.messages(topic=topics[0], difficulty=difficulty)
+    return get_template('generation.batch').messages(
+        requests=[template.render(topic=topic, difficulty=difficulty) for topic in topics]
+    )
+
+
+def request_hash(job, model):
+    """The ``content_hash`` of the content a job asks for"""
+    key = prompt_template(job.kind).key(topic=job.topic, difficulty=job.difficulty)
+    return generation_hash(key, model, {'kind': job.kind}, job.difficulty)
+
+
+def parse_batch(text, count):
+    """``(title, content)`` pairs from a batch reply, or None if it is unusable"""
+    try:
+        items = json.loads(text)['items']
+        pairs = [(str(item['title']), str(item['content'])) for item in items]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return pairs if len(pairs) == count else None
+
+
+def placeholder(kind, topic, difficulty):
+    """Offline stand-in content for development without an API key"""
+    templates = {
+        'explanation': f"Here's a {difficulty}-level explanation of {topic}: This is an AI-generated explanation that would provide comprehensive coverage of the topic with examples and clear explanations.",
+        'quiz': f"Generated quiz for {topic} ({difficulty} level): 1. What is the main concept of {topic}? 2. How does {topic} work in practice?",
+        'summary': f"Summary of {topic}: Key points and essential concepts explained at {difficulty} level.",
+        'examples': f"Code examples for {topic}: Practical implementations and use cases at {difficulty} level.",
+        'analogy': f"Simple analogy for {topic}: Think of {topic} like... (analogy would be generated here)",
+    }
+    return templates.get(kind, f"Generated content for {topic} at {difficulty} level.")
+
+
+def default_title(job):
+    return f"{job.get_kind_display()}: {job.topic}"[:200]
+
+
+def batch_key(job):
+    return job.kind, job.difficulty
+
+
+def generate_batch(provider, jobs):
+    """
+    Generate content for compatible jobs, in one provider call when possible.
+    Returns ``(job, title, content, tokens, model)`` tuples or raises
+    ``ProviderError``. Runs on the worker's thread pool, so it must not touch
+    the database.
+    """
+    kind, difficulty = batch_key(jobs[0])
+
+    if provider.name == 'offline':
+        return [(job, default_title(job), placeholder(kind, job.topic, difficulty), 0, provider.model) for job in jobs]
+
+    if len(jobs) > 1:
+        completion = provider.complete(
+            build_prompt(kind, difficulty, [job.topic for job in jobs]),
+            response_format={'type': 'json_object'}
+        )
+        pairs = parse_batch(completion.text, len(jobs))
+        if pairs is not None:
+            share, extra = divmod(completion.total_tokens, len(jobs))
+            return [
+                (job, title[:200] or default_title(job), content, share + (extra if index == 0 else 0), completion.model)
+                for index, (job, (title, content)) in enumerate(zip(jobs, pairs))
+            ]
+        logger.warning('Unusable batch reply for %d %s jobs; generating one by one', len(jobs), kind)
+
+    results = []
+    for job in jobs:
+        completion = provider.complete(build_prompt(kind, difficulty, [job.topic]))
+        results.append((job, default_title(job), completion.text, completion.total_tokens, completion.model))
+    return results
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` due jobs as running and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            GenerationJob.objects.select_for_update(skip_locked=True).filter(
+                Q(status='queued', available_at__lte=now) | Q(status='running', started_at__lt=now - STALE_AFTER)
+            ).select_related('user').order_by('id')[:limit]
+        )
+        for job in jobs:
+            job.status = 'running'
+            job.started_at = now
+            job.attempts += 1
+        GenerationJob.objects.bulk_update(jobs, ['status', 'started_at', 'attempts'])
+    return jobs
+
+
+def run_pending(limit=20):
+    """Process one round of due jobs; returns the number claimed"""
+    claimed = claim_jobs(limit)
+    if not claimed:
+        return 0
+
+    # Content approved since the job was queued answers it without a call
+    provider = get_gateway('generate')
+    hashes = {job.id: request_hash(job, provider.model) for job in claimed}
+    reusable = AIGeneratedContent.objects.filter(
+        content_hash__in=hashes.values(), status__in=REUSABLE_STATUSES
+    ).in_bulk(field_name='content_hash')
+    reuse_content([(job, reusable[hashes[job.id]]) for job in claimed if hashes[job.id] in reusable])
+    jobs = [job for job in claimed if hashes[job.id] not in reusable]
+
+    batches = []
+    for _, group in groupby(sorted(jobs, key=batch_key), key=batch_key):
+        group = list(group)
+        size = settings.AI_GENERATION_BATCH_SIZE
+        batches.extend(group[start:start + size] for start in range(0, len(group), size))
+
+    with ThreadPoolExecutor(max_workers=settings.AI_GENERATION_CONCURRENCY) as pool:
+        futures = [(batch, pool.submit(generate_batch, provider, batch)) for batch in batches]
+        for batch, future in futures:
+            try:
+                results = future.result()
+            except ProviderError as exc:
+                fail_jobs(batch, str(exc))
+            else:
+                complete_jobs(results, provider.model)
+    return len(claimed)
+
+
+def reuse_content(matches):
+    """Complete jobs with existing approved content"""
+    now = timezone.now()
+    for job, content in matches:
+        content.increment_usage()
+        job.content = content
+        job.status = 'completed'
+        job.last_error = ''
+        job.finished_at = now
+    GenerationJob.objects.bulk_update(
+        [job for job, _ in matches], ['content', 'status', 'last_error', 'finished_at']
+    )
+
+
+def store_content(job, title, text, model, content_hash):
+    """Create the job's content, or regenerate the unapproved row with the same hash"""
+    template = prompt_template(job.kind)
+    fields = {
+        'content_type': GenerationJob.CONTENT_TYPES[job.kind],
+        'title': title,
+        'content': text,
+        'prompt': template.render(topic=job.topic, difficulty=job.difficulty),
+        'prompt_template': template.id,
+        'prompt_version': template.version,
+        'ai_model': model,
+        'generation_parameters': {'kind': job.kind},
+        'target_level': job.difficulty,
+        'topic_tags': [job.topic],
+        'quality_score': None,  # scored again by score_generated_content
+    }
+    existing = AIGeneratedContent.objects.filter(content_hash=content_hash).first()
+    if existing is None:
+        try:
+            with transaction.atomic():
+                return AIGeneratedContent.objects.create(content_hash=content_hash, created_by=job.user, **fields)
+        except IntegrityError:
+            # Another worker stored the same request first
+            existing = AIGeneratedContent.objects.get(content_hash=content_hash)
+
+    if existing.status in REUSABLE_STATUSES:
+        existing.increment_usage()
+        return existing
+    for name, value in fields.items():
+        setattr(existing, name, value)
+    existing.status = 'draft'
+    existing.save()
+    return existing
+
+
+def complete_jobs(results, requested_model):
+    now = timezone.now()
+    with transaction.atomic():
+        for job, title, text, tokens, model in results:
+            job.content = store_content(job, title, text, model, request_hash(job, requested_model))
+            job.status = 'completed'
+            job.total_tokens = tokens
+            job.last_error = ''
+            job.finished_at = now
+            if tokens:
+                AITokenUsage.record(job.user_id, tokens)
+        GenerationJob.objects.bulk_update(
+            [job for job, *_ in results], ['content', 'status', 'total_tokens', 'last_error', 'finished_at']
+        )
+
+
+def fail_jobs(jobs, error):
+    logger.warning('Generation failed for %d jobs: %s', len(jobs), error)
+    now = timezone.now()
+    for job in jobs:
+        job.last_error = error
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = 'failed'
+            job.finished_at = now
+        else:
+            job.status = 'queued'
+            job.available_at = now + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (job.attempts - 1))
+    GenerationJob.objects.bulk_update(jobs, ['status', 'last_error', 'available_at', 'finished_at'])
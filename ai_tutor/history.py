@@ -0,0 +1,115 @@
+"""
+Paged chat history and session lists.
+
+Messages are paged by id on the ``(session, id)`` index. Ids only grow, so
+they are stable cursors: ``before`` walks back through older messages and
+``after`` picks up where a client left off. ``since`` takes a timestamp
+instead, for clients that only remember when they last synced, and uses the
+``(session, created_at)`` index. Every page reads at most ``limit + 1``
+rows (the extra row tells whether there is more), however long the
+conversation is.
+
+Sessions are listed by ``last_activity``, newest first, with keyset
+pagination on ``(last_activity, id)`` over the
+``(user, -last_activity, -id)`` index. The cursor is the last row's key,
+encoded so it can go in a query string. A session that gets a new message
+while a client is paging moves to the front of the list. It may then be
+skipped on the current pass, but never breaks the paging.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+MESSAGE_PAGE_SIZE = 50
+SESSION_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+
+class CursorError(ValueError):
+    """A malformed cursor or paging parameter"""
+
+
+def page_size(value, default):
+    if value in (None, ''):
+        return default
+    if not str(value).isdigit() or int(value) < 1:
+        raise CursorError('limit must be a positive integer')
+    return min(int(value), MAX_PAGE_SIZE)
+
+
+def message_cursors(params):
+    """The ``before``, ``after`` and ``since`` values in a query string"""
+    cursors = {}
+    for name in ('before', 'after'):
+        value = params.get(name, '')
+        if value:
+            if not value.isdigit():
+                raise CursorError(f'{name} must be a message id')
+            cursors[name] = int(value)
+    value = params.get('since', '')
+    if value:
+        # An unescaped "+" in the UTC offset arrives as a space
+        try:
+            since = parse_datetime(value.replace(' ', '+'))
+        except ValueError:
+            since = None
+        if since is None:
+            raise CursorError('since must be an ISO 8601 timestamp')
+        cursors['since'] = since if timezone.is_aware(since) else timezone.make_aware(since)
+    return cursors
+
+
+def messages_page_query(session, before=None, after=None, since=None):
+    """
+    ``(queryset, newer)``: the session's messages in paging order, from the
+    cursor on. ``newer`` pages run forward in time, the others backwards.
+    """
+    if sum(cursor is not None for cursor in (before, after, since)) > 1:
+        raise CursorError('use only one of before, after and since')
+
+    messages = session.messages.all()
+    if after is not None:
+        return messages.filter(id__gt=after).order_by('id'), True
+    if since is not None:
+        return messages.filter(created_at__gt=since).order_by('created_at', 'id'), True
+    if before is not None:
+        messages = messages.filter(id__lt=before)
+    return messages.order_by('-id'), False
+
+
+def split_page(rows, limit, newer):
+    """``(page oldest first, has_more)`` from up to ``limit + 1`` rows in paging order"""
+    page = rows[:limit]
+    if not newer:
+        page.reverse()
+    return page, len(rows) > limit
+
+
+def encode_cursor(session):
+    key = f'{session.last_activity.isoformat()}|{session.id}'
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The ``(last_activity, id)`` key a session cursor points after"""
+    try:
+        key = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        last_activity, session_id = key.rsplit('|', 1)
+        return datetime.fromisoformat(last_activity), int(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError('invalid cursor') from None
+
+
+def sessions_after(sessions, cursor=None):
+    """``sessions`` newest activity first, starting after ``cursor``"""
+    sessions = sessions.order_by('-last_activity', '-id')
+    if cursor:
+        last_activity, session_id = decode_cursor(cursor)
+        sessions = sessions.filter(
+            Q(last_activity__lt=last_activity) | Q(last_activity=last_activity, id__lt=session_id)
+        )
+    return sessions
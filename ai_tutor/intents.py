@@ -0,0 +1,237 @@
+"""
+Compiled intent matcher for tutor questions.
+
+Every intent phrase (built-in topics, course titles and the comma-separated
+``key_concepts`` of published lessons) is compiled once into an
+Aho-Corasick automaton, so a message is scanned in a single pass whatever
+the number of phrases. Phrases only match on word boundaries. Each match
+scores ``priority * words in the phrase``, so lesson concepts outrank
+general topics and longer, more specific phrases outrank shorter ones.
+
+The matcher answers offline questions directly and routes LLM questions to
+the lesson they are about. It is rebuilt per process when the shared
+version, bumped on every ``Course``/``Lesson`` save or delete, changes.
+"""
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+from courses.models import Course, Lesson
+
+VERSION_KEY = 'tutor_intents:version'
+CHECK_INTERVAL = 30  # seconds between version checks per process
+
+TOPIC_PRIORITY = 1
+COURSE_PRIORITY = 2
+LESSON_PRIORITY = 3
+
+_non_word = re.compile(r'[^a-z0-9+#]+')
+
+
+def normalize(text):
+    """Lowercase words separated (and surrounded) by single spaces"""
+    return ' ' + ' '.join(_non_word.sub(' ', text.lower()).split()) + ' '
+
+
+@dataclass
+class Intent:
+    """Something the tutor can answer or route without the LLM"""
+    name: str
+    response: str
+    suggestions: list = field(default_factory=list)
+    priority: int = TOPIC_PRIORITY
+    course_id: int = None
+    lesson_id: int = None
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    score: int
+    phrases: list
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton; ``search`` yields every match"""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.patterns = []
+
+    def add(self, pattern, value):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = next_node
+        self.output[node].append(len(self.patterns))
+        self.patterns.append((pattern, value))
+
+    def compile(self):
+        """Compute failure links breadth-first; call once after all ``add``s"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+        return self
+
+    def search(self, text):
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for index in self.output[node]:
+                yield self.patterns[index]
+
+
+class IntentMatcher:
+    """Scores every intent whose phrases occur in a message"""
+
+    def __init__(self, intents):
+        self.automaton = AhoCorasick()
+        self.size = 0
+        for phrases, intent in intents:
+            for phrase in phrases:
+                pattern = normalize(phrase)
+                if not pattern.strip():
+                    continue
+                self.automaton.add(pattern, intent)
+                self.size += 1
+                if not pattern.endswith('s '):
+                    self.automaton.add(pattern[:-1] + 's ', intent)  # plural
+        self.automaton.compile()
+
+    def match(self, message):
+        """The best-scoring intent for a message, or None"""
+        scores = {}
+        for pattern, intent in self.automaton.search(normalize(message)):
+            key = id(intent)
+            weight = intent.priority * len(pattern.split())
+            if key in scores:
+                scores[key].score += weight
+                scores[key].phrases.append(pattern.strip())
+            else:
+                scores[key] = IntentMatch(intent, weight, [pattern.strip()])
+        if not scores:
+            return None
+        return max(scores.values(), key=lambda match: (match.score, match.intent.priority))
+
+
+TOPIC_LIBRARY = {
+    'machine learning': {
+        'response': "Machine learning is a powerful subset of AI that enables computers to learn and improve from data without being explicitly programmed. It's like teaching a computer to recognize patterns and make predictions based on examples.",
+        'suggestions': ['Tell me about supervised learning', 'What are ML algorithms?', 'Show me Python examples']
+    },
+    'neural network': {
+        'response': "Neural networks are computing systems inspired by biological neural networks. They consist of interconnected nodes (neurons) that process information in layers - input layer, hidden layers, and output layer. Each connection has a weight that gets adjusted during training.",
+        'suggestions': ['Explain backpropagation', 'Types of neural networks', 'How to build one?']
+    },
+    'deep learning': {
+        'response': "Deep learning is a subset of machine learning that uses neural networks with multiple hidden layers (hence 'deep'). It's particularly powerful for complex tasks like image recognition, natural language processing, and speech recognition.",
+        'suggestions': ['CNN vs RNN', 'Popular frameworks', 'Real-world applications']
+    },
+    'python': {
+        'response': "Python is an excellent choice for AI development! It offers powerful libraries like TensorFlow, PyTorch, scikit-learn, and NumPy. Its simple syntax makes it perfect for both beginners and experts in AI development.",
+        'suggestions': ['Show me AI libraries', 'Python ML tutorial', 'Best practices']
+    },
+    'quiz': {
+        'response': "I'd love to quiz you! Here's a question: What is the main difference between supervised and unsupervised learning? \n\nA) Supervised uses labeled data, unsupervised doesn't\nB) Supervised is faster\nC) No difference",
+        'suggestions': ['Answer: A', 'Answer: B', 'Explain the difference']
+    },
+    'computer vision': {
+        'response': "Computer vision enables computers to interpret and understand visual information from images and videos. It involves techniques like image classification, object detection, facial recognition, and image segmentation using deep learning models like CNNs.",
+        'suggestions': ['CNN architecture', 'Object detection', 'Image preprocessing']
+    },
+    'nlp': {
+        'response': "Natural Language Processing (NLP) helps computers understand, interpret, and generate human language. It includes tasks like sentiment analysis, language translation, text summarization, and chatbots (like me!).",
+        'suggestions': ['Transformer models', 'BERT and GPT', 'Text preprocessing']
+    },
+    'algorithm': {
+        'response': "AI algorithms are step-by-step procedures for solving problems. Common types include: Linear Regression (prediction), Decision Trees (classification), K-means (clustering), and Neural Networks (complex pattern recognition).",
+        'suggestions': ['Compare algorithms', 'When to use which?', 'Algorithm complexity']
+    },
+}
+
+
+def built_in_intents():
+    """General AI topics answered from the built-in library"""
+    return [
+        ([keyword], Intent(name=keyword, response=data['response'], suggestions=data['suggestions']))
+        for keyword, data in TOPIC_LIBRARY.items()
+    ]
+
+
+def content_intents():
+    """Intents for published courses and their lessons' key concepts"""
+    intents = []
+    for course in Course.objects.filter(status='published').only('id', 'title', 'short_description', 'description'):
+        intents.append(([course.title], Intent(
+            name=course.title,
+            response=f"{course.title}: {course.short_description or course.description[:300]}",
+            suggestions=[f'What will I learn in {course.title}?', 'Recommend a lesson', 'Give me a quiz'],
+            priority=COURSE_PRIORITY,
+            course_id=course.id,
+        )))
+
+    lessons = Lesson.objects.filter(course__status='published').exclude(key_concepts='').select_related('course').only(
+        'id', 'title', 'key_concepts', 'learning_objectives', 'course__id', 'course__title'
+    )
+    for lesson in lessons:
+        concepts = [concept.strip() for concept in lesson.key_concepts.split(',') if concept.strip()]
+        summary = lesson.learning_objectives.strip() or f"It covers {', '.join(concepts)}."
+        intents.append((concepts, Intent(
+            name=lesson.title,
+            response=(
+                f"That's covered in the lesson \"{lesson.title}\" of {lesson.course.title}. {summary}"
+            ),
+            suggestions=[f'Explain {concept}' for concept in concepts[:2]] + ['Give me a quiz'],
+            priority=LESSON_PRIORITY,
+            course_id=lesson.course.id,
+            lesson_id=lesson.id,
+        )))
+    return intents
+
+
+def invalidate():
+    """Make every process rebuild its matcher (called when course content changes)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+_state = {'matcher': None, 'version': None, 'checked_at': 0.0}
+_lock = threading.Lock()
+
+
+def get_intent_matcher():
+    """This process's matcher, rebuilt when course content has changed"""
+    now = time.monotonic()
+    if _state['matcher'] is not None and now - _state['checked_at'] < CHECK_INTERVAL:
+        return _state['matcher']
+
+    with _lock:
+        version = cache.get(VERSION_KEY, 0)
+        if _state['matcher'] is None or version != _state['version']:
+            _state['matcher'] = IntentMatcher(content_intents() + built_in_intents())
+            _state['version'] = version
+        _state['checked_at'] = now
+        return _state['matcher']
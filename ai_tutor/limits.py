@@ -0,0 +1,104 @@
+"""
+Rate limits and daily token quotas for the AI endpoints.
+
+Each user gets a token bucket per endpoint scope (``AI_RATE_LIMITS``): the
+bucket holds ``burst`` requests and refills at ``per_minute``. It is stored
+in the Django cache as the single time at which the bucket will be full
+again (GCRA), so a check is one ``get`` and one ``set`` and needs no
+background refill. The two run under a per-bucket lock taken with
+``cache.add``, which is atomic on every cache backend, so concurrent
+requests cannot all take the last token. With ``REDIS_URL`` set the
+buckets are shared by every worker.
+
+The daily quota (``AI_DAILY_TOKEN_QUOTA``) is checked against
+``AITokenUsage``, a per-user running total that every stored tutor answer
+adds its ``total_tokens`` to, so the check is one primary-key-sized lookup
+rather than a SUM over the user's messages.
+"""
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as day_start, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .models import AITokenUsage
+
+BUCKET_KEY = 'ai_rate:{scope}:{user_id}'
+LOCK_KEY = '{key}:lock'
+LOCK_TIMEOUT = 2  # seconds; frees the lock of a worker that died holding it
+LOCK_WAIT = 0.5  # seconds a request waits for the lock before it is refused
+
+
+@dataclass
+class LimitExceeded:
+    """Why a request was refused and when it may be retried"""
+    message: str
+    retry_after: int  # seconds
+
+
+def take_token(user_id, scope):
+    """Take one request from the user's bucket; the seconds to wait if it is empty"""
+    limit = settings.AI_RATE_LIMITS[scope]
+    interval = 60.0 / limit['per_minute']
+    capacity = interval * limit['burst']
+    key = BUCKET_KEY.format(scope=scope, user_id=user_id)
+    
+    # Concurrent requests would all read the same time and each take the
+    # last token, so the read and write happen under the bucket's lock
+    if not acquire_lock(key):
+        return interval
+    try:
+        now = time.time()
+        full_at = max(cache.get(key, now), now) + interval
+        if full_at - now > capacity:
+            return full_at - now - capacity
+        cache.set(key, full_at, timeout=math.ceil(full_at - now) + 1)
+        return 0.0
+    finally:
+        cache.delete(LOCK_KEY.format(key=key))
+
+
+def acquire_lock(key):
+    """Wait up to ``LOCK_WAIT`` seconds for the bucket's lock; False if it stays taken"""
+    lock = LOCK_KEY.format(key=key)
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def seconds_until_tomorrow():
+    now = timezone.localtime()
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), day_start.min))
+    return (midnight - now).total_seconds()
+
+
+def check_limits(user, scope):
+    """None if the user may call the AI ``scope`` now, otherwise ``LimitExceeded``"""
+    quota = settings.AI_DAILY_TOKEN_QUOTA
+    if quota and AITokenUsage.used_today(user.id) >= quota:
+        return LimitExceeded(
+            'You have used your AI allowance for today. It resets at midnight.',
+            math.ceil(seconds_until_tomorrow())
+        )
+    
+    wait = take_token(user.id, scope)
+    if wait:
+        return LimitExceeded(
+            'You are sending requests too quickly. Please wait a moment.',
+            math.ceil(wait)
+        )
+    return None
+
+
+def too_many_requests(exceeded):
+    """A 429 JSON response for a refused request"""
+    response = JsonResponse({'error': exceeded.message, 'retry_after': exceeded.retry_after}, status=429)
+    response['Retry-After'] = str(exceeded.retry_after)
+    return response
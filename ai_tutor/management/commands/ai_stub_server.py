@@ -0,0 +1,160 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Answers OpenAI-style chat completion requests with a canned reply"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+    first_token_delay = 0.0
+    token_delay = 0.0
+    reply = ''
+    error_rate = 0.0
+    slow_rate = 0.0
+    slow_delay = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_json(404, {'error': {'message': f'Unknown endpoint {self.path}'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self.send_json(400, {'error': {'message': 'Invalid JSON'}})
+            return
+
+        # Injected faults, for exercising the gateway's retries, circuit breaker and hedging
+        if random.random() < self.error_rate:
+            self.send_json(503, {'error': {'message': 'Stub provider overloaded'}})
+            return
+        if random.random() < self.slow_rate:
+            time.sleep(self.slow_delay)
+
+        model = body.get('model', 'stub')
+        messages = body.get('messages', [])
+        question = messages[-1]['content'] if messages else ''
+        words = (self.reply or f'Stub answer to: {question}').split(' ')
+        prompt_tokens = sum(len(str(message.get('content', '')).split()) for message in messages)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(words),
+            'total_tokens': prompt_tokens + len(words),
+        }
+
+        if body.get('stream'):
+            self.stream_reply(model, words, usage, body.get('stream_options') or {})
+            return
+
+        time.sleep(self.first_token_delay + self.token_delay * len(words))
+        self.send_json(200, {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': ' '.join(words)},
+                'finish_reason': 'stop',
+            }],
+            'usage': usage,
+        })
+
+    def stream_reply(self, model, words, usage, stream_options):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        time.sleep(self.first_token_delay)
+        for index, word in enumerate(words):
+            if index:
+                time.sleep(self.token_delay)
+            text = word if index == len(words) - 1 else word + ' '
+            self.send_chunk(self.chunk(model, {'content': text}))
+        self.send_chunk(self.chunk(model, {}, finish_reason='stop'))
+        if stream_options.get('include_usage'):
+            self.send_chunk({**self.chunk(model, None), 'choices': [], 'usage': usage})
+        self.write_chunk(b'data: [DONE]\n\n')
+        self.write_chunk(b'')
+
+    def chunk(self, model, delta, finish_reason=None):
+        return {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+        }
+
+    def send_chunk(self, data):
+        self.write_chunk(f'data: {json.dumps(data)}\n\n'.encode())
+
+    def write_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run a local OpenAI-compatible stub provider for developing and testing the AI tutor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8001, help='Port to listen on (default: 8001)')
+        parser.add_argument(
+            '--first-token-delay', type=float, default=0.3,
+            help='Seconds before the first token is sent (default: 0.3)'
+        )
+        parser.add_argument(
+            '--token-delay', type=float, default=0.03,
+            help='Seconds between streamed tokens (default: 0.03)'
+        )
+        parser.add_argument('--reply', default='', help='Fixed reply text (default: echo the question)')
+        parser.add_argument(
+            '--error-rate', type=float, default=0.0,
+            help='Fraction of requests answered with a 503 error (default: 0)'
+        )
+        parser.add_argument(
+            '--slow-rate', type=float, default=0.0,
+            help='Fraction of requests delayed by --slow-delay (default: 0)'
+        )
+        parser.add_argument(
+            '--slow-delay', type=float, default=5.0,
+            help='Extra seconds before a slow request is answered (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        handler = type('ConfiguredStubProviderHandler', (StubProviderHandler,), {
+            'first_token_delay': options['first_token_delay'],
+            'token_delay': options['token_delay'],
+            'reply': options['reply'],
+            'error_rate': options['error_rate'],
+            'slow_rate': options['slow_rate'],
+            'slow_delay': options['slow_delay'],
+        })
+        server = ThreadingHTTPServer((options['host'], options['port']), handler)
+        url = f"http://{options['host']}:{options['port']}/v1/"
+        self.stdout.write(self.style.SUCCESS(f'Stub AI provider listening on {url}'))
+        self.stdout.write(f'Point the tutor at it with AI_API_URL={url} and any non-empty AI_API_KEY')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
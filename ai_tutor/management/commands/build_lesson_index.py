@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from ai_tutor import retrieval
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the BM25 index of lesson passages used to ground the AI tutor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pending', action='store_true',
+            help='Only re-index lessons queued by saves since the last run'
+        )
+        parser.add_argument(
+            '--query',
+            help='Search the rebuilt index for this text and print the top passages'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['pending']:
+            updated = retrieval.update_pending()
+            self.stdout.write(self.style.SUCCESS(
+                f'Re-indexed {updated} changed lessons in {time.perf_counter() - started:.2f}s'
+            ))
+            return
+
+        manifest = retrieval.rebuild()
+        index = retrieval.LessonIndex(retrieval.index_root(), manifest)
+        self.stdout.write(
+            f'Indexed {len(index.main)} passages from {len(set(index.main.lessons.tolist()))} lessons '
+            f'in {time.perf_counter() - started:.2f}s'
+        )
+
+        if options['query']:
+            for passage in index.search(options['query']):
+                self.stdout.write(f'{passage.score:6.2f}  {passage.lesson_title}: {passage.text[:100]}')
+
+        self.stdout.write(self.style.SUCCESS(f"Lesson index written to {retrieval.index_root()}"))
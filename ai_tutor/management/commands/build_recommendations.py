@@ -0,0 +1,26 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from ai_tutor.recommender import DEFAULT_TOP_K, build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild personalized course recommendations from enrollments and quiz scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=DEFAULT_TOP_K,
+            help=f'Courses recommended per learner (default: {DEFAULT_TOP_K})'
+        )
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='Days until the recommendations expire (default: 7)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = build_recommendations(top_k=options['top_k'], ttl=timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} course recommendations in {time.perf_counter() - started:.2f}s'
+        ))
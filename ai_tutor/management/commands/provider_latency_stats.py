@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ai_tutor.gateway import BUCKETS, LatencyHistogram, shared_stats
+
+
+class Command(BaseCommand):
+    help = 'Report AI provider call latency and failures across all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=1,
+            help='Number of days to include, ending today (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        days = [today - timedelta(days=offset) for offset in range(options['days'])]
+
+        for endpoint in settings.AI_ENDPOINTS:
+            ok, errors, rejected = LatencyHistogram(), LatencyHistogram(), 0
+            for day in days:
+                histograms, day_rejected = shared_stats(day, endpoint)
+                ok.counts = [a + b for a, b in zip(ok.counts, histograms['ok'].counts)]
+                errors.counts = [a + b for a, b in zip(errors.counts, histograms['error'].counts)]
+                rejected += day_rejected
+
+            self.stdout.write(self.style.MIGRATE_HEADING(endpoint))
+            self.stdout.write(
+                f'  {ok.total} ok, {errors.total} failed, {rejected} rejected by the circuit breaker'
+            )
+            if ok.total:
+                self.stdout.write(
+                    f'  p50 <= {self.format_bound(ok.percentile(0.5))}, '
+                    f'p95 <= {self.format_bound(ok.percentile(0.95))}, '
+                    f'p99 <= {self.format_bound(ok.percentile(0.99))}'
+                )
+            for bound, ok_count, error_count in zip(BUCKETS, ok.counts, errors.counts):
+                if ok_count or error_count:
+                    self.stdout.write(f'  <= {self.format_bound(bound):>6}: {ok_count:6} ok {error_count:6} failed')
+
+        self.stdout.write(self.style.SUCCESS(f'Provider latency for the last {len(days)} day(s)'))
+
+    def format_bound(self, seconds):
+        return 'inf' if seconds == float('inf') else f'{seconds:g}s'
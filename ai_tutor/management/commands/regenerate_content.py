@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_tutor.generation import request_hash
+from ai_tutor.models import AIGeneratedContent, GenerationJob
+from ai_tutor.prompts import PromptError, get_template
+from ai_tutor.providers import get_provider
+
+
+class Command(BaseCommand):
+    help = 'Queue generation jobs for content made with an older version of its prompt template'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'template', nargs='*',
+            help='Template ids, e.g. generation.summary (default: one per generation kind)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Jobs created per query (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how much content is outdated'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            template_ids = options['template'] or [f'generation.{kind}' for kind in GenerationJob.CONTENT_TYPES]
+            selected = [get_template(template_id) for template_id in template_ids]
+        except PromptError as exc:
+            raise CommandError(exc)
+
+        model = get_provider().model
+        queued = 0
+        for template in selected:
+            kind = template.id.removeprefix('generation.')
+            if kind not in GenerationJob.CONTENT_TYPES:
+                raise CommandError(f'{template.id} is not a generation.<kind> template')
+
+            # The creator asks again; content without one cannot be re-queued
+            outdated = AIGeneratedContent.objects.filter(
+                prompt_template=template.id, prompt_version__lt=template.version, created_by__isnull=False
+            ).exclude(status='rejected').order_by('id').values_list('id', 'created_by_id', 'topic_tags', 'target_level')
+
+            # Requests already queued or running, or queued earlier in this run
+            pending = {
+                request_hash(job, model)
+                for job in GenerationJob.objects.filter(kind=kind, status__in=('queued', 'running')).only(
+                    'kind', 'topic', 'difficulty'
+                )
+            }
+
+            count = 0
+            skipped = 0
+            last_id = 0
+            while True:
+                rows = list(outdated.filter(id__gt=last_id)[:options['batch_size']])
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                candidates = {}
+                for _, user_id, topics, level in rows:
+                    if not topics:
+                        continue
+                    job = GenerationJob(user_id=user_id, kind=kind, topic=str(topics[0])[:200], difficulty=level or 'beginner')
+                    content_hash = request_hash(job, model)
+                    if content_hash in pending or content_hash in candidates:
+                        skipped += 1
+                    else:
+                        candidates[content_hash] = job
+
+                # Content made with the current version was regenerated by an earlier run
+                current = set(AIGeneratedContent.objects.filter(
+                    content_hash__in=candidates
+                ).values_list('content_hash', flat=True))
+                skipped += len(current)
+                jobs = [job for content_hash, job in candidates.items() if content_hash not in current]
+                pending.update(candidates)
+
+                if not options['dry_run']:
+                    GenerationJob.objects.bulk_create(jobs)
+                count += len(jobs)
+
+            self.stdout.write(f'{template}: {count} outdated items, {skipped} already regenerated or queued')
+            queued += count
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{queued} items would be regenerated'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} generation jobs'))
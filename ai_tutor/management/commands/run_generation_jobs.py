@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from ai_tutor.generation import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Generate AI content for queued generation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=20,
+            help='Jobs claimed per round (default: 20)'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for new jobs instead of exiting once the queue is drained'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to sleep between polls when idle in --loop mode (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            claimed = run_pending(batch_size)
+            total += claimed
+            if claimed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} generation jobs'))
@@ -0,0 +1,69 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from ai_tutor.models import AIGeneratedContent
+from ai_tutor.quality import init_worker, score_row, shingles
+from courses.models import Lesson
+from quizzes.models import Question
+
+
+class Command(BaseCommand):
+    help = 'Score draft AI-generated content with local quality heuristics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Content items read, scored and written per round (default: 500)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Scoring processes (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--rescore', action='store_true',
+            help='Also score drafts that already have a quality score'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        chunk_size = options['chunk_size']
+        reference = frozenset(self.reference_shingles())
+
+        drafts = AIGeneratedContent.objects.filter(status='draft')
+        if not options['rescore']:
+            drafts = drafts.filter(quality_score__isnull=True)
+        rows = drafts.order_by('id').values_list('id', 'content_type', 'content', 'target_level')
+
+        scored = 0
+        total = 0.0
+        workers = max(1, options['workers'])
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(reference,)) as pool:
+            last_id = 0
+            while True:
+                chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+                if not chunk:
+                    break
+                last_id = chunk[-1][0]
+                results = list(pool.map(score_row, chunk, chunksize=max(1, len(chunk) // (workers * 4))))
+                AIGeneratedContent.objects.bulk_update(
+                    [AIGeneratedContent(id=content_id, quality_score=score) for content_id, score in results],
+                    ['quality_score'], batch_size=chunk_size
+                )
+                scored += len(results)
+                total += sum(score for _, score in results)
+
+        average = total / scored if scored else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {scored} drafts (average {average:.2f}) in {time.perf_counter() - started:.2f}s'
+        ))
+
+    def reference_shingles(self):
+        """Shingles of every lesson and quiz question, which drafts should not repeat"""
+        lessons = Lesson.objects.values_list('content', 'key_concepts')
+        for content, key_concepts in lessons.iterator(chunk_size=2000):
+            yield from shingles(f'{content}\n{key_concepts}')
+        questions = Question.objects.values_list('text', 'explanation')
+        for text, explanation in questions.iterator(chunk_size=2000):
+            yield from shingles(f'{text}\n{explanation}')
@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.utils import timezone
+from accounts.models import User
+from ai_tutor.models import PersonalizedRecommendation
+from ai_tutor.recommender import ANSWERED_STATUSES, DEFAULT_TOP_K, OPEN_STATUSES, build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Expire stale recommendations, archive old ones and regenerate them for active learners'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows updated, archived or deleted per query (default: 1000)'
+        )
+        parser.add_argument(
+            '--archive-days', type=int, default=90,
+            help='Archive answered and expired recommendations untouched for this many days (default: 90)'
+        )
+        parser.add_argument(
+            '--active-days', type=int, default=30,
+            help='Regenerate recommendations for learners active within this many days (default: 30)'
+        )
+        parser.add_argument(
+            '--top-k', type=int, default=DEFAULT_TOP_K,
+            help=f'Courses recommended per learner (default: {DEFAULT_TOP_K})'
+        )
+        parser.add_argument(
+            '--skip-regenerate', action='store_true',
+            help='Only expire and archive'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+
+        expired = self.expire_stale()
+        self.stdout.write(f'Expired {expired} recommendations')
+
+        cutoff = timezone.now() - timedelta(days=options['archive_days'])
+        archived = self.archive_closed(cutoff)
+        self.stdout.write(f'Archived {archived} recommendations last updated before {cutoff:%Y-%m-%d}')
+
+        if not options['skip_regenerate']:
+            since = timezone.localdate() - timedelta(days=options['active_days'])
+            active = User.objects.filter(is_active=True, last_activity_date__gte=since).values_list('id', flat=True)
+            written = build_recommendations(top_k=options['top_k'], users=set(active))
+            self.stdout.write(f'Wrote {written} course recommendations for learners active since {since}')
+
+        self.stdout.write(self.style.SUCCESS('Recommendation sweep complete'))
+
+    def expire_stale(self):
+        """Mark open recommendations past their expiry as expired, one chunk per UPDATE"""
+        now = timezone.now()
+        stale = PersonalizedRecommendation.objects.filter(status__in=OPEN_STATUSES, expires_at__lt=now)
+        expired = 0
+        while True:
+            ids = list(stale.values_list('id', flat=True)[:self.batch_size])
+            if not ids:
+                return expired
+            expired += PersonalizedRecommendation.objects.filter(id__in=ids).update(status='expired', updated_at=now)
+
+    def archive_closed(self, cutoff):
+        """Move answered and expired recommendations older than ``cutoff`` to cold storage"""
+        closed = PersonalizedRecommendation.objects.filter(
+            status__in=ANSWERED_STATUSES + ('expired',), updated_at__lt=cutoff
+        )
+        last_id = closed.aggregate(last_id=Max('id'))['last_id']
+        if last_id is None:
+            return 0
+
+        # As with point transactions, the last archived id in the name makes re-runs idempotent
+        path = os.path.join(
+            settings.RECOMMENDATION_ARCHIVE_ROOT,
+            f'recommendations-{timezone.localdate():%Y-%m-%d}-{last_id}.jsonl.gz'
+        )
+        ids = self.write_archive(closed.filter(id__lte=last_id), path)
+
+        # Delete exactly the rows written, in chunks
+        for start in range(0, len(ids), self.batch_size):
+            PersonalizedRecommendation.objects.filter(id__in=ids[start:start + self.batch_size]).delete()
+        return len(ids)
+
+    def write_archive(self, queryset, path):
+        """Stream the rows to a gzipped JSON Lines file in id order; returns their ids"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        fields = [field.attname for field in PersonalizedRecommendation._meta.concrete_fields]
+
+        ids = []
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive:
+            while True:
+                last_seen = ids[-1] if ids else 0
+                rows = list(queryset.filter(id__gt=last_seen).order_by('id').values(*fields)[:self.batch_size])
+                if not rows:
+                    break
+                for row in rows:
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                ids.extend(row['id'] for row in rows)
+
+        os.replace(tmp_path, path)
+        return ids
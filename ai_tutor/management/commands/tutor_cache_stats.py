@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ai_tutor.response_cache import shared_stats
+
+
+class Command(BaseCommand):
+    help = 'Report the AI tutor response cache hit rate across all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='Number of days to report, most recent last (default: 7)'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        total_hits = total_misses = 0
+
+        for offset in range(options['days'] - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            hits, misses = shared_stats(day)
+            total_hits += hits
+            total_misses += misses
+            self.stdout.write(f'{day}: {self.format_rate(hits, misses)}')
+
+        self.stdout.write(self.style.SUCCESS(f'Total: {self.format_rate(total_hits, total_misses)}'))
+
+    def format_rate(self, hits, misses):
+        lookups = hits + misses
+        rate = hits / lookups * 100 if lookups else 0.0
+        return f'{hits} hits / {lookups} lookups ({rate:.1f}%)'
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aitutormessage',
+            index=models.Index(fields=['session', 'created_at'], name='tutor_message_session_idx'),
+        ),
+    ]
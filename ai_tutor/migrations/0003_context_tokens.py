@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+def backfill_token_counts(apps, schema_editor):
+    # Same estimate as ai_tutor.models.estimate_tokens
+    AITutorMessage = apps.get_model('ai_tutor', 'AITutorMessage')
+    batch = []
+    for message in AITutorMessage.objects.only('id', 'content').iterator(chunk_size=2000):
+        message.token_count = (len(message.content) + 3) // 4
+        batch.append(message)
+        if len(batch) >= 1000:
+            AITutorMessage.objects.bulk_update(batch, ['token_count'])
+            batch = []
+    if batch:
+        AITutorMessage.objects.bulk_update(batch, ['token_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0002_message_session_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aitutormessage',
+            name='token_count',
+            field=models.PositiveIntegerField(default=0, help_text='Tokens the content takes up in a prompt'),
+        ),
+        migrations.AddField(
+            model_name='aitutorsession',
+            name='context_summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='aitutorsession',
+            name='summarized_until',
+            field=models.DateTimeField(blank=True, help_text='Messages up to here are in the summary', null=True),
+        ),
+        migrations.AddField(
+            model_name='aitutorsession',
+            name='summary_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_token_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_token_usage(apps, schema_editor):
+    AITutorMessage = apps.get_model('ai_tutor', 'AITutorMessage')
+    AITokenUsage = apps.get_model('ai_tutor', 'AITokenUsage')
+    totals = (
+        AITutorMessage.objects.filter(total_tokens__gt=0)
+        .annotate(day=TruncDate('created_at'))
+        .values('session__user_id', 'day')
+        .annotate(tokens=Sum('total_tokens'), requests=Count('id'))
+        .order_by()
+    )
+    AITokenUsage.objects.bulk_create(
+        (
+            AITokenUsage(user_id=row['session__user_id'], day=row['day'], tokens=row['tokens'], requests=row['requests'])
+            for row in totals.iterator(chunk_size=2000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0003_context_tokens'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AITokenUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('tokens', models.PositiveIntegerField(default=0)),
+                ('requests', models.PositiveIntegerField(default=0, help_text='Provider calls that used tokens')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_token_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'AI Token Usage',
+                'verbose_name_plural': 'AI Token Usage',
+                'db_table': 'ai_token_usage',
+                'ordering': ['-day'],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_token_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:54
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+STATUS_RANK = {'published': 0, 'approved': 1, 'review': 2, 'draft': 3, 'rejected': 4}
+
+
+def backfill_content_hash(apps, schema_editor):
+    # Same hash as ai_tutor.models.generation_hash. Where existing rows
+    # share a hash, the most reviewed (then oldest) one gets it.
+    AIGeneratedContent = apps.get_model('ai_tutor', 'AIGeneratedContent')
+    rows = AIGeneratedContent.objects.only(
+        'id', 'prompt', 'ai_model', 'generation_parameters', 'target_level', 'status'
+    )
+    best = {}
+    for row in rows.iterator(chunk_size=2000):
+        key = json.dumps({
+            'prompt': ' '.join(row.prompt.lower().split()),
+            'model': row.ai_model,
+            'parameters': row.generation_parameters,
+            'level': row.target_level,
+        }, sort_keys=True)
+        content_hash = hashlib.sha256(key.encode()).hexdigest()
+        rank = (STATUS_RANK.get(row.status, 5), row.id)
+        if content_hash not in best or rank < best[content_hash][0]:
+            best[content_hash] = (rank, row.id)
+
+    batch = [AIGeneratedContent(id=row_id, content_hash=content_hash) for content_hash, (_, row_id) in best.items()]
+    AIGeneratedContent.objects.bulk_update(batch, ['content_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0005_generation_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aigeneratedcontent',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of prompt, model, parameters and level; identical requests reuse this row', max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
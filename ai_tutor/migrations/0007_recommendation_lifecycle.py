@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0006_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='personalizedrecommendation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('viewed', 'Viewed'), ('accepted', 'Accepted'), ('dismissed', 'Dismissed'), ('completed', 'Completed'), ('expired', 'Expired')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='personalizedrecommendation',
+            index=models.Index(fields=['user', 'status', 'priority'], name='recommendation_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personalizedrecommendation',
+            index=models.Index(fields=['status', 'expires_at'], name='recommendation_expiry_idx'),
+        ),
+    ]
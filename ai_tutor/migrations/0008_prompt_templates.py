@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:10
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The generation.<kind> v1 templates in ai_tutor.prompts
+INSTRUCTIONS = {
+    'explanation': 'a clear explanation of',
+    'quiz': 'three multiple-choice quiz questions, with the correct answers, about',
+    'summary': 'a concise summary of the key points of',
+    'examples': 'practical Python code examples, with short comments, for',
+    'analogy': 'simple everyday analogies that explain',
+}
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def backfill_prompt_templates(apps, schema_editor):
+    # Rows whose prompt is exactly a v1 render get the template and are
+    # re-addressed by its key (ai_tutor.prompts.PromptTemplate.key), hashed
+    # as in ai_tutor.models.generation_hash. Other rows keep their hash.
+    AIGeneratedContent = apps.get_model('ai_tutor', 'AIGeneratedContent')
+    rows = AIGeneratedContent.objects.filter(content_hash__isnull=False).only(
+        'id', 'prompt', 'ai_model', 'generation_parameters', 'target_level', 'topic_tags'
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        kind = row.generation_parameters.get('kind') if isinstance(row.generation_parameters, dict) else None
+        if kind not in INSTRUCTIONS or not row.topic_tags:
+            continue
+        topic, level = str(row.topic_tags[0]), row.target_level
+        if row.prompt != f'Write {INSTRUCTIONS[kind]} {topic} for a {level} learner.':
+            continue
+        key = json.dumps({
+            'prompt': f'generation.{kind}@1 difficulty={normalize(level)} topic={normalize(topic)}',
+            'model': row.ai_model,
+            'parameters': row.generation_parameters,
+            'level': level,
+        }, sort_keys=True)
+        row.prompt_template = f'generation.{kind}'
+        row.prompt_version = 1
+        row.content_hash = hashlib.sha256(key.encode()).hexdigest()
+        batch.append(row)
+    AIGeneratedContent.objects.bulk_update(
+        batch, ['prompt_template', 'prompt_version', 'content_hash'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0007_recommendation_lifecycle'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aigeneratedcontent',
+            name='prompt_template',
+            field=models.CharField(blank=True, help_text='Id of the prompt template (see ai_tutor.prompts)', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='aigeneratedcontent',
+            name='prompt_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Version of the prompt template', null=True),
+        ),
+        migrations.AlterField(
+            model_name='aigeneratedcontent',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of prompt template key, model, parameters and level; identical requests reuse this row', max_length=64, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='aigeneratedcontent',
+            index=models.Index(fields=['prompt_template', 'prompt_version'], name='ai_content_template_idx'),
+        ),
+        migrations.RunPython(backfill_prompt_templates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0008_prompt_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aitutormessage',
+            index=models.Index(fields=['session', 'id'], name='tutor_message_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aitutorsession',
+            index=models.Index(fields=['user', '-last_activity', '-id'], name='tutor_session_activity_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0009_history_cursors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aigeneratedcontent',
+            name='quality_score',
+            field=models.FloatField(blank=True, help_text='Heuristic quality score (0-1) set by score_generated_content', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='aigeneratedcontent',
+            index=models.Index(fields=['status', 'quality_score'], name='ai_content_review_idx'),
+        ),
+    ]
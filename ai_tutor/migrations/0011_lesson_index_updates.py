@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0010_content_quality'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonIndexUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lesson_id', models.PositiveIntegerField(unique=True)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Lesson Index Update',
+                'verbose_name_plural': 'Lesson Index Updates',
+                'db_table': 'ai_lesson_index_updates',
+                'ordering': ['queued_at'],
+            },
+        ),
+    ]
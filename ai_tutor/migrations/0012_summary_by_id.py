@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:23
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_summarized_through(apps, schema_editor):
+    # The newest message at or before the old timestamp boundary
+    AITutorSession = apps.get_model('ai_tutor', 'AITutorSession')
+    AITutorMessage = apps.get_model('ai_tutor', 'AITutorMessage')
+    newest = AITutorMessage.objects.filter(
+        session=OuterRef('pk'), created_at__lte=OuterRef('summarized_until')
+    ).order_by().values('session').annotate(newest=Max('id')).values('newest')
+    AITutorSession.objects.filter(summarized_until__isnull=False).update(summarized_through=Subquery(newest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_tutor', '0011_lesson_index_updates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aitutorsession',
+            name='summarized_through',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Id of the newest message folded into the summary', null=True),
+        ),
+        migrations.RunPython(backfill_summarized_through, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='aitutorsession',
+            name='summarized_until',
+        ),
+    ]
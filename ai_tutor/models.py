@@ -1,9 +1,26 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
 from django.utils import timezone
+import hashlib
 import json
 
 
+def generation_hash(prompt, ai_model, parameters, target_level):
+    """Content address of a generation request: same inputs, same hash"""
+    key = json.dumps({
+        'prompt': ' '.join(prompt.lower().split()),
+        'model': ai_model,
+        'parameters': parameters,
+        'level': target_level,
+    }, sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def estimate_tokens(text):
+    """Approximate LLM token count of a text (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
 class AITutorSession(models.Model):
     """AI tutor chat sessions"""
     
@@ -35,6 +52,13 @@ class AITutorSession(models.Model):
     
     # Metadata
     total_messages = models.PositiveIntegerField(default=0)
+    
+    # Rolling summary of the turns that no longer fit in the prompt
+    context_summary = models.TextField(blank=True)
+    summary_tokens = models.PositiveIntegerField(default=0)
+    summarized_through = models.PositiveBigIntegerField(
+        blank=True, null=True, help_text="Id of the newest message folded into the summary"
+    )
     user_satisfaction = models.PositiveIntegerField(
         blank=True, null=True,
         choices=[(i, f'{i} Star{"s" if i != 1 else ""}') for i in range(1, 6)],
@@ -61,11 +85,26 @@ class AITutorSession(models.Model):
             return self.ended_at - self.started_at
         return timezone.now() - self.started_at
     
+    def add_messages(self, count=1, tokens=0):
+        """Count new messages with one UPDATE instead of recounting the history"""
+        now = timezone.now()
+        AITutorSession.objects.filter(pk=self.pk).update(
+            total_messages=models.F('total_messages') + count,
+            last_activity=now
+        )
+        self.total_messages += count
+        self.last_activity = now
+        if tokens:
+            AITokenUsage.record(self.user_id, tokens)
+    
     class Meta:
         db_table = 'ai_tutor_sessions'
         verbose_name = 'AI Tutor Session'
         verbose_name_plural = 'AI Tutor Sessions'
         ordering = ['-last_activity']
+        indexes = [
+            models.Index(fields=['user', '-last_activity', '-id'], name='tutor_session_activity_idx'),
+        ]
 
 
 class AITutorMessage(models.Model):
@@ -99,6 +138,7 @@ class AITutorMessage(models.Model):
     prompt_tokens = models.PositiveIntegerField(default=0)
     completion_tokens = models.PositiveIntegerField(default=0)
     total_tokens = models.PositiveIntegerField(default=0)
+    token_count = models.PositiveIntegerField(default=0, help_text="Tokens the content takes up in a prompt")
     
     # Message evaluation
     was_helpful = models.BooleanField(blank=True, null=True, help_text="User feedback on AI response")
@@ -112,17 +152,82 @@ class AITutorMessage(models.Model):
         return f"{self.get_sender_display()}: {content_preview}"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update session message count and last activity
-        self.session.total_messages = self.session.messages.count()
-        self.session.last_activity = timezone.now()
-        self.session.save()
+        adding = self._state.adding
+        if not self.token_count:
+            self.token_count = estimate_tokens(self.content)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                self.session.add_messages(tokens=self.total_tokens)
+    
+    @classmethod
+    def create_exchange(cls, session, messages):
+        """
+        Store a turn's messages (the question and its answer) with one INSERT
+        and one counter UPDATE, however long the session already is.
+        """
+        for message in messages:
+            if not message.token_count:
+                message.token_count = estimate_tokens(message.content)
+        with transaction.atomic():
+            created = cls.objects.bulk_create(messages)
+            session.add_messages(len(created), tokens=sum(message.total_tokens for message in created))
+        
+        if created and created[-1].pk is None:
+            # Backends that can't return ids from a bulk insert (MySQL)
+            ids = session.messages.order_by('-id').values_list('id', flat=True)[:len(created)]
+            for message, pk in zip(created, reversed(list(ids))):
+                message.pk = pk
+        return created
     
     class Meta:
         db_table = 'ai_tutor_messages'
         verbose_name = 'AI Tutor Message'
         verbose_name_plural = 'AI Tutor Messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['session', 'created_at'], name='tutor_message_session_idx'),
+            models.Index(fields=['session', 'id'], name='tutor_message_cursor_idx'),
+        ]
+
+
+class AITokenUsage(models.Model):
+    """Per-user daily AI token totals, kept in step with the tutor messages"""
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ai_token_usage')
+    day = models.DateField()
+    tokens = models.PositiveIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0, help_text="Provider calls that used tokens")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.tokens} tokens on {self.day}"
+    
+    @classmethod
+    def record(cls, user_id, tokens, day=None):
+        """Add a provider call's tokens to the user's total for the day"""
+        day = day or timezone.localdate()
+        changes = {'tokens': models.F('tokens') + tokens, 'requests': models.F('requests') + 1}
+        if cls.objects.filter(user_id=user_id, day=day).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, day=day, tokens=tokens, requests=1)
+        except IntegrityError:
+            # Another request created today's row first
+            cls.objects.filter(user_id=user_id, day=day).update(**changes)
+    
+    @classmethod
+    def used_today(cls, user_id):
+        return cls.objects.filter(user_id=user_id, day=timezone.localdate()).values_list('tokens', flat=True).first() or 0
+    
+    class Meta:
+        db_table = 'ai_token_usage'
+        verbose_name = 'AI Token Usage'
+        verbose_name_plural = 'AI Token Usage'
+        unique_together = ['user', 'day']
+        ordering = ['-day']
 
 
 class AIGeneratedContent(models.Model):
@@ -152,8 +257,14 @@ class AIGeneratedContent(models.Model):
     
     # Generation details
     prompt = models.TextField(help_text="Prompt used to generate this content")
+    prompt_template = models.CharField(max_length=100, blank=True, help_text="Id of the prompt template (see ai_tutor.prompts)")
+    prompt_version = models.PositiveIntegerField(blank=True, null=True, help_text="Version of the prompt template")
     ai_model = models.CharField(max_length=50, help_text="AI model used")
     generation_parameters = models.JSONField(default=dict, help_text="Parameters used for generation")
+    content_hash = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False,
+        help_text="Hash of prompt template key, model, parameters and level; identical requests reuse this row"
+    )
     
     # Content metadata
     target_level = models.CharField(
@@ -182,7 +293,9 @@ class AIGeneratedContent(models.Model):
     )
     
     # Quality metrics
-    quality_score = models.FloatField(blank=True, null=True, help_text="Auto-generated quality score (0-1)")
+    quality_score = models.FloatField(
+        blank=True, null=True, help_text="Heuristic quality score (0-1) set by score_generated_content"
+    )
     human_rating = models.PositiveIntegerField(
         blank=True, null=True,
         choices=[(i, f'{i} Star{"s" if i != 1 else ""}') for i in range(1, 6)]
@@ -213,15 +326,89 @@ class AIGeneratedContent(models.Model):
     
     def increment_usage(self):
         """Track content usage"""
+        now = timezone.now()
+        AIGeneratedContent.objects.filter(pk=self.pk).update(
+            usage_count=models.F('usage_count') + 1,
+            last_used=now
+        )
         self.usage_count += 1
-        self.last_used = timezone.now()
-        self.save()
+        self.last_used = now
     
     class Meta:
         db_table = 'ai_generated_content'
         verbose_name = 'AI Generated Content'
         verbose_name_plural = 'AI Generated Content'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['prompt_template', 'prompt_version'], name='ai_content_template_idx'),
+            models.Index(fields=['status', 'quality_score'], name='ai_content_review_idx'),
+        ]
+
+
+class GenerationJob(models.Model):
+    """A queued request to generate content, processed by ``run_generation_jobs``"""
+    
+    KIND_CHOICES = [
+        ('explanation', 'Explanation'),
+        ('quiz', 'Quiz Questions'),
+        ('summary', 'Summary'),
+        ('examples', 'Code Examples'),
+        ('analogy', 'Simple Analogies'),
+    ]
+    
+    # AIGeneratedContent.content_type for each kind
+    CONTENT_TYPES = {
+        'explanation': 'explanation',
+        'quiz': 'quiz_question',
+        'summary': 'course_material',
+        'examples': 'example',
+        'analogy': 'explanation',
+    }
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='generation_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    topic = models.CharField(max_length=200)
+    difficulty = models.CharField(
+        max_length=20,
+        choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced')],
+        default='beginner'
+    )
+    
+    # Processing state
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not picked up before this time")
+    last_error = models.TextField(blank=True)
+    
+    # Result
+    content = models.ForeignKey(
+        AIGeneratedContent, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_jobs'
+    )
+    total_tokens = models.PositiveIntegerField(default=0)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.topic} ({self.status})"
+    
+    class Meta:
+        db_table = 'ai_generation_jobs'
+        verbose_name = 'Generation Job'
+        verbose_name_plural = 'Generation Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id'], name='generation_job_pending_idx'),
+        ]
 
 
 class PersonalizedRecommendation(models.Model):
@@ -241,6 +428,7 @@ class PersonalizedRecommendation(models.Model):
         ('accepted', 'Accepted'),
         ('dismissed', 'Dismissed'),
         ('completed', 'Completed'),
+        ('expired', 'Expired'),
     ]
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recommendations')
@@ -296,6 +484,8 @@ class PersonalizedRecommendation(models.Model):
     
     def is_expired(self):
         """Check if recommendation has expired"""
+        if self.status == 'expired':
+            return True
         if self.expires_at:
             return timezone.now() > self.expires_at
         return False
@@ -305,3 +495,33 @@ class PersonalizedRecommendation(models.Model):
         verbose_name = 'Personalized Recommendation'
         verbose_name_plural = 'Personalized Recommendations'
         ordering = ['priority', '-created_at']
+        indexes = [
+            models.Index(fields=['user', 'status', 'priority'], name='recommendation_user_idx'),
+            models.Index(fields=['status', 'expires_at'], name='recommendation_expiry_idx'),
+        ]
+
+
+class LessonIndexUpdate(models.Model):
+    """A lesson whose passages ``build_lesson_index --pending`` must re-index"""
+    
+    # Not a foreign key: deleted lessons have to leave the index too
+    lesson_id = models.PositiveIntegerField(unique=True)
+    queued_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"Lesson {self.lesson_id} queued at {self.queued_at}"
+    
+    @classmethod
+    def queue(cls, lesson_ids):
+        """Queue lessons for re-indexing, or move their existing entries to now"""
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [cls(lesson_id=lesson_id, queued_at=now) for lesson_id in lesson_ids],
+            update_conflicts=True, unique_fields=['lesson_id'], update_fields=['queued_at']
+        )
+    
+    class Meta:
+        db_table = 'ai_lesson_index_updates'
+        verbose_name = 'Lesson Index Update'
+        verbose_name_plural = 'Lesson Index Updates'
+        ordering = ['queued_at']
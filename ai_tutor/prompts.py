@@ -0,0 +1,136 @@
+"""
+Registry of versioned prompt templates.
+
+Templates are registered when this module is imported at startup (see
+``AiTutorConfig.ready``). Each one is compiled then: its text is split into
+literal parts and ``{variable}`` slots, and every slot must be declared in
+``variables`` with its type. ``render()`` only type-checks the values and
+joins the parts, so no request assembles or parses a prompt string.
+
+Generated content records the id and version of the template it came from,
+and its ``content_hash`` is computed from ``key()``: the template id, version
+and normalized values rather than the rendered text. To change a template,
+register it again under a higher version. New requests then get new keys,
+and ``regenerate_content`` re-queues the content made with older versions.
+"""
+import string
+from dataclasses import dataclass, field
+
+
+class PromptError(ValueError):
+    """A template is malformed, unknown, or was given bad values"""
+
+
+def format_value(value):
+    """A variable's text in a rendered prompt; lists become numbered lines"""
+    if isinstance(value, list):
+        return '\n'.join(f'{index}. {item}' for index, item in enumerate(value, 1))
+    return str(value)
+
+
+def normalize(value):
+    """A variable's text in a template key: case and whitespace do not matter"""
+    if isinstance(value, list):
+        return '|'.join(normalize(item) for item in value)
+    return ' '.join(str(value).lower().split())
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A prompt with typed ``{variable}`` slots, compiled once"""
+    id: str
+    version: int
+    text: str
+    variables: dict  # name -> type
+    system: str = ''
+    parts: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        parts, used = [], set()
+        for literal, name, spec, conversion in string.Formatter().parse(self.text):
+            if name is not None and (spec or conversion or name not in self.variables):
+                raise PromptError(f'{self}: undeclared or formatted slot {{{name}}}')
+            parts.append((literal, name))
+            used.add(name)
+        if set(self.variables) - used:
+            raise PromptError(f'{self}: unused variables {sorted(set(self.variables) - used)}')
+        object.__setattr__(self, 'parts', tuple(parts))
+
+    def __str__(self):
+        return f'{self.id} v{self.version}'
+
+    def check(self, values):
+        if set(values) != set(self.variables):
+            raise PromptError(f'{self} expects {sorted(self.variables)}, got {sorted(values)}')
+        for name, kind in self.variables.items():
+            if not isinstance(values[name], kind):
+                raise PromptError(f'{self}: {name} must be {kind.__name__}, not {type(values[name]).__name__}')
+
+    def render(self, **values):
+        self.check(values)
+        return ''.join(literal + (format_value(values[name]) if name else '') for literal, name in self.parts)
+
+    def messages(self, **values):
+        """Chat messages: the template's system prompt, if any, and the rendered request"""
+        messages = [{'role': 'system', 'content': self.system}] if self.system else []
+        messages.append({'role': 'user', 'content': self.render(**values)})
+        return messages
+
+    def key(self, **values):
+        """Stable identity of a request: template, version and normalized values"""
+        self.check(values)
+        values = ' '.join(f'{name}={normalize(values[name])}' for name in sorted(self.variables))
+        return f'{self.id}@{self.version} {values}'
+
+
+_templates = {}
+
+
+def register(template):
+    versions = _templates.setdefault(template.id, {})
+    if template.version in versions:
+        raise PromptError(f'{template} is already registered')
+    versions[template.version] = template
+    return template
+
+
+def get_template(template_id, version=None):
+    """The template with this id, at ``version`` or else its latest version"""
+    versions = _templates.get(template_id, {})
+    if version is None and versions:
+        version = max(versions)
+    try:
+        return versions[version]
+    except KeyError:
+        raise PromptError(f'Unknown prompt template {template_id} v{version}') from None
+
+
+GENERATION_SYSTEM = (
+    "You write learning material for IntelliLearn, an AI and machine learning "
+    "course platform. Be accurate, concrete and suited to the learner's level."
+)
+
+# One template per GenerationJob kind, named generation.<kind>
+TOPIC = {'topic': str, 'difficulty': str}
+for kind, instruction in {
+    'explanation': 'a clear explanation of',
+    'quiz': 'three multiple-choice quiz questions, with the correct answers, about',
+    'summary': 'a concise summary of the key points of',
+    'examples': 'practical Python code examples, with short comments, for',
+    'analogy': 'simple everyday analogies that explain',
+}.items():
+    register(PromptTemplate(
+        f'generation.{kind}', 1, f'Write {instruction} {{topic}} for a {{difficulty}} learner.', TOPIC,
+        system=GENERATION_SYSTEM,
+    ))
+
+# Several rendered generation.<kind> requests answered in one call
+register(PromptTemplate(
+    'generation.batch', 1,
+    'Answer each numbered request below.\n'
+    'Reply with only a JSON object {{"items": [{{"title": ..., "content": ...}}]}} '
+    'holding one item per request, in the same order.\n\n'
+    'Requests:\n{requests}',
+    {'requests': list},
+    system=GENERATION_SYSTEM,
+))
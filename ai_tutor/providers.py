@@ -0,0 +1,279 @@
+"""
+AI provider abstraction for the tutor.
+
+``get_provider()`` returns one provider per worker process. The OpenAI
+provider talks to ``AI_API_URL`` through a single ``httpx`` client with a
+keep-alive connection pool, so consecutive tutor messages reuse warm
+connections instead of paying a TCP/TLS handshake each time. When no API key
+is configured the offline provider answers from the compiled intent library
+(see ``ai_tutor.intents``), so the tutor keeps working in development.
+
+Both providers can stream: ``stream()`` yields ``Delta`` text fragments as
+they arrive and finishes with a ``Completion`` carrying token usage, which
+lets views forward the first tokens to the client immediately.
+
+``acomplete()`` and ``astream()`` are the async equivalents used by the
+async tutor views. The OpenAI provider keeps one ``AsyncOpenAI`` client per
+event loop, so under ASGI all conversations in a process share one pool.
+
+Views and workers call providers through ``ai_tutor.gateway``, which adds
+timeouts, retries, a circuit breaker and latency metrics.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+import openai
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .intents import get_intent_matcher
+
+SYSTEM_PROMPT = (
+    "You are IntelliLearn's AI tutor. Explain artificial intelligence and "
+    "machine learning concepts clearly and accurately, adapt to the learner's "
+    "level, use short examples, and ask a follow-up question when it helps."
+)
+
+DEFAULT_SUGGESTIONS = ['Explain basics', 'Show examples', 'Give me a quiz']
+
+
+class ProviderError(Exception):
+    """The AI provider could not produce a response"""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def provider_error(exc):
+    """Wrap an OpenAI client error; connection errors, timeouts, 429s and 5xx can be retried"""
+    retryable = isinstance(exc, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+    return ProviderError(str(exc), retryable=retryable)
+
+
+@dataclass
+class Delta:
+    """A fragment of streamed response text"""
+    text: str
+
+
+@dataclass
+class Completion:
+    """A finished response with its token usage"""
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    suggestions: list = field(default_factory=list)
+    cached: bool = False
+    fallback: bool = False  # answered offline because the provider failed
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+
+def build_messages(user_message, history=(), notes=()):
+    """Chat messages for a tutor turn: system prompt and notes, prior turns, new question"""
+    messages = [{'role': 'system', 'content': SYSTEM_PROMPT}]
+    messages.extend({'role': 'system', 'content': note} for note in notes)
+    messages.extend(history)
+    messages.append({'role': 'user', 'content': user_message})
+    return messages
+
+
+class OpenAIProvider:
+    """OpenAI-compatible chat completions over a pooled keep-alive client"""
+
+    name = 'openai'
+
+    def __init__(self, api_key, base_url, model, timeout):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = httpx.Timeout(timeout, connect=5.0)
+        self.limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        self.http_client = httpx.Client(timeout=self.timeout, limits=self.limits)
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=0,
+        )
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def async_client(self):
+        """The ``AsyncOpenAI`` client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=httpx.AsyncClient(timeout=self.timeout, limits=self.limits),
+                max_retries=0,
+            )
+        return client
+
+    def complete(self, messages, **params):
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model, messages=messages, **params
+            )
+        except openai.OpenAIError as exc:
+            raise provider_error(exc) from exc
+
+        usage = response.usage
+        return Completion(
+            text=response.choices[0].message.content or '',
+            model=response.model or self.model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    def stream(self, messages, **params):
+        parts = []
+        usage = None
+        model = self.model
+        try:
+            chunks = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                stream_options={'include_usage': True},
+                **params
+            )
+            for chunk in chunks:
+                model = chunk.model or model
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text = chunk.choices[0].delta.content
+                    parts.append(text)
+                    yield Delta(text)
+        except openai.OpenAIError as exc:
+            raise provider_error(exc) from exc
+
+        yield Completion(
+            text=''.join(parts),
+            model=model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def acomplete(self, messages, **params):
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model, messages=messages, **params
+            )
+        except openai.OpenAIError as exc:
+            raise provider_error(exc) from exc
+
+        usage = response.usage
+        return Completion(
+            text=response.choices[0].message.content or '',
+            model=response.model or self.model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def astream(self, messages, **params):
+        parts = []
+        usage = None
+        model = self.model
+        try:
+            chunks = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                stream_options={'include_usage': True},
+                **params
+            )
+            async for chunk in chunks:
+                model = chunk.model or model
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text = chunk.choices[0].delta.content
+                    parts.append(text)
+                    yield Delta(text)
+        except openai.OpenAIError as exc:
+            raise provider_error(exc) from exc
+
+        yield Completion(
+            text=''.join(parts),
+            model=model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+
+class OfflineProvider:
+    """Answers from the compiled intent library, used when no API key is set"""
+
+    name = 'offline'
+    model = 'offline'
+
+    def answer(self, message):
+        """The offline response and suggestions for a message"""
+        match = get_intent_matcher().match(message)
+        if match is not None:
+            return match.intent.response, match.intent.suggestions
+        return (
+            f"That's an interesting question about '{message}'! I'd be happy to help you learn more. "
+            "Could you be more specific about what aspect you'd like to explore?",
+            DEFAULT_SUGGESTIONS,
+        )
+
+    def complete(self, messages, **params):
+        text, suggestions = self.answer(messages[-1]['content'])
+        return Completion(text=text, model=self.model, suggestions=list(suggestions))
+
+    def stream(self, messages, **params):
+        completion = self.complete(messages, **params)
+        words = completion.text.split(' ')
+        for index, word in enumerate(words):
+            yield Delta(word if index == len(words) - 1 else word + ' ')
+        yield completion
+
+    async def acomplete(self, messages, **params):
+        # The intent matcher may need to (re)load course content from the database
+        return await sync_to_async(self.complete)(messages, **params)
+
+    async def astream(self, messages, **params):
+        for item in await sync_to_async(list)(self.stream(messages, **params)):
+            yield item
+
+
+_providers = {}
+_lock = threading.Lock()
+
+
+def get_provider():
+    """The provider for this worker process, created on first use"""
+    # Keyed by pid so a forked worker never reuses its parent's sockets
+    pid = os.getpid()
+    provider = _providers.get(pid)
+    if provider is None:
+        with _lock:
+            provider = _providers.get(pid)
+            if provider is None:
+                _providers.clear()
+                provider = _providers[pid] = _create_provider()
+    return provider
+
+
+def _create_provider():
+    if not settings.AI_API_KEY:
+        return OfflineProvider()
+    return OpenAIProvider(
+        api_key=settings.AI_API_KEY,
+        base_url=settings.AI_API_URL,
+        model=settings.AI_MODEL,
+        timeout=settings.AI_TIMEOUT,
+    )
@@ -0,0 +1,152 @@
+"""
+Cheap local quality heuristics for AI-generated content.
+
+``score_generated_content`` scores draft content in chunks on a process
+pool, so this module imports nothing from Django: workers only get text.
+Each piece of content gets component scores between 0 and 1:
+
+* ``length``: how close its word count is to the range expected for its
+  content type.
+* ``readability``: Flesch reading ease, with syllables estimated from vowel
+  groups and code blocks left out. It is compared with the band that suits
+  the target level.
+* ``answer_key`` (quiz questions only): the share of the numbered questions
+  that have at least two lettered options and an answer naming one of them.
+
+The weighted mean of these is multiplied by originality: one minus the
+share of the content's word 5-gram shingles that already occur in a lesson
+or quiz question. The parent process hashes the reference shingles into one
+set, and each worker receives it once, when it starts.
+"""
+import re
+import zlib
+
+SHINGLE = 5  # words per shingle
+WEIGHTS = {'length': 1.0, 'readability': 1.0, 'answer_key': 2.0}
+WORD_RANGES = {
+    'quiz_question': (60, 400),
+    'course_material': (120, 900),
+    'explanation': (80, 700),
+    'example': (40, 600),
+    'exercise': (40, 500),
+    'feedback': (20, 300),
+}
+DEFAULT_WORD_RANGE = (50, 800)
+READING_EASE = {'beginner': (60, 80), 'intermediate': (45, 70), 'advanced': (30, 60)}
+DEFAULT_READING_EASE = (40, 75)
+EASE_FALLOFF = 30  # reading-ease points outside the band at which the score reaches 0
+
+_word = re.compile(r"[a-z0-9']+")
+_sentence_end = re.compile(r'[.!?]+(?:\s|$)')
+_vowel_groups = re.compile(r'[aeiouy]+')
+_code_block = re.compile(r'```.*?(?:```|$)', re.DOTALL)
+_question = re.compile(r'^\s*(?:q(?:uestion)?\s*)?(\d+)\s*[.):]\s+\S', re.IGNORECASE)
+_option = re.compile(r'^\s*\(?([a-d])[.)]\s+\S', re.IGNORECASE)
+_answer = re.compile(r'\banswer\s*(?:is\s*|[:\-]\s*)\(?([a-d])(?:[).:]|\s*$|\s+[-–])', re.IGNORECASE)
+_answer_key = re.compile(r'^\s*(?:answers?|answer\s+key)\s*:?\s*$', re.IGNORECASE)
+_key_entry = re.compile(r'(\d+)\s*[.):\-]\s*\(?([a-d])\b', re.IGNORECASE)
+
+
+def words(text):
+    return _word.findall(text.lower())
+
+
+def shingles(text):
+    """Hashes of the text's consecutive ``SHINGLE``-word sequences"""
+    tokens = words(text)
+    return {zlib.crc32(' '.join(tokens[i:i + SHINGLE]).encode()) for i in range(len(tokens) - SHINGLE + 1)}
+
+
+def band_score(value, low, high, falloff):
+    """1 inside ``[low, high]``, falling linearly to 0 ``falloff`` outside it"""
+    distance = low - value if value < low else value - high if value > high else 0
+    return max(0.0, 1 - distance / falloff)
+
+
+def length_score(text, content_type):
+    low, high = WORD_RANGES.get(content_type, DEFAULT_WORD_RANGE)
+    count = len(words(text))
+    if count < low:
+        return count / low
+    return band_score(count, low, high, high)
+
+
+def reading_ease(text):
+    prose = _code_block.sub(' ', text)
+    tokens = words(prose)
+    if not tokens:
+        return None
+    sentences = max(1, len(_sentence_end.findall(prose)))
+    syllables = sum(max(1, len(_vowel_groups.findall(token))) for token in tokens)
+    return 206.835 - 1.015 * len(tokens) / sentences - 84.6 * syllables / len(tokens)
+
+
+def readability_score(text, level):
+    ease = reading_ease(text)
+    if ease is None:
+        return 0.0
+    low, high = READING_EASE.get(level, DEFAULT_READING_EASE)
+    return band_score(ease, low, high, EASE_FALLOFF)
+
+
+def answer_key_score(text):
+    """Share of the numbered questions with two or more options and a valid answer"""
+    questions = {}
+    current = None
+    in_key = False
+    for line in text.splitlines():
+        if _answer_key.match(line):
+            in_key = True
+            continue
+        if in_key:
+            for number, letter in _key_entry.findall(line):
+                if int(number) in questions:
+                    questions[int(number)]['answer'] = letter.upper()
+            continue
+        question = _question.match(line)
+        if question:
+            current = questions.setdefault(int(question.group(1)), {'options': set(), 'answer': None})
+        elif current is not None:
+            option = _option.match(line)
+            if option:
+                current['options'].add(option.group(1).upper())
+        answer = _answer.search(line)
+        if answer and current is not None:
+            current['answer'] = answer.group(1).upper()
+
+    if not questions:
+        return 0.0
+    valid = sum(len(q['options']) >= 2 and q['answer'] in q['options'] for q in questions.values())
+    return valid / len(questions)
+
+
+def score_content(content_type, text, level, reference=frozenset()):
+    """``(quality score, component scores)`` for one piece of content"""
+    components = {
+        'length': length_score(text, content_type),
+        'readability': readability_score(text, level),
+    }
+    if content_type == 'quiz_question':
+        components['answer_key'] = answer_key_score(text)
+    quality = sum(WEIGHTS[name] * value for name, value in components.items()) / sum(
+        WEIGHTS[name] for name in components
+    )
+
+    own = shingles(text)
+    components['originality'] = 1 - len(own & reference) / len(own) if own else 1.0
+    return round(quality * components['originality'], 3), components
+
+
+_reference = frozenset()
+
+
+def init_worker(reference):
+    """Process pool initializer: keep the reference shingles for ``score_row``"""
+    global _reference
+    _reference = reference
+
+
+def score_row(row):
+    """``(content id, quality score)`` for an ``(id, content_type, content, target_level)`` row"""
+    content_id, content_type, text, level = row
+    return content_id, score_content(content_type, text, level, _reference)[0]
@@ -0,0 +1,218 @@
+"""
+Offline course recommendations by item-to-item collaborative filtering.
+
+``build_recommendations()`` (run nightly by the ``build_recommendations``
+command) rates every course a learner has touched from their enrollment
+status and progress, raised by their best quiz score in the course. The
+ratings form a sparse learner x course matrix, kept as coordinate arrays
+sorted by learner. Dense blocks of ``USER_BLOCK`` learners are cut from it
+on demand, so memory stays bounded however many learners there are.
+
+Course-to-course cosine similarities are accumulated over the blocks with
+one matrix product each, and shrunk towards zero for pairs that few learners
+share. A learner's confidence in a course they have not taken is the
+similarity-weighted average of their ratings, damped when little similarity
+supports it. The best ``top_k`` courses per learner replace their open
+course recommendations as ``PersonalizedRecommendation`` rows that carry
+everything the recommendations page shows, so the page is one indexed read.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from quizzes.models import UserQuizScore
+from .models import PersonalizedRecommendation
+
+STATUS_RATINGS = {'completed': 1.0, 'active': 0.4, 'paused': 0.25, 'dropped': 0.05}
+PROGRESS_WEIGHT = 0.5  # added to active and paused enrollments at 100% progress
+QUIZ_WEIGHT = 0.5  # added at a best quiz score of 100% in the course
+SHRINKAGE = 10  # learners in common at which a similarity keeps half its value
+SUPPORT = 1.0  # similarity behind a prediction at which it keeps half its confidence
+MIN_CONFIDENCE = 0.01
+USER_BLOCK = 1000
+
+OPEN_STATUSES = ('pending', 'viewed')
+ANSWERED_STATUSES = ('accepted', 'dismissed', 'completed')
+DEFAULT_TOP_K = 6
+DEFAULT_TTL = timedelta(days=7)
+
+
+@dataclass
+class Ratings:
+    """Sparse learner x course ratings in coordinate form, sorted by row"""
+    user_ids: np.ndarray  # row -> user id
+    course_ids: np.ndarray  # column -> course id
+    rows: np.ndarray
+    columns: np.ndarray
+    values: np.ndarray
+
+    def blocks(self, size=USER_BLOCK):
+        """``(first row, dense ratings)`` for consecutive blocks of learners"""
+        for start in range(0, len(self.user_ids), size):
+            stop = min(start + size, len(self.user_ids))
+            low, high = np.searchsorted(self.rows, [start, stop])
+            block = np.zeros((stop - start, len(self.course_ids)), dtype=np.float32)
+            block[self.rows[low:high] - start, self.columns[low:high]] = self.values[low:high]
+            yield start, block
+
+
+def load_ratings():
+    """Every learner's rating of every course they enrolled in or were quizzed on"""
+    ratings = {}
+    enrollments = Enrollment.objects.values_list('user_id', 'course_id', 'status', 'progress_percentage')
+    for user_id, course_id, status, progress in enrollments.iterator(chunk_size=5000):
+        rating = STATUS_RATINGS.get(status, 0.0)
+        if status in ('active', 'paused'):
+            rating += PROGRESS_WEIGHT * min(progress, 100.0) / 100
+        ratings[user_id, course_id] = rating
+
+    best_scores = {}
+    scores = UserQuizScore.objects.filter(quiz__course__isnull=False).values_list(
+        'user_id', 'quiz__course_id', 'best_percentage'
+    )
+    for user_id, course_id, percentage in scores.iterator(chunk_size=5000):
+        best_scores[user_id, course_id] = max(best_scores.get((user_id, course_id), 0.0), percentage)
+    for key, percentage in best_scores.items():
+        ratings[key] = min(1.0, ratings.get(key, 0.0) + QUIZ_WEIGHT * min(percentage, 100.0) / 100)
+
+    if not ratings:
+        return None
+    pairs = np.array(list(ratings), dtype=np.int64)
+    values = np.fromiter(ratings.values(), dtype=np.float32, count=len(ratings))
+    user_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    course_ids, columns = np.unique(pairs[:, 1], return_inverse=True)
+    order = np.argsort(rows, kind='stable')
+    return Ratings(user_ids, course_ids, rows[order], columns[order], values[order])
+
+
+def course_similarities(ratings):
+    """Shrunk cosine similarity between every pair of rated courses"""
+    size = len(ratings.course_ids)
+    products = np.zeros((size, size), dtype=np.float64)
+    overlap = np.zeros((size, size), dtype=np.float64)
+    for _, block in ratings.blocks():
+        products += block.T @ block
+        taken = (block > 0).astype(np.float32)
+        overlap += taken.T @ taken
+
+    norms = np.sqrt(np.diag(products))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = np.nan_to_num(products / np.outer(norms, norms))
+    similarity *= overlap / (overlap + SHRINKAGE)
+    np.fill_diagonal(similarity, 0)
+    return similarity.astype(np.float32)
+
+
+def score_block(block, similarity):
+    """Confidence (0-1) for each learner in ``block`` and each course"""
+    support = (block > 0).astype(np.float32) @ similarity
+    weighted = block @ similarity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        predicted = np.where(support > 0, weighted / support, 0)
+    return predicted * support / (support + SUPPORT)
+
+
+def top_courses(confidence, k):
+    """Columns and confidences of each row's ``k`` best courses, best first"""
+    k = min(k, confidence.shape[1])
+    top = np.argpartition(-confidence, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(confidence, top, axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def closed_courses(user_ids):
+    """``(user id, course id)`` pairs of course recommendations a learner already answered"""
+    return PersonalizedRecommendation.objects.filter(
+        user_id__in=user_ids, recommendation_type='course', status__in=ANSWERED_STATUSES
+    ).values_list('user_id', 'target_object_id')
+
+
+def recommendation_for(user_id, course, rank, confidence, because, expires_at):
+    return PersonalizedRecommendation(
+        user_id=user_id,
+        recommendation_type='course',
+        title=course.title,
+        description=course.short_description or course.description[:300],
+        reason=(
+            f"Learners who took {because.title} also took this course."
+            if because else "Recommended from your learning activity."
+        ),
+        target_object_type='course',
+        target_object_id=course.id,
+        confidence_score=round(float(confidence), 4),
+        based_on_data={
+            'source': 'item_cf',
+            'because_course_id': because.id if because else None,
+            'slug': course.slug,
+            'level': course.get_level_display(),
+            'duration_minutes': course.estimated_duration,
+            'lesson_count': course.lesson_count,
+        },
+        priority=min(rank, 10),
+        expires_at=expires_at,
+    )
+
+
+def build_recommendations(top_k=DEFAULT_TOP_K, ttl=DEFAULT_TTL, users=None):
+    """
+    Replace the open course recommendations of every learner, or only of the
+    learners whose ids are in ``users``; returns the number written.
+    Similarities always use every learner's ratings.
+    """
+    ratings = load_ratings()
+    if ratings is None:
+        return 0
+    similarity = course_similarities(ratings)
+
+    courses = Course.objects.filter(id__in=ratings.course_ids.tolist()).annotate(
+        lesson_count=Count('lessons')
+    ).only('id', 'title', 'slug', 'status', 'level', 'estimated_duration', 'short_description', 'description').in_bulk()
+    course_list = [courses.get(course_id) for course_id in ratings.course_ids.tolist()]
+    published = np.array([course is not None and course.status == 'published' for course in course_list])
+    column_of = {int(course_id): column for column, course_id in enumerate(ratings.course_ids)}
+    expires_at = timezone.now() + ttl
+
+    selected = None if users is None else np.asarray(list(users), dtype=np.int64)
+    written = 0
+    for start, block in ratings.blocks():
+        block_users = ratings.user_ids[start:start + len(block)]
+        if selected is not None:
+            keep = np.isin(block_users, selected)
+            if not keep.any():
+                continue
+            block, block_users = block[keep], block_users[keep]
+        user_ids = block_users.tolist()
+        row_of = {user_id: row for row, user_id in enumerate(user_ids)}
+        confidence = score_block(block, similarity)
+        confidence[:, ~published] = 0
+        confidence[block > 0] = 0
+        for user_id, course_id in closed_courses(user_ids):
+            if course_id in column_of:
+                confidence[row_of[user_id], column_of[course_id]] = 0
+
+        columns, scores = top_courses(confidence, top_k)
+        # The learner's course that contributes most to each recommendation
+        because = np.argmax(block[:, None, :] * similarity[columns], axis=2)
+
+        recommendations = []
+        for row, user_id in enumerate(user_ids):
+            for rank, (column, score, source) in enumerate(zip(columns[row], scores[row], because[row]), 1):
+                if score < MIN_CONFIDENCE:
+                    break
+                recommendations.append(recommendation_for(
+                    user_id, course_list[column], rank, score, course_list[source], expires_at
+                ))
+
+        with transaction.atomic():
+            PersonalizedRecommendation.objects.filter(
+                user_id__in=user_ids, recommendation_type='course', status__in=OPEN_STATUSES
+            ).delete()
+            PersonalizedRecommendation.objects.bulk_create(recommendations, batch_size=500)
+        written += len(recommendations)
+    return written
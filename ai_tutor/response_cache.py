@@ -0,0 +1,235 @@
+"""
+Semantic cache of tutor answers.
+
+Learners ask the same questions in slightly different words, so answers are
+cached under the normalized question plus its context (course or lesson the
+session is about, and the learner's level). A lookup first tries the exact
+normalized text, then looks for a close paraphrase: questions are embedded
+as hashed word and character n-gram vectors and compared with cosine
+similarity. Only entries in the same context that share a content word are
+scored, using an inverted index, so lookups stay fast as the cache grows.
+
+The cache lives in each worker's memory with LRU and TTL eviction. Hit and
+miss counts are also added to shared daily counters in the Django cache, so
+``tutor_cache_stats`` can report the hit rate across all workers.
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass, replace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+HASH_BUCKETS = 1 << 18
+STATS_KEY = 'tutor_cache:{day}:{name}'
+STATS_TTL = 60 * 60 * 24 * 35
+MAX_CANDIDATES = 50  # entries scored per lookup, those sharing the most words
+
+STOP_WORDS = frozenset(
+    'a an and are as at be can could define describe do does explain for from how i in '
+    'is it mean me meaning my of on or please tell the this to what whats when where '
+    'which who why with you your'.split()
+)
+
+_non_word = re.compile(r'[^a-z0-9+#]+')
+
+
+def normalize(question):
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return ' '.join(_non_word.sub(' ', question.lower()).split())
+
+
+def _stem(word):
+    # Plurals only: "networks" and "network" should share features
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def content_words(normalized):
+    return [_stem(word) for word in normalized.split() if word not in STOP_WORDS]
+
+
+def _bucket(feature):
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % HASH_BUCKETS
+
+
+def vectorize(normalized):
+    """L2-normalized sparse vector of hashed word uni/bigrams and character trigrams"""
+    words = content_words(normalized)
+    features = defaultdict(float)
+    for word in words:
+        features[_bucket('w:' + word)] += 1.0
+        padded = f' {word} '
+        for index in range(len(padded) - 2):
+            features[_bucket('c:' + padded[index:index + 3])] += 0.5
+    for first, second in zip(words, words[1:]):
+        features[_bucket(f'b:{first} {second}')] += 1.0
+
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    if not norm:
+        return {}
+    return {bucket: weight / norm for bucket, weight in features.items()}
+
+
+def cosine(left, right):
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(bucket, 0.0) for bucket, weight in left.items())
+
+
+@dataclass
+class _Entry:
+    context: tuple
+    words: frozenset
+    vector: dict
+    completion: object
+    expires_at: float
+
+
+class ResponseCache:
+    """Per-process LRU of tutor answers with paraphrase lookup"""
+
+    def __init__(self, max_entries=5000, ttl=86400, threshold=0.85):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def lookup(self, question, context):
+        """A cached ``Completion`` for the question in this context, or None"""
+        normalized = normalize(question)
+        key = (context, normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                key, entry = self._nearest(context, normalized, now)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            _count('misses')
+            return None
+        _count('hits')
+        return replace(entry.completion, prompt_tokens=0, completion_tokens=0, cached=True)
+
+    def store(self, question, context, completion):
+        """Remember an answer; the least recently used entries make room"""
+        normalized = normalize(question)
+        if not normalized or not completion.text:
+            return
+        key = (context, normalized)
+        entry = _Entry(
+            context=context,
+            words=frozenset(content_words(normalized)),
+            vector=vectorize(normalized),
+            completion=completion,
+            expires_at=time.monotonic() + self.ttl,
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for word in entry.words:
+                self._postings[(context, word)].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def _nearest(self, context, normalized, now):
+        shared = Counter()
+        for word in set(content_words(normalized)):
+            shared.update(self._postings.get((context, word), ()))
+        if not shared:
+            return None, None
+
+        vector = vectorize(normalized)
+        best_key, best_entry, best_score = None, None, self.threshold
+        for key, _ in shared.most_common(MAX_CANDIDATES):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                continue
+            score = cosine(vector, entry.vector)
+            if score >= best_score:
+                best_key, best_entry, best_score = key, entry, score
+        return best_key, best_entry
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for word in entry.words:
+            keys = self._postings.get((entry.context, word))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[(entry.context, word)]
+
+
+def _count(name):
+    key = STATS_KEY.format(day=timezone.localdate().isoformat(), name=name)
+    if not cache.add(key, 1, STATS_TTL):
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def shared_stats(day):
+    """Hits and misses recorded by every worker on ``day``"""
+    hits = cache.get(STATS_KEY.format(day=day.isoformat(), name='hits'), 0)
+    misses = cache.get(STATS_KEY.format(day=day.isoformat(), name='misses'), 0)
+    return hits, misses
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The response cache for this worker process"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    max_entries=settings.AI_RESPONSE_CACHE_SIZE,
+                    ttl=settings.AI_RESPONSE_CACHE_TTL,
+                    threshold=settings.AI_RESPONSE_CACHE_THRESHOLD,
+                )
+    return _response_cache
@@ -0,0 +1,402 @@
+"""
+BM25 retrieval over lesson content for grounded tutoring.
+
+Published lessons are cut into passages (overlapping windows of the lesson
+text, plus its key concepts and code example) and indexed with BM25. The
+index is an inverted file in CSR form: for each term, ``indptr`` delimits
+its run of passage ids in ``docs`` and precomputed BM25 weights in
+``weights``. A query adds up the weight runs of its terms with NumPy and
+takes the top k with ``argpartition``, which takes a few milliseconds.
+
+Segments are plain ``.npy`` files under ``AI_RETRIEVAL_INDEX_DIR``, opened
+with ``mmap_mode='r'``, so every worker on a host shares one copy through
+the page cache. That includes the passage text and lesson titles (UTF-8
+blobs cut by offset arrays) and the vocabulary (a sorted byte-string array
+looked up with ``searchsorted``); only a few statistics stay in
+``meta.json``. ``manifest.json`` (replaced atomically) names the live
+segments:
+
+* ``main``: all published lessons as of the last full build.
+* ``delta``: lessons changed since then, re-indexed from the database.
+  Their passages in ``main`` are masked out via ``deleted_lessons``.
+
+Saving a lesson, or a course's title or status, only queues its lessons as
+``LessonIndexUpdate`` rows (see ``ai_tutor.signals``); requests never write
+the index. ``build_lesson_index --pending`` re-indexes everything queued in
+one delta update. When the delta grows past ``MERGE_RATIO`` of the main
+segment, that update rebuilds everything into a new main segment. Workers pick up a new
+manifest within ``CHECK_INTERVAL`` seconds.
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from courses.models import Lesson
+from .models import LessonIndexUpdate
+from .response_cache import content_words, normalize
+
+logger = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 20
+CODE_CHARS = 2000  # of a lesson's code example kept as a passage
+MERGE_RATIO = 0.2  # delta passages, relative to main, that trigger a full rebuild
+MIN_MERGE_PASSAGES = 200
+CHECK_INTERVAL = 2.0  # seconds between manifest checks per process
+SEGMENT_GRACE = 60  # seconds an unreferenced segment is kept for workers still reading it
+
+ARRAYS = (
+    'indptr', 'docs', 'weights', 'lessons', 'courses', 'vocab',
+    'text', 'text_offsets', 'titles', 'title_offsets', 'title_ids',
+)
+
+
+@dataclass
+class Passage:
+    lesson_id: int
+    course_id: int
+    lesson_title: str
+    text: str
+    score: float
+
+
+def tokenize(text):
+    return content_words(normalize(text))
+
+
+def lesson_passages(lesson):
+    """The passages a lesson is indexed as"""
+    words = lesson.content.split()
+    passages = []
+    step = CHUNK_WORDS - CHUNK_OVERLAP
+    for start in range(0, len(words), step):
+        passages.append(' '.join(words[start:start + CHUNK_WORDS]))
+        if start + CHUNK_WORDS >= len(words):
+            break
+    if lesson.key_concepts.strip():
+        passages.append(f'Key concepts: {lesson.key_concepts.strip()}')
+    if lesson.code_example.strip():
+        passages.append(lesson.code_example.strip()[:CODE_CHARS])
+    return passages
+
+
+def documents(lessons):
+    """``(lesson_id, course_id, title, text)`` for every passage of the lessons"""
+    lessons = lessons.filter(course__status='published').only(
+        'id', 'course_id', 'title', 'content', 'key_concepts', 'code_example'
+    )
+    for lesson in lessons.iterator(chunk_size=500):
+        for text in lesson_passages(lesson):
+            yield lesson.id, lesson.course_id, lesson.title, text
+
+
+class Segment:
+    """One memory-mapped BM25 segment"""
+
+    def __init__(self, path):
+        self.path = path
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+        with open(os.path.join(path, 'meta.json')) as meta_file:
+            self.total_length = json.load(meta_file)['total_length']
+
+    def __len__(self):
+        return len(self.lessons)
+
+    def term_id(self, term):
+        key = term.encode()
+        if len(key) > self.vocab.itemsize:
+            return None  # longer than every term, and searchsorted would truncate it
+        position = int(np.searchsorted(self.vocab, key))
+        return position if position < len(self.vocab) and self.vocab[position] == key else None
+
+    def df(self, term):
+        term_id = self.term_id(term)
+        return 0 if term_id is None else int(self.indptr[term_id + 1] - self.indptr[term_id])
+
+    def scores(self, terms):
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in terms:
+            term_id = self.term_id(term)
+            if term_id is not None:
+                start, end = self.indptr[term_id], self.indptr[term_id + 1]
+                scores[self.docs[start:end]] += self.weights[start:end]  # ids are unique per term
+        return scores
+
+    def passage_text(self, index):
+        return unpack(self.text, self.text_offsets, index)
+
+    def lesson_title(self, index):
+        return unpack(self.titles, self.title_offsets, int(self.title_ids[index]))
+
+
+def pack(strings):
+    """UTF-8 blob of the strings and the ``len + 1`` offsets that cut it"""
+    encoded = [string.encode() for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def unpack(blob, offsets, index):
+    return bytes(blob[offsets[index]:offsets[index + 1]]).decode()
+
+
+def write_segment(root, docs, base=None):
+    """
+    Index ``docs`` into a new segment directory and return its name. A delta
+    segment passes the main segment as ``base`` so its BM25 statistics cover
+    both.
+    """
+    vocab, titles = {}, {}
+    term_ids, doc_ids, term_freqs = [], [], []
+    lengths, lessons, courses, title_ids, passages = [], [], [], [], []
+    for index, (lesson_id, course_id, title, text) in enumerate(docs):
+        counts = Counter(tokenize(f'{title} {text}'))
+        for term, count in counts.items():
+            term_ids.append(vocab.setdefault(term, len(vocab)))
+            doc_ids.append(index)
+            term_freqs.append(count)
+        lengths.append(sum(counts.values()))
+        lessons.append(lesson_id)
+        courses.append(course_id)
+        title_ids.append(titles.setdefault(title, len(titles)))
+        passages.append(text)
+
+    # Number terms in byte order so readers can binary-search the vocabulary
+    terms = sorted(vocab, key=str.encode)
+    renumber = np.empty(len(vocab), dtype=np.int64)
+    renumber[[vocab[term] for term in terms]] = np.arange(len(terms))
+
+    term_ids = renumber[np.asarray(term_ids, dtype=np.int64)]
+    doc_ids = np.asarray(doc_ids, dtype=np.int32)
+    term_freqs = np.asarray(term_freqs, dtype=np.float32)
+    lengths = np.asarray(lengths, dtype=np.float32)
+
+    df = np.bincount(term_ids, minlength=len(terms)).astype(np.float64)
+    count, total_length = len(passages), float(lengths.sum())
+    if base is not None:
+        df += [base.df(term) for term in terms]
+        count += len(base)
+        total_length += base.total_length
+    avgdl = total_length / count if count else 1.0
+    idf = np.log(1 + (count - df + 0.5) / (df + 0.5))
+
+    tf = term_freqs
+    norm = K1 * (1 - B + B * lengths[doc_ids] / avgdl)
+    weights = (idf[term_ids] * tf * (K1 + 1) / (tf + norm)).astype(np.float32)
+
+    order = np.argsort(term_ids, kind='stable')
+    text, text_offsets = pack(passages)
+    title_blob, title_offsets = pack(titles)
+    arrays = {
+        'indptr': np.concatenate(([0], np.cumsum(np.bincount(term_ids, minlength=len(terms))))).astype(np.int64),
+        'docs': doc_ids[order],
+        'weights': weights[order],
+        'lessons': np.asarray(lessons, dtype=np.int32),
+        'courses': np.asarray(courses, dtype=np.int32),
+        'vocab': np.asarray([term.encode() for term in terms], dtype=np.bytes_),
+        'text': text,
+        'text_offsets': text_offsets,
+        'titles': title_blob,
+        'title_offsets': title_offsets,
+        'title_ids': np.asarray(title_ids, dtype=np.int32),
+    }
+
+    name = f'segment-{uuid.uuid4().hex[:12]}'
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(path, f'{array_name}.npy'), array)
+    with open(os.path.join(path, 'meta.json'), 'w') as meta_file:
+        json.dump({'total_length': float(lengths.sum())}, meta_file)
+    return name
+
+
+class LessonIndex:
+    """The live segments, searched together"""
+
+    def __init__(self, root, manifest):
+        self.main = Segment(os.path.join(root, manifest['main']))
+        self.delta = Segment(os.path.join(root, manifest['delta'])) if manifest['delta'] else None
+        self.deleted = np.asarray(manifest['deleted_lessons'], dtype=np.int32)
+
+    def search(self, query, k=5, course_id=None, lesson_id=None):
+        """The ``k`` best passages for a query, optionally within one course or lesson"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        hits = []
+        for segment in (self.main, self.delta):
+            if segment is None or not len(segment):
+                continue
+            scores = segment.scores(terms)
+            if segment is self.main and len(self.deleted):
+                scores[np.isin(segment.lessons, self.deleted)] = 0
+            if course_id is not None:
+                scores[segment.courses != course_id] = 0
+            if lesson_id is not None:
+                scores[segment.lessons != lesson_id] = 0
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            hits.extend((float(scores[index]), segment, int(index)) for index in top if scores[index] > 0)
+
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [
+            Passage(
+                lesson_id=int(segment.lessons[index]),
+                course_id=int(segment.courses[index]),
+                lesson_title=segment.lesson_title(index),
+                text=segment.passage_text(index),
+                score=score,
+            )
+            for score, segment, index in hits[:k]
+        ]
+
+
+# Writing
+
+def index_root():
+    return str(settings.AI_RETRIEVAL_INDEX_DIR)
+
+
+@contextmanager
+def _write_lock():
+    """One index writer at a time across processes"""
+    root = index_root()
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, 'index.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield root
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_manifest(root):
+    try:
+        with open(os.path.join(root, 'manifest.json')) as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+
+
+def _publish(root, manifest):
+    temp = os.path.join(root, f'manifest.{uuid.uuid4().hex[:8]}.tmp')
+    with open(temp, 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(temp, os.path.join(root, 'manifest.json'))
+
+    # Drop segments no longer referenced once workers have had time to move on
+    live = {manifest['main'], manifest['delta']}
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.startswith('segment-') and name not in live and time.time() - os.path.getmtime(path) > SEGMENT_GRACE:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _rebuild(root):
+    name = write_segment(root, documents(Lesson.objects.all()))
+    manifest = {'main': name, 'delta': None, 'deleted_lessons': [], 'delta_lessons': []}
+    _publish(root, manifest)
+    return manifest
+
+
+def rebuild():
+    """Index every published lesson into a fresh main segment"""
+    started = timezone.now()
+    with _write_lock() as root:
+        manifest = _rebuild(root)
+    LessonIndexUpdate.objects.filter(queued_at__lte=started).delete()
+    return manifest
+
+
+def update_lessons(lesson_ids):
+    """Re-index lessons that were saved, deleted, or whose course changed"""
+    with _write_lock() as root:
+        manifest = _read_manifest(root)
+        if manifest is None:
+            return _rebuild(root)
+
+        main = Segment(os.path.join(root, manifest['main']))
+        delta_lessons = set(manifest['delta_lessons']) | set(lesson_ids)
+        docs = list(documents(Lesson.objects.filter(id__in=delta_lessons)))
+        if len(docs) > max(MIN_MERGE_PASSAGES, MERGE_RATIO * len(main)):
+            return _rebuild(root)
+
+        indexed = set(np.unique(main.lessons).tolist())
+        manifest = {
+            'main': manifest['main'],
+            'delta': write_segment(root, docs, base=main),
+            'deleted_lessons': sorted(set(manifest['deleted_lessons']) | (delta_lessons & indexed)),
+            'delta_lessons': sorted(delta_lessons),
+        }
+        _publish(root, manifest)
+        return manifest
+
+
+def update_pending():
+    """Re-index the lessons queued by saves; returns how many there were"""
+    started = timezone.now()
+    lesson_ids = list(
+        LessonIndexUpdate.objects.filter(queued_at__lte=started).values_list('lesson_id', flat=True)
+    )
+    if lesson_ids:
+        update_lessons(lesson_ids)
+        # Lessons saved again meanwhile were re-queued with a later time and stay
+        LessonIndexUpdate.objects.filter(lesson_id__in=lesson_ids, queued_at__lte=started).delete()
+    return len(lesson_ids)
+
+
+# Reading
+
+_state = {'index': None, 'stamp': None, 'checked_at': 0.0}
+_lock = threading.Lock()
+
+
+def get_lesson_index():
+    """This process's view of the index, or None if it has not been built"""
+    now = time.monotonic()
+    if now - _state['checked_at'] < CHECK_INTERVAL:
+        return _state['index']
+
+    with _lock:
+        root = index_root()
+        try:
+            stat = os.stat(os.path.join(root, 'manifest.json'))
+        except FileNotFoundError:
+            _state.update(index=None, stamp=None, checked_at=now)
+            return None
+
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp != _state['stamp']:
+            try:
+                _state['index'] = LessonIndex(root, _read_manifest(root))
+                _state['stamp'] = stamp
+            except (FileNotFoundError, TypeError):
+                # Replaced while we were loading it; keep the old view until the next check
+                logger.warning('Lesson index changed while loading; retrying shortly')
+        _state['checked_at'] = now
+        return _state['index']
+
+
+def search(query, k=5, course_id=None, lesson_id=None):
+    """Top passages from the shared index; empty until it has been built"""
+    index = get_lesson_index()
+    if index is None:
+        return []
+    return index.search(query, k=k, course_id=course_id, lesson_id=lesson_id)
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from courses.models import Course, Lesson
+from . import intents
+from .models import LessonIndexUpdate
+
+# Fields the lesson index is built from (see ai_tutor.retrieval.documents)
+INDEX_FIELDS = {
+    Course: ('status', 'title'),
+    Lesson: ('course_id', 'title', 'content', 'key_concepts', 'code_example'),
+}
+
+# Fields the intent matcher is built from (see ai_tutor.intents.content_intents)
+INTENT_FIELDS = {
+    Course: ('status', 'title', 'short_description', 'description'),
+    Lesson: ('course_id', 'title', 'key_concepts', 'learning_objectives'),
+}
+
+
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Lesson)
+def remember_content_changes(sender, instance, update_fields=None, **kwargs):
+    """Note which indexed or matched fields this save changes, for the post_save handlers"""
+    fields = tuple(dict.fromkeys(INDEX_FIELDS[sender] + INTENT_FIELDS[sender]))
+    if update_fields is not None:
+        fields = tuple(field for field in fields if field in update_fields or field.removesuffix('_id') in update_fields)
+    if instance._state.adding or not fields:
+        instance._content_changes = set()
+        return
+    old = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._content_changes = {
+        field for field in fields if old is None or old[field] != getattr(instance, field)
+    }
+
+
+def changed(instance, fields):
+    return getattr(instance, '_content_changes', None) is None or bool(instance._content_changes & set(fields))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Lesson)
+def invalidate_intents(sender, instance, created, **kwargs):
+    # Counter updates such as enrollment_count leave the matcher alone
+    if created or changed(instance, INTENT_FIELDS[sender]):
+        transaction.on_commit(intents.invalidate)
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Lesson)
+def invalidate_intents_on_delete(sender, **kwargs):
+    transaction.on_commit(intents.invalidate)
+
+
+@receiver(post_save, sender=Lesson)
+def queue_lesson(sender, instance, created, **kwargs):
+    if created or changed(instance, INDEX_FIELDS[Lesson]):
+        LessonIndexUpdate.queue([instance.id])
+
+
+@receiver(post_delete, sender=Lesson)
+def queue_deleted_lesson(sender, instance, **kwargs):
+    LessonIndexUpdate.queue([instance.id])
+
+
+@receiver(post_save, sender=Course)
+def queue_course_lessons(sender, instance, created, **kwargs):
+    # Publishing or unpublishing a course adds or removes all its lessons
+    if not created and changed(instance, INDEX_FIELDS[Course]):
+        LessonIndexUpdate.queue(instance.lessons.values_list('id', flat=True))
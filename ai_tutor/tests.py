@@ -1,3 +1,235 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from . import gateway, history, limits
+from .models import AITutorSession
+from .providers import Completion, ProviderError
+
+RATE_LIMITS = {'tutor': {'per_minute': 6, 'burst': 3}}  # a token every 10 seconds
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ai-tutor-tests'}}
+
+
+class SlowCache:
+    """The cache, with reads slow enough for concurrent requests to interleave"""
+
+    def get(self, *args, **kwargs):
+        value = cache.get(*args, **kwargs)
+        time.sleep(0.002)
+        return value
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+
+@override_settings(AI_RATE_LIMITS=RATE_LIMITS, CACHES=TEST_CACHES)
+class TakeTokenTests(SimpleTestCase):
+    """The GCRA bucket grants at most ``burst`` requests, then one per interval"""
+
+    def setUp(self):
+        cache.clear()
+        self.now = 1_000_000.0
+        clock = mock.patch.object(limits.time, 'time', lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_burst_then_refill(self):
+        self.assertEqual([limits.take_token(1, 'tutor') for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(limits.take_token(1, 'tutor'), 10.0)
+
+        self.now += 9.9
+        self.assertGreater(limits.take_token(1, 'tutor'), 0)
+        self.now += 0.1
+        self.assertEqual(limits.take_token(1, 'tutor'), 0.0)
+        self.assertGreater(limits.take_token(1, 'tutor'), 0)
+
+    def test_buckets_are_per_user(self):
+        for _ in range(3):
+            limits.take_token(1, 'tutor')
+        self.assertGreater(limits.take_token(1, 'tutor'), 0)
+        self.assertEqual(limits.take_token(2, 'tutor'), 0.0)
+
+    def test_concurrent_requests_never_exceed_burst(self):
+        barrier = threading.Barrier(20)
+
+        def request(_):
+            barrier.wait()
+            return limits.take_token(1, 'tutor')
+
+        with mock.patch.object(limits, 'cache', SlowCache()), ThreadPoolExecutor(max_workers=20) as pool:
+            waits = list(pool.map(request, range(20)))
+
+        self.assertEqual(sum(wait == 0 for wait in waits), 3)
+        self.assertIsNone(cache.get(limits.LOCK_KEY.format(key=limits.BUCKET_KEY.format(scope='tutor', user_id=1))))
+
+    def test_held_lock_refuses_request(self):
+        key = limits.BUCKET_KEY.format(scope='tutor', user_id=1)
+        cache.add(limits.LOCK_KEY.format(key=key), 1)
+
+        with mock.patch.object(limits, 'LOCK_WAIT', 0):
+            self.assertAlmostEqual(limits.take_token(1, 'tutor'), 10.0)
+        self.assertIsNone(cache.get(key))
+
+
+class SessionCursorTests(TestCase):
+    """Session list cursors survive encoding and page without gaps or repeats"""
+
+    def test_round_trip(self):
+        session = SimpleNamespace(last_activity=timezone.now(), id=42)
+        self.assertEqual(
+            history.decode_cursor(history.encode_cursor(session)), (session.last_activity, 42)
+        )
+
+    def test_invalid_cursor(self):
+        for cursor in ('', 'not base64!', 'bm8gc2VwYXJhdG9y', 'eHx5'):
+            with self.assertRaises(history.CursorError):
+                history.decode_cursor(cursor)
+
+    def test_pages_through_equal_timestamps(self):
+        user = User.objects.create_user(username='learner', password='pass')
+        for n in range(5):
+            AITutorSession.objects.create(user=user, session_id=f'session-{n}')
+        # Two pairs share a last_activity, so the id breaks the tie
+        now = timezone.now()
+        for n, minutes in enumerate((1, 1, 2, 3, 3)):
+            AITutorSession.objects.filter(session_id=f'session-{n}').update(
+                last_activity=now - timedelta(minutes=minutes)
+            )
+
+        seen, cursor = [], None
+        while True:
+            page = list(history.sessions_after(AITutorSession.objects.filter(user=user), cursor)[:2])
+            if not page:
+                break
+            seen += [session.session_id for session in page]
+            cursor = history.encode_cursor(page[-1])
+
+        self.assertEqual(seen, [f'session-{n}' for n in (1, 0, 2, 4, 3)])
+
+
+class MessageCursorTests(SimpleTestCase):
+    """Message paging parameters are validated before they reach a query"""
+
+    def test_parses_cursors(self):
+        cursors = history.message_cursors({'before': '120', 'since': '2026-01-02T03:04:05 00:00'})
+        self.assertEqual(cursors['before'], 120)
+        self.assertEqual(cursors['since'].utcoffset(), timedelta(0))
+
+    def test_rejects_bad_values(self):
+        for params in ({'before': 'abc'}, {'after': '-1'}, {'since': 'yesterday'}):
+            with self.assertRaises(history.CursorError):
+                history.message_cursors(params)
+        with self.assertRaises(history.CursorError):
+            history.page_size('0', history.MESSAGE_PAGE_SIZE)
+        self.assertEqual(history.page_size('1000', 50), history.MAX_PAGE_SIZE)
+
+
+class FakeProvider:
+    """Fails with the queued errors, then answers; async answers take the queued delays"""
+
+    name = 'fake'
+    model = 'fake-model'
+
+    def __init__(self, errors=(), delays=()):
+        self.errors = list(errors)
+        self.delays = list(delays)
+        self.calls = 0
+
+    def complete(self, messages, timeout=None, **params):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return Completion(text=f'answer {self.calls}', model=self.model)
+
+    async def acomplete(self, messages, timeout=None, **params):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delays.pop(0) if self.delays else 0)
+        return Completion(text=f'answer {call}', model=self.model)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GatewayTests(SimpleTestCase):
+    """Retries, the circuit breaker and hedged requests"""
+
+    def setUp(self):
+        no_backoff = mock.patch.object(gateway, 'backoff', lambda retry: 0)
+        no_backoff.start()
+        self.addCleanup(no_backoff.stop)
+
+    def gateway(self, provider, **options):
+        breaker = gateway.CircuitBreaker(failures=2, cooldown=30)
+        return gateway.Gateway(provider, 'tutor', timeout=5, breaker=breaker, **options)
+
+    def test_retries_retryable_errors(self):
+        provider = FakeProvider(errors=[ProviderError('busy', retryable=True)])
+        tutor = self.gateway(provider, retries=1)
+
+        self.assertEqual(tutor.complete([]).text, 'answer 2')
+        self.assertEqual(tutor.retried, 1)
+        self.assertEqual(tutor.breaker.state, 'closed')
+
+    def test_does_not_retry_invalid_requests(self):
+        provider = FakeProvider(errors=[ProviderError('bad request')])
+        tutor = self.gateway(provider, retries=3)
+
+        with self.assertRaises(ProviderError):
+            tutor.complete([])
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(tutor.breaker.consecutive, 0)
+
+    def test_circuit_opens_and_recovers(self):
+        errors = [ProviderError('down', retryable=True) for _ in range(2)]
+        tutor = self.gateway(FakeProvider(errors=errors))
+        clock = 1000.0
+
+        with mock.patch.object(gateway.time, 'monotonic', lambda: clock):
+            for _ in range(2):
+                with self.assertRaises(ProviderError):
+                    tutor.complete([])
+            self.assertEqual(tutor.breaker.state, 'open')
+            with self.assertRaises(gateway.CircuitOpen):
+                tutor.complete([])
+            self.assertEqual(tutor.rejected, 1)
+
+            # After the cooldown one trial call goes through and closes the circuit
+            clock += 30
+            self.assertEqual(tutor.complete([]).text, 'answer 3')
+            self.assertEqual(tutor.breaker.state, 'closed')
+
+    def test_half_open_allows_one_trial(self):
+        breaker = gateway.CircuitBreaker(failures=1, cooldown=30)
+        clock = 1000.0
+        with mock.patch.object(gateway.time, 'monotonic', lambda: clock):
+            breaker.record(False)
+            clock += 30
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record(False)
+            self.assertEqual(breaker.state, 'open')
+            self.assertFalse(breaker.allow())
+
+    def test_hedges_slow_requests(self):
+        provider = FakeProvider(delays=[1.0, 0.0])
+        tutor = self.gateway(provider, hedge_after=0.05)
+
+        completion = asyncio.run(tutor.acomplete([]))
+        self.assertEqual(completion.text, 'answer 2')
+        self.assertEqual(tutor.hedged, 1)
+
+    def test_fast_requests_are_not_hedged(self):
+        provider = FakeProvider()
+        tutor = self.gateway(provider, hedge_after=0.5)
+
+        self.assertEqual(asyncio.run(tutor.acomplete([])).text, 'answer 1')
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(tutor.hedged, 0)
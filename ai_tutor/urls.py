@@ -12,12 +12,16 @@ urlpatterns = [
     
     # Chat messages
     path('api/send-message/', views.SendMessageView.as_view(), name='send_message'),
+    path('api/stream-message/', views.StreamMessageView.as_view(), name='stream_message'),
     path('api/get-messages/<str:session_id>/', views.GetMessagesView.as_view(), name='get_messages'),
     
     # AI-generated content
     path('generate/content/', views.GenerateContentView.as_view(), name='generate_content'),
     path('generate/quiz-questions/', views.GenerateQuizQuestionsView.as_view(), name='generate_quiz_questions'),
     path('generate/explanations/', views.GenerateExplanationsView.as_view(), name='generate_explanations'),
+    path('api/generation-jobs/', views.CreateGenerationJobView.as_view(), name='create_generation_job'),
+    path('api/generation-jobs/<int:job_id>/', views.GenerationJobView.as_view(), name='generation_job'),
+    path('api/generation-jobs/<int:job_id>/events/', views.GenerationJobEventsView.as_view(), name='generation_job_events'),
     
     # Personalized recommendations
     path('recommendations/', views.RecommendationsView.as_view(), name='recommendations'),
@@ -32,5 +36,6 @@ urlpatterns = [
     
     # Session management
     path('sessions/', views.ChatSessionListView.as_view(), name='session_list'),
+    path('api/sessions/', views.SessionListAPIView.as_view(), name='session_list_api'),
     path('sessions/<str:session_id>/rate/', views.RateSessionView.as_view(), name='rate_session'),
 ]
\ No newline at end of file
@@ -1,14 +1,33 @@
-from django.shortcuts import render
+from django.views import View
 from django.views.generic import TemplateView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.shortcuts import redirect
-from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from asgiref.sync import sync_to_async
+from rest_framework.authentication import CSRFCheck, TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from dataclasses import dataclass
+import asyncio
 import json
+import logging
 import time
-import random
+import uuid
+from .context import build_context
+from .limits import check_limits, too_many_requests
+from .intents import get_intent_matcher, IntentMatch
+from .models import AITutorSession, AITutorMessage, GenerationJob
+from . import generation, history, retrieval
+from .recommender import OPEN_STATUSES
+from .gateway import afallback_completion, get_gateway
+from .providers import get_provider, build_messages, Delta, ProviderError
+from .response_cache import get_response_cache
+
+logger = logging.getLogger(__name__)
 
 
 class AIChatView(LoginRequiredMixin, TemplateView):
@@ -40,150 +59,556 @@ class EndChatSessionView(LoginRequiredMixin, TemplateView):
         return redirect('ai_tutor:chat')
 
 
-@method_decorator(csrf_exempt, name='dispatch')
-class SendMessageView(LoginRequiredMixin, TemplateView):
-    """Send message to AI"""
-    def post(self, request, *args, **kwargs):
+
+async def get_chat_session(user, data, first_message):
+    """
+    The user's session for ``data['session_id']``, or a new one when no id is
+    given. New sessions can be scoped to a course, lesson or quiz with
+    ``context_type``, ``context_object_type`` and ``context_object_id``.
+    """
+    session_id = data.get('session_id')
+    if session_id:
+        return await AITutorSession.objects.filter(user=user, session_id=session_id).afirst()
+    
+    context_type = data.get('context_type', 'general')
+    if context_type not in dict(AITutorSession.CONTEXT_CHOICES):
+        context_type = 'general'
+    try:
+        context_object_id = int(data['context_object_id'])
+    except (KeyError, TypeError, ValueError):
+        context_object_id = None
+    
+    return await AITutorSession.objects.acreate(
+        user=user,
+        session_id=uuid.uuid4().hex,
+        title=first_message[:200],
+        context_type=context_type,
+        context_object_type=str(data.get('context_object_type', ''))[:50] if context_object_id else '',
+        context_object_id=context_object_id
+    )
+
+
+def response_cache_context(user, session, context):
+    """
+    The response cache context for a turn, or None when the answer must not
+    be cached: follow-up questions depend on the conversation so far, and
+    offline answers cost nothing to recompute.
+    """
+    if context or get_provider().name == 'offline':
+        return None
+    return (session.context_object_type, session.context_object_id, user.learning_level)
+
+
+async def save_exchange(turn, completion=None):
+    """
+    Persist the user's message and, unless the provider failed, the answer
+    with its token usage, together in one transaction. Returns the answer.
+    """
+    messages = [AITutorMessage(session=turn.session, sender='user', content=turn.message)]
+    if completion is not None:
+        messages.append(AITutorMessage(
+            session=turn.session,
+            sender='ai',
+            content=completion.text,
+            ai_model=completion.model,
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=completion.completion_tokens,
+            total_tokens=completion.total_tokens,
+            token_count=completion.completion_tokens
+        ))
+    created = await sync_to_async(AITutorMessage.create_exchange)(turn.session, messages)
+    return created[-1]
+
+
+GROUNDING_PASSAGES = 3  # lesson passages sent with each LLM question
+
+
+def grounding_passages(session, question):
+    """Lesson passages relevant to a question, from the session's course or lesson when it has one"""
+    scope = {}
+    if session.context_object_type in ('course', 'lesson') and session.context_object_id:
+        scope = {f'{session.context_object_type}_id': session.context_object_id}
+    passages = retrieval.search(question, k=GROUNDING_PASSAGES, **scope)
+    if not passages and scope:
+        passages = retrieval.search(question, k=GROUNDING_PASSAGES)
+    return passages
+
+
+def grounding_notes(passages):
+    """A system note quoting the passages the answer should be based on"""
+    if not passages:
+        return ()
+    sources = '\n\n'.join(
+        f'[{index}] {passage.lesson_title}: {passage.text}' for index, passage in enumerate(passages, 1)
+    )
+    return (
+        'Relevant IntelliLearn course material. Base your answer on it where it applies '
+        f'and name the lesson you drew on:\n\n{sources}',
+    )
+
+
+def routing_notes(match):
+    """System notes pointing the provider at the lesson or course a question is about"""
+    if match is None or match.intent.course_id is None:
+        return ()
+    kind = 'lesson' if match.intent.lesson_id else 'course'
+    return (
+        f'The learner\'s question relates to the {kind} "{match.intent.name}" '
+        f'(matched: {", ".join(match.phrases)}). Answer in terms of that {kind} '
+        f'and refer the learner to it where it helps.',
+    )
+
+
+@dataclass
+class TutorTurn:
+    """A validated tutor question, ready to send to the provider"""
+    session: AITutorSession
+    message: str
+    chat_messages: list
+    cache_context: tuple = None
+    intent: IntentMatch = None
+    
+    def with_suggestions(self, completion):
+        """Fall back to the matched intent's suggestions when the provider gave none"""
+        if self.intent is not None and not completion.suggestions:
+            completion.suggestions = list(self.intent.intent.suggestions)
+        return completion
+
+
+def sse_event(event, data):
+    """Encode one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def token_user(request):
+    """The user for a DRF ``Authorization: Token`` header, if it is valid"""
+    try:
+        result = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def csrf_failure(request):
+    """The reason a cookie-authenticated request fails the CSRF check, if it does"""
+    check = CSRFCheck(lambda request: None)
+    check.process_request(request)
+    return check.process_view(request, None, (), {})
+
+
+class AsyncTutorView(View):
+    """
+    Base for the async tutor endpoints.
+    
+    Served through ``intellilearn/asgi.py`` these views await the provider on
+    the event loop instead of holding a worker thread for the whole answer.
+    Accepts the session cookie or, for the mobile app, an API token. The
+    views are ``csrf_exempt`` so that token requests get through, and
+    cookie-authenticated requests are CSRF-checked here instead. POSTs
+    to views with a ``rate_limit_scope`` are refused with a 429 when the user
+    is over their rate limit or daily token quota.
+    """
+    rate_limit_scope = None
+    
+    async def dispatch(self, request, *args, **kwargs):
+        user = None
+        if 'HTTP_AUTHORIZATION' in request.META:
+            user = await sync_to_async(token_user)(request)
+        if user is None:
+            user = await request.auser()
+            reason = csrf_failure(request) if user.is_authenticated else None
+            if reason:
+                return JsonResponse({'error': f'CSRF Failed: {reason}'}, status=403)
+        if not user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        request.user = user
+        
+        if self.rate_limit_scope and request.method == 'POST':
+            exceeded = await sync_to_async(check_limits)(user, self.rate_limit_scope)
+            if exceeded:
+                return too_many_requests(exceeded)
+        return await super().dispatch(request, *args, **kwargs)
+    
+    async def start_turn(self, request):
+        """Validate the request and build the prompt; messages are stored with the answer"""
         try:
             data = json.loads(request.body)
-            user_message = data.get('message', '')
-            
-            if not user_message:
-                return JsonResponse({'error': 'Message cannot be empty'}, status=400)
-            
-            # Simulate AI processing time
-            time.sleep(1 + random.uniform(0.5, 1.5))
-            
-            # Generate AI response based on message content
-            ai_response = self.generate_ai_response(user_message)
-            
-            return JsonResponse({
-                'success': True,
-                'user_message': user_message,
-                'ai_response': ai_response,
-                'timestamp': time.time()
-            })
-            
         except json.JSONDecodeError:
-            return JsonResponse({'error': 'Invalid JSON data'}, status=400)
-        except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
+            return None, JsonResponse({'error': 'Invalid JSON data'}, status=400)
+        
+        user_message = data.get('message', '').strip()
+        if not user_message:
+            return None, JsonResponse({'error': 'Message cannot be empty'}, status=400)
+        
+        session = await get_chat_session(request.user, data, user_message)
+        if session is None:
+            return None, JsonResponse({'error': 'Chat session not found'}, status=404)
+        
+        context = await sync_to_async(build_context)(session)
+        
+        # The offline provider answers from the intents itself; the LLM gets
+        # the matched lesson or course and the closest lesson passages.
+        intent, passages = None, []
+        if get_provider().name != 'offline':
+            matcher = await sync_to_async(get_intent_matcher)()
+            intent = matcher.match(user_message)
+            passages = await sync_to_async(grounding_passages)(session, user_message)
+        notes = context.notes + routing_notes(intent) + grounding_notes(passages)
+        
+        return TutorTurn(
+            session=session,
+            message=user_message,
+            chat_messages=build_messages(user_message, context.history, notes=notes),
+            cache_context=response_cache_context(request.user, session, context),
+            intent=intent
+        ), None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class SendMessageView(AsyncTutorView):
+    """Send message to AI and return the complete response"""
+    rate_limit_scope = 'tutor'
     
-    def generate_ai_response(self, message):
-        """Generate AI response based on user message"""
-        message_lower = message.lower()
+    async def post(self, request, *args, **kwargs):
+        turn, error = await self.start_turn(request)
+        if error:
+            return error
+        response_cache = get_response_cache()
         
-        # AI response patterns
-        responses = {
-            'machine learning': {
-                'response': "Machine learning is a powerful subset of AI that enables computers to learn and improve from data without being explicitly programmed. It's like teaching a computer to recognize patterns and make predictions based on examples.",
-                'suggestions': ['Tell me about supervised learning', 'What are ML algorithms?', 'Show me Python examples']
-            },
-            'neural network': {
-                'response': "Neural networks are computing systems inspired by biological neural networks. They consist of interconnected nodes (neurons) that process information in layers - input layer, hidden layers, and output layer. Each connection has a weight that gets adjusted during training.",
-                'suggestions': ['Explain backpropagation', 'Types of neural networks', 'How to build one?']
-            },
-            'deep learning': {
-                'response': "Deep learning is a subset of machine learning that uses neural networks with multiple hidden layers (hence 'deep'). It's particularly powerful for complex tasks like image recognition, natural language processing, and speech recognition.",
-                'suggestions': ['CNN vs RNN', 'Popular frameworks', 'Real-world applications']
-            },
-            'python': {
-                'response': "Python is an excellent choice for AI development! It offers powerful libraries like TensorFlow, PyTorch, scikit-learn, and NumPy. Its simple syntax makes it perfect for both beginners and experts in AI development.",
-                'suggestions': ['Show me AI libraries', 'Python ML tutorial', 'Best practices']
-            },
-            'quiz': {
-                'response': "I'd love to quiz you! Here's a question: What is the main difference between supervised and unsupervised learning? \n\nA) Supervised uses labeled data, unsupervised doesn't\nB) Supervised is faster\nC) No difference",
-                'suggestions': ['Answer: A', 'Answer: B', 'Explain the difference']
-            },
-            'computer vision': {
-                'response': "Computer vision enables computers to interpret and understand visual information from images and videos. It involves techniques like image classification, object detection, facial recognition, and image segmentation using deep learning models like CNNs.",
-                'suggestions': ['CNN architecture', 'Object detection', 'Image preprocessing']
-            },
-            'nlp': {
-                'response': "Natural Language Processing (NLP) helps computers understand, interpret, and generate human language. It includes tasks like sentiment analysis, language translation, text summarization, and chatbots (like me!).",
-                'suggestions': ['Transformer models', 'BERT and GPT', 'Text preprocessing']
-            },
-            'algorithm': {
-                'response': "AI algorithms are step-by-step procedures for solving problems. Common types include: Linear Regression (prediction), Decision Trees (classification), K-means (clustering), and Neural Networks (complex pattern recognition).",
-                'suggestions': ['Compare algorithms', 'When to use which?', 'Algorithm complexity']
-            }
-        }
+        completion = response_cache.lookup(turn.message, turn.cache_context) if turn.cache_context else None
+        if completion is None:
+            try:
+                completion = turn.with_suggestions(await get_gateway('tutor').acomplete(turn.chat_messages))
+            except ProviderError as e:
+                logger.warning('Answering offline, the AI provider failed: %s', e)
+                completion = await afallback_completion(turn.chat_messages)
+            else:
+                if turn.cache_context:
+                    response_cache.store(turn.message, turn.cache_context, completion)
         
-        # Find matching response
-        for keyword, response_data in responses.items():
-            if keyword in message_lower:
-                return response_data
+        ai_message = await save_exchange(turn, completion)
         
-        # Default response for unmatched queries
-        return {
-            'response': f"That's an interesting question about '{message}'! I'd be happy to help you learn more. Could you be more specific about what aspect you'd like to explore?",
-            'suggestions': ['Explain basics', 'Show examples', 'Give me a quiz']
-        }
+        return JsonResponse({
+            'success': True,
+            'session_id': turn.session.session_id,
+            'message_id': ai_message.id,
+            'user_message': turn.message,
+            'ai_response': {
+                'response': completion.text,
+                'suggestions': completion.suggestions
+            },
+            'usage': {
+                'prompt_tokens': completion.prompt_tokens,
+                'completion_tokens': completion.completion_tokens
+            },
+            'cached': completion.cached,
+            'fallback': completion.fallback,
+            'timestamp': time.time()
+        })
 
 
-class GetMessagesView(LoginRequiredMixin, TemplateView):
-    """Get chat messages"""
-    def get(self, request, *args, **kwargs):
-        return JsonResponse({'messages': []})
+@method_decorator(csrf_exempt, name='dispatch')
+class StreamMessageView(AsyncTutorView):
+    """
+    Send message to AI and stream the response as Server-Sent Events.
+    
+    Emits a ``session`` event, one ``token`` event per text fragment as the
+    provider produces it, then ``done`` with the stored message id and token
+    usage (or ``error`` if the provider fails mid-stream). A cached answer is
+    sent as a single ``token`` event.
+    """
+    rate_limit_scope = 'tutor'
+    
+    async def post(self, request, *args, **kwargs):
+        turn, error = await self.start_turn(request)
+        if error:
+            return error
+        response = StreamingHttpResponse(
+            self.stream_events(turn),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+    
+    async def stream_events(self, turn):
+        yield sse_event('session', {'session_id': turn.session.session_id})
+        response_cache = get_response_cache()
+        
+        completion = response_cache.lookup(turn.message, turn.cache_context) if turn.cache_context else None
+        if completion is not None:
+            yield sse_event('token', {'text': completion.text})
+        else:
+            streamed = False
+            try:
+                async for item in get_gateway('tutor').astream(turn.chat_messages):
+                    if isinstance(item, Delta):
+                        streamed = True
+                        yield sse_event('token', {'text': item.text})
+                    else:
+                        completion = turn.with_suggestions(item)
+            except ProviderError as e:
+                if streamed:
+                    await save_exchange(turn)
+                    yield sse_event('error', {'error': f'AI tutor is unavailable: {e}'})
+                    return
+                logger.warning('Answering offline, the AI provider failed: %s', e)
+                completion = await afallback_completion(turn.chat_messages)
+                yield sse_event('token', {'text': completion.text})
+            else:
+                if turn.cache_context:
+                    response_cache.store(turn.message, turn.cache_context, completion)
+        
+        ai_message = await save_exchange(turn, completion)
+        yield sse_event('done', {
+            'message_id': ai_message.id,
+            'suggestions': completion.suggestions,
+            'prompt_tokens': completion.prompt_tokens,
+            'completion_tokens': completion.completion_tokens,
+            'cached': completion.cached,
+            'fallback': completion.fallback
+        })
+
+
+def message_payload(message):
+    return {
+        'id': message.id,
+        'sender': message.sender,
+        'message_type': message.message_type,
+        'content': message.content,
+        'created_at': message.created_at.isoformat()
+    }
+
+
+class GetMessagesView(AsyncTutorView):
+    """
+    One page of a chat session's messages, oldest first: the latest page,
+    the page ``before`` a message id, or the messages ``after`` a message id
+    or ``since`` a timestamp (see ``ai_tutor.history``)
+    """
+    async def get(self, request, *args, **kwargs):
+        session = await AITutorSession.objects.filter(
+            user=request.user, session_id=kwargs['session_id']
+        ).afirst()
+        if session is None:
+            return JsonResponse({'error': 'Chat session not found'}, status=404)
+        
+        try:
+            limit = history.page_size(request.GET.get('limit'), history.MESSAGE_PAGE_SIZE)
+            queryset, newer = history.messages_page_query(session, **history.message_cursors(request.GET))
+        except history.CursorError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        
+        rows = [message async for message in queryset[:limit + 1]]
+        page, has_more = history.split_page(rows, limit, newer)
+        return JsonResponse({
+            'session_id': session.session_id,
+            'total_messages': session.total_messages,
+            'messages': [message_payload(message) for message in page],
+            'has_more': has_more,
+            'oldest_id': page[0].id if page else None,
+            'newest_id': page[-1].id if page else None,
+        })
+
+
+def session_payload(session):
+    return {
+        'session_id': session.session_id,
+        'title': session.title,
+        'status': session.status,
+        'context_type': session.context_type,
+        'total_messages': session.total_messages,
+        'started_at': session.started_at.isoformat(),
+        'last_activity': session.last_activity.isoformat(),
+    }
+
+
+class SessionListAPIView(AsyncTutorView):
+    """The user's chat sessions by latest activity, keyset paged with ``?cursor=``"""
+    async def get(self, request, *args, **kwargs):
+        try:
+            limit = history.page_size(request.GET.get('limit'), history.SESSION_PAGE_SIZE)
+            sessions = history.sessions_after(
+                AITutorSession.objects.filter(user=request.user), request.GET.get('cursor')
+            )
+        except history.CursorError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        
+        page = [session async for session in sessions[:limit + 1]]
+        has_more = len(page) > limit
+        page = page[:limit]
+        return JsonResponse({
+            'sessions': [session_payload(session) for session in page],
+            'next_cursor': history.encode_cursor(page[-1]) if has_more else None,
+        })
 
 
 class GenerateContentView(LoginRequiredMixin, TemplateView):
     """Generate AI content"""
     template_name = 'ai_tutor/generate_content.html'
+    default_kind = 'explanation'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'AI Content Generator'
         context['content_types'] = [
-            {'value': 'explanation', 'label': 'Explanation'},
-            {'value': 'quiz', 'label': 'Quiz Questions'},
-            {'value': 'summary', 'label': 'Summary'},
-            {'value': 'examples', 'label': 'Code Examples'},
-            {'value': 'analogy', 'label': 'Simple Analogies'}
+            {'value': value, 'label': label} for value, label in GenerationJob.KIND_CHOICES
         ]
+        context['default_kind'] = self.default_kind
+        context['recent_jobs'] = GenerationJob.objects.filter(
+            user=self.request.user
+        ).select_related('content')[:5]
         return context
     
     def post(self, request, *args, **kwargs):
-        """Handle content generation requests"""
-        content_type = request.POST.get('content_type')
-        topic = request.POST.get('topic')
+        """Queue a content generation job (the page's script uses the jobs API instead)"""
+        content_type = request.POST.get('content_type', self.default_kind)
+        topic = request.POST.get('topic', '').strip()
         difficulty = request.POST.get('difficulty', 'beginner')
         
         if not topic:
             messages.error(request, 'Please provide a topic for content generation.')
             return self.get(request, *args, **kwargs)
         
-        # Simulate content generation
-        generated_content = self.generate_content(content_type, topic, difficulty)
-        
-        context = self.get_context_data(**kwargs)
-        context['generated_content'] = generated_content
-        context['show_result'] = True
+        exceeded = check_limits(request.user, 'generate')
+        if exceeded:
+            messages.error(request, exceeded.message)
+            response = self.get(request, *args, **kwargs)
+            response.status_code = 429
+            response['Retry-After'] = str(exceeded.retry_after)
+            return response
         
-        return render(request, self.template_name, context)
-    
-    def generate_content(self, content_type, topic, difficulty):
-        """Generate content based on parameters"""
-        # This would integrate with actual AI content generation in production
-        templates = {
-            'explanation': f"Here's a {difficulty}-level explanation of {topic}: This is an AI-generated explanation that would provide comprehensive coverage of the topic with examples and clear explanations.",
-            'quiz': f"Generated quiz for {topic} ({difficulty} level): 1. What is the main concept of {topic}? 2. How does {topic} work in practice?",
-            'summary': f"Summary of {topic}: Key points and essential concepts explained at {difficulty} level.",
-            'examples': f"Code examples for {topic}: Practical implementations and use cases at {difficulty} level.",
-            'analogy': f"Simple analogy for {topic}: Think of {topic} like... (analogy would be generated here)"
+        if content_type not in GenerationJob.CONTENT_TYPES:
+            content_type = self.default_kind
+        if difficulty not in ('beginner', 'intermediate', 'advanced'):
+            difficulty = 'beginner'
+        job = generation.submit(request.user, content_type, topic, difficulty)
+        if job.status == 'completed':
+            messages.success(request, f'Approved content for "{topic}" already exists. See Recent Generations.')
+        else:
+            messages.success(request, f'Generating content for "{topic}". It will appear under Recent Generations.')
+        return redirect(request.path)
+
+
+class GenerateQuizQuestionsView(GenerateContentView):
+    """Generate quiz questions with AI"""
+    default_kind = 'quiz'
+
+
+class GenerateExplanationsView(GenerateContentView):
+    """Generate explanations with AI"""
+    default_kind = 'explanation'
+
+
+def job_payload(job):
+    """JSON representation of a generation job and, once done, its content"""
+    payload = {
+        'job_id': job.id,
+        'status': job.status,
+        'content_type': job.kind,
+        'topic': job.topic,
+        'difficulty': job.difficulty,
+        'attempts': job.attempts,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == 'failed':
+        payload['error'] = job.last_error
+    if job.content is not None:
+        payload['content'] = {
+            'id': job.content.id,
+            'title': job.content.title,
+            'content': job.content.content,
         }
-        
-        return templates.get(content_type, f"Generated content for {topic} at {difficulty} level.")
+    return payload
 
 
-class GenerateQuizQuestionsView(LoginRequiredMixin, TemplateView):
-    """Generate quiz questions with AI"""
-    template_name = 'ai_tutor/generate_quiz_questions.html'
+async def get_job(user, job_id):
+    return await GenerationJob.objects.select_related('content').filter(user=user, pk=job_id).afirst()
 
 
-class GenerateExplanationsView(LoginRequiredMixin, TemplateView):
-    """Generate explanations with AI"""
-    template_name = 'ai_tutor/generate_explanations.html'
+@method_decorator(csrf_exempt, name='dispatch')
+class CreateGenerationJobView(AsyncTutorView):
+    """Queue a content generation job and return its id immediately (202)"""
+    rate_limit_scope = 'generate'
+    
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+        
+        topic = str(data.get('topic', '')).strip()
+        kind = data.get('content_type', 'explanation')
+        difficulty = data.get('difficulty', 'beginner')
+        if not topic:
+            return JsonResponse({'error': 'Topic cannot be empty'}, status=400)
+        if kind not in GenerationJob.CONTENT_TYPES:
+            return JsonResponse({'error': f'Unknown content type: {kind}'}, status=400)
+        if difficulty not in ('beginner', 'intermediate', 'advanced'):
+            return JsonResponse({'error': f'Unknown difficulty: {difficulty}'}, status=400)
+        
+        job = await sync_to_async(generation.submit)(request.user, kind, topic, difficulty)
+        payload = job_payload(job)
+        payload['status_url'] = reverse('ai_tutor:generation_job', args=[job.id])
+        payload['events_url'] = reverse('ai_tutor:generation_job_events', args=[job.id])
+        # Approved content for the same request is returned straight away
+        return JsonResponse(payload, status=200 if job.status == 'completed' else 202)
+
+
+class GenerationJobView(AsyncTutorView):
+    """Poll a generation job"""
+    async def get(self, request, job_id, *args, **kwargs):
+        job = await get_job(request.user, job_id)
+        if job is None:
+            return JsonResponse({'error': 'Generation job not found'}, status=404)
+        return JsonResponse(job_payload(job))
+
+
+class GenerationJobEventsView(AsyncTutorView):
+    """
+    Follow a generation job as Server-Sent Events.
+    
+    Emits a ``status`` event whenever the job's status or queue position
+    changes, then ``done`` with the job and its content, or ``error`` if it
+    failed for good.
+    """
+    POLL_INTERVAL = 1.0  # seconds
+    TIMEOUT = 600  # seconds before the stream gives up; clients can reconnect
+    
+    async def get(self, request, job_id, *args, **kwargs):
+        job = await get_job(request.user, job_id)
+        if job is None:
+            return JsonResponse({'error': 'Generation job not found'}, status=404)
+        response = StreamingHttpResponse(self.job_events(request.user, job), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    async def job_events(self, user, job):
+        last = None
+        deadline = time.monotonic() + self.TIMEOUT
+        while True:
+            if job.status == 'completed':
+                yield sse_event('done', job_payload(job))
+                return
+            if job.status == 'failed':
+                yield sse_event('error', job_payload(job))
+                return
+            
+            position = None
+            if job.status == 'queued':
+                position = await GenerationJob.objects.filter(status='queued', id__lt=job.id).acount() + 1
+            if (job.status, position) != last:
+                last = (job.status, position)
+                yield sse_event('status', {'job_id': job.id, 'status': job.status, 'queue_position': position})
+            
+            if time.monotonic() > deadline:
+                return
+            await asyncio.sleep(self.POLL_INTERVAL)
+            job = await get_job(user, job.id)
+            if job is None:
+                return
 
 
 class RecommendationsView(LoginRequiredMixin, TemplateView):
@@ -199,24 +624,10 @@ class RecommendationsView(LoginRequiredMixin, TemplateView):
         return context
     
     def get_recommended_courses(self):
-        """Get personalized course recommendations"""
-        # In a real implementation, this would analyze user progress and preferences
-        return [
-            {
-                'title': 'Neural Networks Deep Dive',
-                'description': 'Master the fundamentals of neural networks',
-                'level': 'Intermediate',
-                'duration': '4 hours',
-                'match_percentage': 95
-            },
-            {
-                'title': 'Python for AI Development',
-                'description': 'Learn Python specifically for AI applications',
-                'level': 'Beginner',
-                'duration': '6 hours',
-                'match_percentage': 88
-            }
-        ]
+        """Open course recommendations written by the nightly recommender"""
+        return self.request.user.recommendations.filter(
+            recommendation_type='course', status__in=OPEN_STATUSES, expires_at__gt=timezone.now()
+        ).order_by('priority')[:6]
     
     def get_recommended_topics(self):
         """Get recommended learning topics"""
@@ -231,13 +642,20 @@ class RecommendationsView(LoginRequiredMixin, TemplateView):
 class AcceptRecommendationView(LoginRequiredMixin, TemplateView):
     """Accept recommendation"""
     def post(self, request, *args, **kwargs):
+        recommendation = get_object_or_404(request.user.recommendations, id=kwargs['rec_id'])
+        recommendation.accept_recommendation()
         messages.success(request, 'Recommendation accepted!')
+        slug = recommendation.based_on_data.get('slug')
+        if recommendation.target_object_type == 'course' and slug:
+            return redirect('courses:detail', slug=slug)
         return redirect('ai_tutor:recommendations')
 
 
 class DismissRecommendationView(LoginRequiredMixin, TemplateView):
     """Dismiss recommendation"""
     def post(self, request, *args, **kwargs):
+        recommendation = get_object_or_404(request.user.recommendations, id=kwargs['rec_id'])
+        recommendation.dismiss_recommendation()
         messages.info(request, 'Recommendation dismissed.')
         return redirect('ai_tutor:recommendations')
 
@@ -271,12 +689,33 @@ class PublishContentView(LoginRequiredMixin, TemplateView):
 
 
 class ChatSessionListView(LoginRequiredMixin, ListView):
-    """Chat session list"""
+    """Chat session list, newest activity first, paged with a ``?cursor=`` key"""
     template_name = 'ai_tutor/session_list.html'
     context_object_name = 'sessions'
+    page_size = history.SESSION_PAGE_SIZE
     
     def get_queryset(self):
-        return []
+        sessions = AITutorSession.objects.filter(user=self.request.user)
+        try:
+            sessions = history.sessions_after(sessions, self.request.GET.get('cursor'))
+        except history.CursorError:
+            sessions = history.sessions_after(sessions)
+        
+        # Fetch one extra row to know whether there is an older page
+        return list(sessions[:self.page_size + 1])
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        sessions = context['sessions']
+        has_more = len(sessions) > self.page_size
+        sessions = sessions[:self.page_size]
+        
+        context.update({
+            'sessions': sessions,
+            'next_cursor': history.encode_cursor(sessions[-1]) if has_more else None,
+        })
+        
+        return context
 
 
 class RateSessionView(LoginRequiredMixin, TemplateView):
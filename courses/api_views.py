@@ -112,11 +112,8 @@ def mark_lesson_complete(request, course_id, lesson_id):
     
     lesson = get_object_or_404(Lesson, id=lesson_id, course_id=course_id)
     
-    # Add lesson to completed lessons
-    enrollment.completed_lessons.add(lesson)
-    
-    # Update progress
-    enrollment.update_progress()
+    # Add lesson to completed lessons and update progress
+    enrollment.complete_lesson(lesson)
     
     serializer = CourseProgressSerializer(enrollment)
     return Response({
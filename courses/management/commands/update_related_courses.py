@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from courses import similarity
+
+
+class Command(BaseCommand):
+    help = 'Refresh related-course neighbours for new courses and courses whose text or lessons changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-count every published course and recompute all neighbours'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        recounted = similarity.update(full=options['all'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-counted {len(recounted)} courses and refreshed their related courses '
+            f'in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseTerms',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='text_terms', serialize=False, to='courses.course')),
+                ('counts', models.JSONField(default=dict)),
+                ('is_stale', models.BooleanField(default=False, help_text='A lesson changed since the counts were taken')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Course Terms',
+                'verbose_name_plural': 'Course Terms',
+                'db_table': 'course_terms',
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Cosine similarity (0-1)')),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 for the most similar course')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='courses.course')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Similarity',
+                'verbose_name_plural': 'Course Similarities',
+                'db_table': 'course_similarities',
+                'ordering': ['course', 'rank'],
+                'indexes': [models.Index(fields=['course', 'rank'], name='course_similarity_rank_idx')],
+                'unique_together': {('course', 'neighbour')},
+            },
+        ),
+    ]
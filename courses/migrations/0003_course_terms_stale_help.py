@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_similarity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='courseterms',
+            name='is_stale',
+            field=models.BooleanField(default=False, help_text='The course or one of its lessons changed since the counts were taken'),
+        ),
+    ]
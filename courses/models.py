@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
@@ -110,6 +110,12 @@ class Course(models.Model):
     def is_published(self):
         return self.status == 'published'
     
+    def get_related_courses(self, limit=5):
+        """Published courses most similar to this one (see courses.similarity)"""
+        return Course.objects.filter(
+            neighbour_of__course=self, status='published'
+        ).order_by('neighbour_of__rank')[:limit]
+    
     class Meta:
         db_table = 'courses'
         verbose_name = 'Course'
@@ -212,9 +218,84 @@ class Enrollment(models.Model):
             
             self.save()
     
+    def complete_lesson(self, lesson):
+        """Mark a lesson complete, update progress and publish domain events"""
+        from events.bus import publish, LESSON_COMPLETED, COURSE_COMPLETED
+        
+        with transaction.atomic():
+            # Lock the enrollment so concurrent completions of the last lesson
+            # cannot both see the course as not yet completed
+            locked = Enrollment.objects.select_for_update().values(
+                'status', 'progress_percentage', 'completed_at'
+            ).get(pk=self.pk)
+            self.status = locked['status']
+            self.progress_percentage = locked['progress_percentage']
+            self.completed_at = locked['completed_at']
+            if self.completed_lessons.filter(pk=lesson.pk).exists():
+                return False
+            
+            was_completed = self.status == 'completed'
+            self.completed_lessons.add(lesson)
+            self.update_progress()
+            
+            publish(
+                LESSON_COMPLETED,
+                user_id=self.user_id,
+                course_id=self.course_id,
+                lesson_id=lesson.id,
+                enrollment_id=self.id
+            )
+            if self.status == 'completed' and not was_completed:
+                publish(
+                    COURSE_COMPLETED,
+                    user_id=self.user_id,
+                    course_id=self.course_id,
+                    enrollment_id=self.id
+                )
+        return True
+    
     class Meta:
         db_table = 'course_enrollments'
         verbose_name = 'Enrollment'
         verbose_name_plural = 'Enrollments'
         unique_together = ['user', 'course']
         ordering = ['-enrolled_at']
+
+
+class CourseTerms(models.Model):
+    """Term counts of a course's text, the input to its related-course similarities"""
+    
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='text_terms')
+    counts = models.JSONField(default=dict)
+    is_stale = models.BooleanField(default=False, help_text="The course or one of its lessons changed since the counts were taken")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Terms for {self.course.title}"
+    
+    class Meta:
+        db_table = 'course_terms'
+        verbose_name = 'Course Terms'
+        verbose_name_plural = 'Course Terms'
+
+
+class CourseSimilarity(models.Model):
+    """One of a course's nearest neighbours by content similarity"""
+    
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='neighbours')
+    neighbour = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.FloatField(help_text="Cosine similarity (0-1)")
+    rank = models.PositiveSmallIntegerField(help_text="1 for the most similar course")
+    
+    def __str__(self):
+        return f"{self.course.title} ~ {self.neighbour.title} ({self.score:.2f})"
+    
+    class Meta:
+        db_table = 'course_similarities'
+        verbose_name = 'Course Similarity'
+        verbose_name_plural = 'Course Similarities'
+        ordering = ['course', 'rank']
+        unique_together = ['course', 'neighbour']
+        indexes = [
+            models.Index(fields=['course', 'rank'], name='course_similarity_rank_idx'),
+        ]
@@ -47,12 +47,25 @@ class CourseSerializer(serializers.ModelSerializer):
         return obj.lessons.count()
 
 
+class RelatedCourseSerializer(serializers.ModelSerializer):
+    """Serializer for a course listed as related to another"""
+    level_display = serializers.CharField(source='get_level_display', read_only=True)
+    
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'slug', 'short_description', 'level', 'level_display', 'estimated_duration']
+
+
 class CourseDetailSerializer(CourseSerializer):
     """Serializer for detailed Course view with lessons"""
     lessons = LessonSerializer(many=True, read_only=True)
+    related_courses = serializers.SerializerMethodField()
     
     class Meta(CourseSerializer.Meta):
-        fields = CourseSerializer.Meta.fields + ['lessons']
+        fields = CourseSerializer.Meta.fields + ['lessons', 'related_courses']
+    
+    def get_related_courses(self, obj):
+        return RelatedCourseSerializer(obj.get_related_courses(), many=True).data
 
 
 class EnrollmentSerializer(serializers.ModelSerializer):
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Course, CourseTerms, Lesson
+
+# Course fields counted into its terms (see courses.similarity.course_counts)
+TERM_FIELDS = ('title', 'short_description', 'description', 'category_id', 'level')
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def mark_course_terms_stale(sender, instance, **kwargs):
+    # Picked up by the next ``update_related_courses`` run
+    CourseTerms.objects.filter(course_id=instance.course_id, is_stale=False).update(is_stale=True)
+
+
+@receiver(pre_save, sender=Course)
+def remember_term_changes(sender, instance, update_fields=None, **kwargs):
+    """Note whether this save changes any counted field, for ``mark_terms_stale``"""
+    fields = TERM_FIELDS
+    if update_fields is not None:
+        fields = tuple(field for field in fields if field in update_fields or field.removesuffix('_id') in update_fields)
+    if instance._state.adding or not fields:
+        instance._terms_changed = False
+        return
+    old = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._terms_changed = old is None or any(old[field] != getattr(instance, field) for field in fields)
+
+
+@receiver(post_save, sender=Course)
+def mark_terms_stale(sender, instance, created, **kwargs):
+    # New courses have no CourseTerms row yet and are counted as new
+    if not created and getattr(instance, '_terms_changed', True):
+        CourseTerms.objects.filter(course_id=instance.pk, is_stale=False).update(is_stale=True)
@@ -0,0 +1,208 @@
+"""
+Related courses by TF-IDF cosine similarity.
+
+Each published course is described by the words of its title (counted
+``TITLE_WEIGHT`` times), its descriptions and its lessons, plus one
+pseudo-term for its category and one for its level. The counts are kept per
+course in ``CourseTerms``; saving or deleting a lesson, or changing a
+course's text, category or level, only marks the course's counts stale (see
+``courses.signals``).
+
+``update()`` re-counts stale and new courses and weights every course's
+counts by TF-IDF (sublinear tf, smoothed idf). It keeps each course's
+``MAX_TERMS`` heaviest terms and L2-normalizes them. The vectors are held in
+CSR form, and the similarities of a block of courses to all others take one
+gather, multiply and ``np.add.reduceat``. The ``TOP_K`` neighbours of each
+course are stored as ``CourseSimilarity`` rows, which the course pages read
+with one indexed query.
+
+Only re-counted courses are compared with every course. Another course is
+recomputed only if a re-counted course was, or now belongs, among its
+neighbours. Scores between unchanged courses drift slightly as document
+frequencies change, until the next ``update(full=True)``.
+"""
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Prefetch, Q
+
+from .models import Course, CourseSimilarity, CourseTerms, Lesson
+
+TOP_K = 5
+MAX_TERMS = 200  # heaviest TF-IDF terms kept per course
+TITLE_WEIGHT = 3
+FEATURE_WEIGHT = 3  # count given to the category and level pseudo-terms
+MIN_SCORE = 0.01
+BLOCK = 16  # courses compared with all others per NumPy pass
+
+STOP_WORDS = frozenset(
+    'about after all also an and any are as at be because been before being but by can '
+    'could did do does each for from had has have how if in into is it its just learn '
+    'like lesson more most not of on one or other our out over so some such than that '
+    'the their them then there these they this those through to too under up use used '
+    'using was way we were what when where which while who will with would you your'.split()
+)
+
+_word = re.compile(r'[a-z][a-z0-9+#]+')
+
+
+def tokenize(text):
+    return [word for word in _word.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def course_counts(course):
+    """Term counts for a course and its (prefetched) lessons"""
+    counts = Counter(tokenize(course.title) * TITLE_WEIGHT)
+    counts.update(tokenize(f'{course.short_description} {course.description}'))
+    for lesson in course.lessons.all():
+        counts.update(tokenize(
+            f'{lesson.title} {lesson.content} {lesson.learning_objectives} {lesson.key_concepts}'
+        ))
+    counts[f'category:{course.category_id}'] += FEATURE_WEIGHT
+    counts[f'level:{course.level}'] += FEATURE_WEIGHT
+    return dict(counts)
+
+
+def recount(courses):
+    """Store fresh term counts for the courses; returns their ids"""
+    lessons = Lesson.objects.only('course_id', 'title', 'content', 'learning_objectives', 'key_concepts')
+    courses = courses.only(
+        'id', 'title', 'short_description', 'description', 'category_id', 'level'
+    ).prefetch_related(Prefetch('lessons', queryset=lessons))
+    terms = [CourseTerms(course=course, counts=course_counts(course), is_stale=False) for course in courses]
+    CourseTerms.objects.bulk_create(
+        terms, update_conflicts=True, unique_fields=['course'], update_fields=['counts', 'is_stale', 'updated_at']
+    )
+    return [term.course_id for term in terms]
+
+
+@dataclass
+class Vectors:
+    """L2-normalized TF-IDF vectors of courses, one CSR row per course"""
+    course_ids: list
+    indptr: np.ndarray
+    columns: np.ndarray
+    values: np.ndarray
+    vocab_size: int
+
+    def similarities(self, rows):
+        """``(rows, scores)`` blocks: the cosine similarity of each row with every course"""
+        for start in range(0, len(rows), BLOCK):
+            block = np.asarray(rows[start:start + BLOCK])
+            query = np.zeros((len(block), self.vocab_size), dtype=np.float32)
+            for index, row in enumerate(block):
+                low, high = self.indptr[row], self.indptr[row + 1]
+                query[index, self.columns[low:high]] = self.values[low:high]
+            products = query[:, self.columns] * self.values
+            yield block, np.add.reduceat(products, self.indptr[:-1], axis=1)
+
+
+def vectorize(profiles):
+    """``Vectors`` for ``(course_id, counts)`` pairs"""
+    vocab = {}
+    course_ids, columns, counts, lengths = [], [], [], []
+    for course_id, terms in profiles:
+        course_ids.append(course_id)
+        columns.extend(vocab.setdefault(term, len(vocab)) for term in terms)
+        counts.extend(terms.values())
+        lengths.append(len(terms))
+
+    columns = np.asarray(columns, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    rows = np.repeat(np.arange(len(course_ids)), lengths)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    df = np.bincount(columns, minlength=len(vocab))
+    idf = np.log((1 + len(course_ids)) / (1 + df)) + 1
+    weights = ((1 + np.log(np.asarray(counts, dtype=np.float64))) * idf[columns]).astype(np.float32)
+
+    # Each course's heaviest terms, still grouped by course
+    order = np.lexsort((-weights, rows))
+    keep = order[np.arange(len(order)) - starts[rows[order]] < MAX_TERMS]
+    rows, columns, weights = rows[keep], columns[keep], weights[keep]
+    norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=len(course_ids)))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(course_ids)))))
+    return Vectors(course_ids, indptr, columns, (weights / norms[rows]).astype(np.float32), len(vocab))
+
+
+def top_neighbours(block, scores):
+    """Columns and scores of each row's ``TOP_K`` best other courses, best first"""
+    scores[np.arange(len(block)), block] = 0
+    k = min(TOP_K, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def affected_rows(vectors, changed_rows):
+    """Rows whose neighbours may change because the ``changed_rows`` courses did"""
+    position = {course_id: row for row, course_id in enumerate(vectors.course_ids)}
+    changed_ids = {vectors.course_ids[row] for row in changed_rows}
+    weakest = np.zeros(len(vectors.course_ids), dtype=np.float32)
+    neighbours = defaultdict(list)
+    for course_id, neighbour_id, score in CourseSimilarity.objects.values_list('course_id', 'neighbour_id', 'score'):
+        if course_id in position:
+            neighbours[course_id].append((neighbour_id, score))
+
+    affected = set(changed_rows)
+    for course_id, current in neighbours.items():
+        if any(neighbour_id in changed_ids for neighbour_id, _ in current):
+            affected.add(position[course_id])
+        elif len(current) >= TOP_K:
+            weakest[position[course_id]] = min(score for _, score in current)
+
+    # Similarity is symmetric: column j of a changed row is j's score for that course
+    for _, scores in vectors.similarities(changed_rows):
+        affected.update(np.nonzero(scores.max(axis=0) > np.maximum(weakest, MIN_SCORE))[0].tolist())
+    return sorted(affected)
+
+
+def store_neighbours(vectors, rows):
+    neighbours = []
+    for block, scores in vectors.similarities(rows):
+        top, top_scores = top_neighbours(block, scores)
+        for index, row in enumerate(block):
+            for rank, (column, score) in enumerate(zip(top[index], top_scores[index]), 1):
+                if score < MIN_SCORE:
+                    break
+                neighbours.append(CourseSimilarity(
+                    course_id=vectors.course_ids[row],
+                    neighbour_id=vectors.course_ids[column],
+                    score=round(float(score), 4),
+                    rank=rank,
+                ))
+
+    with transaction.atomic():
+        CourseSimilarity.objects.filter(course_id__in=[vectors.course_ids[row] for row in rows]).delete()
+        CourseSimilarity.objects.bulk_create(neighbours, batch_size=500)
+    return neighbours
+
+
+def update(full=False):
+    """
+    Re-count new and changed courses (every published course when ``full``)
+    and refresh the neighbours that depend on them. Returns the ids of the
+    re-counted courses.
+    """
+    published = Course.objects.filter(status='published')
+    if full:
+        CourseSimilarity.objects.exclude(course__status='published').delete()
+        recounted = recount(published)
+    else:
+        recounted = recount(published.filter(Q(text_terms__isnull=True) | Q(text_terms__is_stale=True)))
+    if not recounted:
+        return []
+
+    vectors = vectorize(
+        CourseTerms.objects.filter(course__status='published').order_by('course_id').values_list('course_id', 'counts')
+    )
+    if full:
+        rows = list(range(len(vectors.course_ids)))
+    else:
+        recounted_ids = set(recounted)
+        rows = affected_rows(vectors, [row for row, course_id in enumerate(vectors.course_ids) if course_id in recounted_ids])
+    store_neighbours(vectors, rows)
+    return recounted
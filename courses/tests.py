@@ -1,3 +1,80 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from events.bus import COURSE_COMPLETED, LESSON_COMPLETED
+from events.models import OutboxEvent
+from .models import Category, Course, CourseTerms, Enrollment, Lesson
+
+
+class CompleteLessonTests(TestCase):
+    """Enrollment.complete_lesson records each lesson, and the course, once"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='pass')
+        mentor = User.objects.create_user(username='mentor', password='pass', role='mentor')
+        category = Category.objects.create(name='Programming')
+        self.course = Course.objects.create(
+            title='Python basics', description='Variables and loops', category=category,
+            level='beginner', estimated_duration=30, instructor=mentor, status='published'
+        )
+        self.lessons = [
+            Lesson.objects.create(course=self.course, title=f'Lesson {order}', content='Text', order=order)
+            for order in range(2)
+        ]
+        self.enrollment = Enrollment.objects.create(user=self.user, course=self.course)
+
+    def events(self, event_type):
+        return OutboxEvent.objects.filter(event_type=event_type).count()
+
+    def test_completing_a_lesson_twice(self):
+        self.assertTrue(self.enrollment.complete_lesson(self.lessons[0]))
+        self.assertFalse(self.enrollment.complete_lesson(self.lessons[0]))
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.progress_percentage, 50)
+        self.assertEqual(self.enrollment.status, 'active')
+        self.assertEqual(self.events(LESSON_COMPLETED), 1)
+
+    def test_course_completes_once(self):
+        # Loaded before the course was completed, like a concurrent request
+        stale = Enrollment.objects.get(pk=self.enrollment.pk)
+
+        for lesson in self.lessons:
+            self.enrollment.complete_lesson(lesson)
+        self.assertFalse(stale.complete_lesson(self.lessons[1]))
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.status, 'completed')
+        self.assertIsNotNone(self.enrollment.completed_at)
+        self.assertEqual(self.events(LESSON_COMPLETED), 2)
+        self.assertEqual(self.events(COURSE_COMPLETED), 1)
+
+
+class CourseTermsStaleTests(TestCase):
+    """Changes to a course's counted text mark its related-course terms stale"""
+
+    def setUp(self):
+        mentor = User.objects.create_user(username='mentor', password='pass', role='mentor')
+        self.course = Course.objects.create(
+            title='Python basics', description='Variables and loops',
+            category=Category.objects.create(name='Programming'),
+            level='beginner', estimated_duration=30, instructor=mentor, status='published'
+        )
+        CourseTerms.objects.create(course=self.course)
+
+    def is_stale(self):
+        return CourseTerms.objects.get(course=self.course).is_stale
+
+    def test_counter_update_keeps_terms(self):
+        self.course.view_count += 1
+        self.course.save()
+        self.assertFalse(self.is_stale())
+
+    def test_text_change_marks_terms_stale(self):
+        self.course.description = 'Functions and classes'
+        self.course.save(update_fields=['description'])
+        self.assertTrue(self.is_stale())
+
+    def test_lesson_save_marks_terms_stale(self):
+        Lesson.objects.create(course=self.course, title='Loops', content='for and while')
+        self.assertTrue(self.is_stale())
@@ -3,6 +3,7 @@ from django.views.generic import TemplateView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.shortcuts import redirect
+from django.db.models import F
 from django.urls import reverse
 from .models import Category, Course, Lesson, Enrollment
 
@@ -49,6 +50,7 @@ class CourseDetailView(TemplateView):
         course = get_object_or_404(Course, slug=slug, status='published')
         context['course'] = course
         context['lessons'] = course.lessons.all()
+        context['related_courses'] = course.get_related_courses()
         
         # Check if user is enrolled
         if self.request.user.is_authenticated:
@@ -78,9 +80,8 @@ class EnrollView(LoginRequiredMixin, TemplateView):
         )
         
         if created:
-            # Increment enrollment count
-            course.enrollment_count += 1
-            course.save()
+            # Increment enrollment count without re-saving the course
+            Course.objects.filter(pk=course.pk).update(enrollment_count=F('enrollment_count') + 1)
             messages.success(request, f'Successfully enrolled in {course.title}!')
         else:
             messages.info(request, f'You are already enrolled in {course.title}.')
@@ -98,10 +99,10 @@ class UnenrollView(LoginRequiredMixin, TemplateView):
             enrollment = Enrollment.objects.get(user=request.user, course=course)
             enrollment.delete()
             
-            # Decrement enrollment count
-            if course.enrollment_count > 0:
-                course.enrollment_count -= 1
-                course.save()
+            # Decrement enrollment count without re-saving the course
+            Course.objects.filter(pk=course.pk, enrollment_count__gt=0).update(
+                enrollment_count=F('enrollment_count') - 1
+            )
                 
             messages.success(request, f'Successfully unenrolled from {course.title}.')
         except Enrollment.DoesNotExist:
@@ -184,8 +185,7 @@ class CompleteLessonView(LoginRequiredMixin, TemplateView):
             return redirect('courses:detail', slug=course_slug)
         
         # Mark lesson as completed
-        enrollment.completed_lessons.add(lesson)
-        enrollment.update_progress()
+        enrollment.complete_lesson(lesson)
         
         messages.success(request, f'Lesson "{lesson.title}" marked as complete!')
         return redirect('courses:lesson', course_slug=course_slug, lesson_slug=lesson_slug)
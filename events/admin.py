@@ -0,0 +1,48 @@
+from django.contrib import admin
+from django.utils.html import format_html
+from .models import OutboxEvent, DailyEventCount
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Admin for Outbox Events"""
+    
+    list_display = (
+        'id', 'event_type', 'status_badge', 'attempts', 'created_at', 'dispatched_at'
+    )
+    list_filter = ('event_type', 'status', 'created_at')
+    search_fields = ('last_error',)
+    readonly_fields = (
+        'event_type', 'payload', 'attempts', 'last_error', 'created_at', 'dispatched_at'
+    )
+    actions = ['retry_events']
+    
+    def status_badge(self, obj):
+        colors = {
+            'pending': 'orange',
+            'dispatched': 'green',
+            'failed': 'red'
+        }
+        color = colors.get(obj.status, 'gray')
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 2px 6px; border-radius: 3px; font-size: 11px;">{}</span>',
+            color, obj.get_status_display()
+        )
+    status_badge.short_description = 'Status'
+    
+    def retry_events(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.filter(status='failed').update(
+            status='pending', attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} events queued for retry.')
+    retry_events.short_description = 'Retry selected failed events'
+
+
+@admin.register(DailyEventCount)
+class DailyEventCountAdmin(admin.ModelAdmin):
+    """Admin for daily event analytics"""
+    
+    list_display = ('day', 'event_type', 'count')
+    list_filter = ('event_type',)
+    date_hierarchy = 'day'
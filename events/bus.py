@@ -0,0 +1,95 @@
+"""
+Domain event bus backed by a transactional outbox.
+
+Producers call ``publish()`` inside the transaction that makes the change,
+so an ``OutboxEvent`` row commits or rolls back together with it. The
+``dispatch_events`` worker later delivers pending events to the consumers
+registered with ``subscribe()``, keeping downstream work (points, streaks,
+badges, recommendations, analytics) out of the request.
+
+Each event is handled by all of its consumers inside one savepoint: if any
+consumer raises, the event's side effects are rolled back and the whole
+event is retried later with exponential backoff.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+QUIZ_COMPLETED = 'QuizCompleted'
+LESSON_COMPLETED = 'LessonCompleted'
+COURSE_COMPLETED = 'CourseCompleted'
+POINTS_AWARDED = 'PointsAwarded'
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 30  # seconds, doubled on every failed attempt
+
+_consumers = defaultdict(list)
+
+
+def subscribe(*event_types):
+    """Register the decorated function as a consumer of the given events"""
+    def decorator(func):
+        for event_type in event_types:
+            _consumers[event_type].append(func)
+        return func
+    return decorator
+
+
+def publish(event_type, **payload):
+    """Write one event to the outbox as part of the current transaction"""
+    return OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def publish_many(events):
+    """Write several ``(event_type, payload)`` pairs with a single INSERT"""
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, payload=payload)
+        for event_type, payload in events
+    ])
+
+
+def dispatch_pending(batch_size=100):
+    """Deliver one batch of due events to their consumers; returns the batch size"""
+    now = timezone.now()
+    with transaction.atomic():
+        # skip_locked lets several workers drain the outbox side by side
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                status='pending', available_at__lte=now
+            ).order_by('id')[:batch_size]
+        )
+        for event in events:
+            _deliver(event)
+        OutboxEvent.objects.bulk_update(
+            events, ['status', 'attempts', 'last_error', 'available_at', 'dispatched_at']
+        )
+    return len(events)
+
+
+def _deliver(event):
+    event.attempts += 1
+    consumer = None
+    try:
+        with transaction.atomic():
+            for consumer in _consumers.get(event.event_type, []):
+                consumer(event)
+    except Exception as exc:
+        logger.exception('Consumer %s failed for %s', getattr(consumer, '__qualname__', consumer), event)
+        event.last_error = f'{getattr(consumer, "__qualname__", consumer)}: {exc}'
+        if event.attempts >= MAX_ATTEMPTS:
+            event.status = 'failed'
+        else:
+            event.available_at = timezone.now() + timedelta(
+                seconds=RETRY_BASE_DELAY * 2 ** (event.attempts - 1)
+            )
+    else:
+        event.status = 'dispatched'
+        event.dispatched_at = timezone.now()
+        event.last_error = ''
@@ -0,0 +1,15 @@
+"""Analytics consumers: daily counts of every domain event"""
+from django.db.models import F
+from django.utils import timezone
+
+from .bus import subscribe, QUIZ_COMPLETED, LESSON_COMPLETED, COURSE_COMPLETED, POINTS_AWARDED
+from .models import DailyEventCount
+
+
+@subscribe(QUIZ_COMPLETED, LESSON_COMPLETED, COURSE_COMPLETED, POINTS_AWARDED)
+def count_event(event):
+    counter, created = DailyEventCount.objects.get_or_create(
+        day=timezone.localdate(event.created_at),
+        event_type=event.event_type
+    )
+    DailyEventCount.objects.filter(pk=counter.pk).update(count=F('count') + 1)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from events.bus import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending outbox events to their consumers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Events claimed per transaction (default: 100)'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for new events instead of exiting once the outbox is drained'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to sleep between polls when idle in --loop mode (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            handled = dispatch_pending(batch_size)
+            total += handled
+            if handled:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Dispatched {total} events'))
@@ -0,0 +1,62 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """Domain events written in the same transaction as the change that caused them"""
+    
+    EVENT_TYPE_CHOICES = [
+        ('QuizCompleted', 'Quiz Completed'),
+        ('LessonCompleted', 'Lesson Completed'),
+        ('CourseCompleted', 'Course Completed'),
+        ('PointsAwarded', 'Points Awarded'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('dispatched', 'Dispatched'),
+        ('failed', 'Failed'),
+    ]
+    
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    
+    # Delivery state
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not dispatched before this time (retry backoff)")
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.event_type} #{self.id} ({self.get_status_display()})"
+    
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id'], name='outbox_pending_idx'),
+        ]
+
+
+class DailyEventCount(models.Model):
+    """Per-day event counters maintained by the analytics consumer"""
+    
+    day = models.DateField()
+    event_type = models.CharField(max_length=30, choices=OutboxEvent.EVENT_TYPE_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.day} - {self.event_type}: {self.count}"
+    
+    class Meta:
+        db_table = 'daily_event_counts'
+        verbose_name = 'Daily Event Count'
+        verbose_name_plural = 'Daily Event Counts'
+        unique_together = ['day', 'event_type']
+        ordering = ['-day', 'event_type']
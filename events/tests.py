@@ -0,0 +1,98 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from . import bus
+from .models import OutboxEvent
+
+TEST_EVENT = 'TestEvent'
+
+
+class DispatchPendingTests(TestCase):
+    """dispatch_pending delivers due events and backs off failed ones"""
+
+    def setUp(self):
+        self.calls = []
+        self.fail = False
+        consumers = mock.patch.dict(bus._consumers, {TEST_EVENT: [self.record, self.maybe_fail]})
+        consumers.start()
+        self.addCleanup(consumers.stop)
+
+    def record(self, event):
+        self.calls.append(event.payload['n'])
+        User.objects.create_user(username=f'user-{event.id}-{len(self.calls)}')
+
+    def maybe_fail(self, event):
+        if self.fail:
+            raise RuntimeError('consumer down')
+
+    def test_delivers_in_order(self):
+        for n in range(3):
+            bus.publish(TEST_EVENT, n=n)
+
+        self.assertEqual(bus.dispatch_pending(), 3)
+
+        self.assertEqual(self.calls, [0, 1, 2])
+        self.assertEqual(set(OutboxEvent.objects.values_list('status', flat=True)), {'dispatched'})
+        self.assertEqual(bus.dispatch_pending(), 0)
+
+    def test_batch_size(self):
+        bus.publish_many([(TEST_EVENT, {'n': n}) for n in range(5)])
+
+        self.assertEqual(bus.dispatch_pending(batch_size=2), 2)
+        self.assertEqual(OutboxEvent.objects.filter(status='pending').count(), 3)
+
+    def test_failure_rolls_back_and_backs_off(self):
+        event = bus.publish(TEST_EVENT, n=0)
+        self.fail = True
+
+        started = timezone.now()
+        with self.assertLogs('events.bus', level='ERROR'):
+            self.assertEqual(bus.dispatch_pending(), 1)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'pending')
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('consumer down', event.last_error)
+        self.assertGreaterEqual(event.available_at, started + timedelta(seconds=bus.RETRY_BASE_DELAY))
+        # The first consumer's work is undone with the failing one
+        self.assertFalse(User.objects.exists())
+        # Not due again until the backoff has passed
+        self.assertEqual(bus.dispatch_pending(), 0)
+
+    def test_backoff_doubles_until_failed(self):
+        event = bus.publish(TEST_EVENT, n=0)
+        self.fail = True
+
+        delays = []
+        for _ in range(bus.MAX_ATTEMPTS):
+            OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+            started = timezone.now()
+            with self.assertLogs('events.bus', level='ERROR'):
+                bus.dispatch_pending()
+            event.refresh_from_db()
+            delays.append(round((event.available_at - started).total_seconds()))
+
+        self.assertEqual(event.status, 'failed')
+        self.assertEqual(event.attempts, bus.MAX_ATTEMPTS)
+        expected = [bus.RETRY_BASE_DELAY * 2 ** attempt for attempt in range(bus.MAX_ATTEMPTS - 1)]
+        self.assertEqual(delays[:-1], expected)
+
+    def test_retry_succeeds(self):
+        event = bus.publish(TEST_EVENT, n=0)
+        self.fail = True
+        with self.assertLogs('events.bus', level='ERROR'):
+            bus.dispatch_pending()
+
+        self.fail = False
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        bus.dispatch_pending()
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'dispatched')
+        self.assertEqual(event.attempts, 2)
+        self.assertEqual(event.last_error, '')
+        self.assertEqual(User.objects.count(), 1)
@@ -0,0 +1,66 @@
+"""
+Bit-level helpers for the per-user activity bitmap on ``LearningStreak``.
+
+Bit ``i`` of the bitmap is set when the user was active on
+``activity_bitmap_start + i days``. The bitmap is stored little-endian in a
+``BinaryField`` and handled here as a Python int, so streak questions are
+answered with shifts and masks instead of queries.
+"""
+
+
+def from_bytes(data):
+    """Decode a stored bitmap"""
+    return int.from_bytes(bytes(data or b''), 'little')
+
+
+def to_bytes(bits):
+    """Encode a bitmap for storage"""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def is_set(bits, index):
+    """Whether the day at ``index`` is active"""
+    return index >= 0 and bool(bits >> index & 1)
+
+
+def count(bits):
+    """Number of active days"""
+    return bits.bit_count()
+
+
+def window(bits, start, length):
+    """The ``length`` bits starting at ``start``, as a list of booleans"""
+    if start < 0:
+        bits <<= -start
+        start = 0
+    chunk = bits >> start
+    return [bool(chunk >> offset & 1) for offset in range(length)]
+
+
+def run_ending_at(bits, index):
+    """Length of the run of active days ending at ``index`` (inclusive)"""
+    if index < 0:
+        return 0
+    gaps = ~bits & ((1 << (index + 1)) - 1)
+    if not gaps:
+        return index + 1
+    return index - (gaps.bit_length() - 1)
+
+
+def longest_run(bits):
+    """
+    Longest run of consecutive active days as ``(length, start_index)``.
+
+    ``x & (x >> 1)`` keeps only bits that start a run at least one day
+    longer, so the number of steps to reach zero is the longest run and the
+    last non-zero value marks where it starts.
+    """
+    length = 0
+    starts = bits
+    while bits:
+        starts = bits
+        bits &= bits >> 1
+        length += 1
+    if not length:
+        return 0, None
+    return length, (starts & -starts).bit_length() - 1
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Sum, Count
-from .models import Badge, UserBadge, PointTransaction, LearningStreak, Leaderboard
+from .models import Badge, UserBadge, PointTransaction, PointBucket, PointSnapshot, LearningStreak, Leaderboard
 
 
 @admin.register(Badge)
@@ -173,6 +173,39 @@ class PointTransactionAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('user')
 
 
+@admin.register(PointBucket)
+class PointBucketAdmin(admin.ModelAdmin):
+    """Admin for daily Point Buckets (maintained by the points ledger)"""
+    
+    list_display = ('user', 'day', 'points', 'updated_at')
+    list_filter = ('day',)
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'day', 'points', 'updated_at')
+    date_hierarchy = 'day'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(PointSnapshot)
+class PointSnapshotAdmin(admin.ModelAdmin):
+    """Admin for monthly Point Snapshots (maintained by the points ledger)"""
+    
+    list_display = ('user', 'month', 'source', 'transaction_type', 'points', 'transaction_count')
+    list_filter = ('month', 'source', 'transaction_type')
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'month', 'source', 'transaction_type', 'points', 'transaction_count', 'updated_at')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
 @admin.register(LearningStreak)
 class LearningStreakAdmin(admin.ModelAdmin):
     """Admin for Learning Streaks"""
@@ -1,27 +1,47 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from django.db.models import Sum, Count, Q
+from django.http import Http404
+from django.utils import timezone
+from datetime import timedelta
 from .models import Badge, UserBadge, PointTransaction, LearningStreak, Leaderboard
+from . import badge_cache
 from .serializers import (
     BadgeSerializer, UserBadgeSerializer, PointTransactionSerializer, 
     LearningStreakSerializer, LeaderboardSerializer
 )
 from accounts.models import User
+from quizzes.models import UserQuizStats
+
+
+class PointHistoryPagination(CursorPagination):
+    """Keyset pagination over the ledger, newest first"""
+    page_size = 50
+    ordering = '-id'
 
 
 class BadgeListView(generics.ListAPIView):
-    """API view for listing badges"""
-    queryset = Badge.objects.filter(is_active=True).order_by('badge_type', 'name')
+    """API view for listing badges, served from the badge catalog cache"""
     serializer_class = BadgeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return badge_cache.active_badges()
 
 
 class BadgeDetailView(generics.RetrieveAPIView):
-    """API view for badge detail"""
-    queryset = Badge.objects.filter(is_active=True)
+    """API view for badge detail, served from the badge catalog cache"""
     serializer_class = BadgeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        badge = badge_cache.get_badge(self.kwargs['pk'])
+        if badge is None:
+            raise Http404
+        self.check_object_permissions(self.request, badge)
+        return badge
 
 
 @api_view(['GET'])
@@ -38,10 +58,10 @@ def my_badges(request):
 def available_badges(request):
     """API endpoint for badges not yet earned by user"""
     # Get IDs of badges user has already earned
-    earned_badge_ids = UserBadge.objects.filter(user=request.user).values_list('badge_id', flat=True)
+    earned_badge_ids = set(UserBadge.objects.filter(user=request.user).values_list('badge_id', flat=True))
     
     # Get available badges
-    available_badges = Badge.objects.filter(is_active=True).exclude(id__in=earned_badge_ids).order_by('badge_type', 'name')
+    available_badges = [badge for badge in badge_cache.active_badges() if badge.id not in earned_badge_ids]
     
     serializer = BadgeSerializer(available_badges, many=True)
     return Response(serializer.data)
@@ -50,10 +70,12 @@ def available_badges(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def points_history(request):
-    """API endpoint for user's points history"""
-    transactions = PointTransaction.objects.filter(user=request.user).order_by('-created_at')
-    serializer = PointTransactionSerializer(transactions, many=True)
-    return Response(serializer.data)
+    """API endpoint for user's points history (cursor paginated)"""
+    transactions = PointTransaction.objects.filter(user=request.user).select_related('user')
+    paginator = PointHistoryPagination()
+    page = paginator.paginate_queryset(transactions, request)
+    serializer = PointTransactionSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['GET'])
@@ -65,6 +87,30 @@ def learning_streak(request):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def streak_calendar(request):
+    """API endpoint for the user's activity heatmap over the last ``days`` days"""
+    try:
+        days = min(max(int(request.query_params.get('days', 365)), 1), 3660)
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    streak, created = LearningStreak.objects.get_or_create(user=request.user)
+    end = timezone.now().date()
+    start = end - timedelta(days=days - 1)
+    calendar = streak.activity_calendar(start, end)
+    
+    return Response({
+        'start': start,
+        'end': end,
+        'active_dates': [day for day, active in calendar.items() if active],
+        'active_days': sum(calendar.values()),
+        'current_streak': streak.current_streak,
+        'longest_streak': streak.longest_streak,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def leaderboard(request):
@@ -92,13 +138,16 @@ def leaderboard(request):
 def user_stats(request):
     """API endpoint for user statistics"""
     user = request.user
+    quiz_stats = UserQuizStats.objects.filter(user=user).first() or UserQuizStats(user=user)
     
     # Get user's stats
     stats = {
         'total_points': user.total_points,
         'current_streak': getattr(user, 'current_streak', 0),
         'earned_badges': UserBadge.objects.filter(user=user).count(),
-        'completed_quizzes': user.quiz_attempts.filter(status='completed').count(),
+        'completed_quizzes': quiz_stats.attempt_count,
+        'quiz_average': round(quiz_stats.average_percentage, 1),
+        'best_quiz_score': quiz_stats.best_percentage,
         'enrolled_courses': user.enrollments.count(),
         'completed_courses': user.enrollments.filter(status='completed').count()
     }
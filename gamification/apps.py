@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GamificationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gamification'
+
+    def ready(self):
+        from . import consumers  # noqa: F401  (registers domain event consumers)
+        from . import signals  # noqa: F401  (keeps the badge cache in sync)
@@ -0,0 +1,140 @@
+"""
+Read-through cache for the active badge catalog and its rarity statistics.
+
+Two layers: a per-process copy that is trusted for ``LOCAL_TTL`` seconds,
+backed by the shared Django cache. The catalog is stored under a version
+number that is bumped whenever a ``Badge`` is saved or deleted, so every
+worker drops its copy on the next check. Earned counts live in one shared
+counter per badge, built with a single aggregate query and then bumped
+incrementally as ``UserBadge`` rows are inserted or deleted (see
+``gamification.signals``).
+"""
+import copy
+import time
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from accounts.models import User
+from .models import Badge, UserBadge
+
+LOCAL_TTL = 5  # seconds
+ACTIVE_USERS_TTL = 300  # seconds
+
+VERSION_KEY = 'badges:version'
+CATALOG_KEY = 'badges:catalog:{version}'
+EARNED_KEY = 'badges:earned:{badge_id}'
+EARNED_READY_KEY = 'badges:earned:ready'
+ACTIVE_USERS_KEY = 'badges:active_users'
+
+_local = {
+    'checked_at': 0.0,
+    'version': None,
+    'badges': None,
+    'counts': None,
+    'active_users': None,
+}
+
+
+def active_badges():
+    """Active badges in catalog order, as per-request copies safe to annotate"""
+    _refresh_local()
+    return [copy.copy(badge) for badge in _local['badges']]
+
+
+def get_badge(badge_id):
+    """A copy of one active badge, or None"""
+    _refresh_local()
+    for badge in _local['badges']:
+        if badge.id == badge_id:
+            return copy.copy(badge)
+    return None
+
+
+def earned_count(badge_id):
+    """How many users have earned a badge"""
+    _refresh_local()
+    return _local['counts'].get(badge_id, 0)
+
+
+def earned_percentage(badge_id):
+    """Share of active users who have earned a badge (rarity among users)"""
+    _refresh_local()
+    active_users = _local['active_users']
+    if not active_users:
+        return 0.0
+    return round(_local['counts'].get(badge_id, 0) / active_users * 100, 1)
+
+
+def active_user_count():
+    _refresh_local()
+    return _local['active_users']
+
+
+def invalidate():
+    """Drop the catalog everywhere (called when a Badge changes)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+    _local['checked_at'] = 0.0
+
+
+def record_earned(badge_id, delta=1):
+    """Adjust a badge's shared earned counter after a UserBadge insert/delete"""
+    try:
+        cache.incr(EARNED_KEY.format(badge_id=badge_id), delta)
+    except ValueError:
+        # Counter was evicted or never built; rebuild all counts on next read
+        cache.delete(EARNED_READY_KEY)
+    _local['checked_at'] = 0.0
+
+
+def _refresh_local():
+    now = time.monotonic()
+    if _local['badges'] is not None and now - _local['checked_at'] < LOCAL_TTL:
+        return
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+
+    if version != _local['version'] or _local['badges'] is None:
+        _local['badges'] = _load_catalog(version)
+        _local['version'] = version
+
+    _local['counts'] = _load_counts([badge.id for badge in _local['badges']])
+    _local['active_users'] = cache.get_or_set(
+        ACTIVE_USERS_KEY,
+        lambda: User.objects.filter(is_active=True).count(),
+        ACTIVE_USERS_TTL
+    )
+    _local['checked_at'] = now
+
+
+def _load_catalog(version):
+    key = CATALOG_KEY.format(version=version)
+    badges = cache.get(key)
+    if badges is None:
+        badges = list(Badge.objects.filter(is_active=True).order_by('badge_type', 'name'))
+        cache.set(key, badges, None)
+    return badges
+
+
+def _load_counts(badge_ids):
+    keys = {EARNED_KEY.format(badge_id=badge_id): badge_id for badge_id in badge_ids}
+    if cache.get(EARNED_READY_KEY):
+        cached = cache.get_many(keys)
+        if len(cached) == len(keys):
+            return {keys[key]: value for key, value in cached.items()}
+
+    counts = dict.fromkeys(badge_ids, 0)
+    counts.update(
+        UserBadge.objects.values_list('badge_id').annotate(total=Count('id')).order_by()
+    )
+    cache.set_many({
+        EARNED_KEY.format(badge_id=badge_id): count for badge_id, count in counts.items()
+    }, None)
+    cache.set(EARNED_READY_KEY, True, None)
+    return {badge_id: counts[badge_id] for badge_id in badge_ids}
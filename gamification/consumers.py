@@ -0,0 +1,52 @@
+"""Gamification consumers for learning-activity domain events"""
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import Course
+from events.bus import subscribe, QUIZ_COMPLETED, LESSON_COMPLETED, COURSE_COMPLETED
+from .models import LearningStreak
+from .services import award_points, check_and_award_badges
+
+
+@subscribe(QUIZ_COMPLETED)
+def award_quiz_points(event):
+    payload = event.payload
+    award_points(
+        User(pk=payload['user_id']),
+        payload['score'],
+        source='quiz_completion',
+        description=f"Completed quiz: {payload['quiz_title']}",
+        context_object_type='quiz',
+        context_object_id=payload['quiz_id']
+    )
+
+
+@subscribe(COURSE_COMPLETED)
+def award_course_points(event):
+    payload = event.payload
+    course = Course.objects.only('title', 'points_reward').get(pk=payload['course_id'])
+    award_points(
+        User(pk=payload['user_id']),
+        course.points_reward,
+        source='course_completion',
+        description=f'Completed course: {course.title}',
+        context_object_type='course',
+        context_object_id=course.id
+    )
+
+
+@subscribe(QUIZ_COMPLETED, LESSON_COMPLETED)
+def record_learning_activity(event):
+    user_id = event.payload['user_id']
+    streak, created = LearningStreak.objects.get_or_create(user_id=user_id)
+    streak.update_streak(timezone.localdate(event.created_at))
+    User.objects.filter(pk=user_id).update(
+        current_streak=streak.current_streak,
+        longest_streak=streak.longest_streak,
+        last_activity_date=streak.last_activity_date
+    )
+
+
+@subscribe(QUIZ_COMPLETED, LESSON_COMPLETED, COURSE_COMPLETED)
+def check_badges(event):
+    check_and_award_badges(User.objects.get(pk=event.payload['user_id']))
@@ -0,0 +1,139 @@
+import gzip
+import json
+import os
+from datetime import datetime, time
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from gamification.models import PointTransaction, PointSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Move old point transactions into compressed cold storage, keeping monthly snapshots exact'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=12,
+            help='Number of recent calendar months to keep in the live ledger (default: 12)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Rows read per query while writing the archive (default: 2000)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would be archived without writing or deleting anything'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.archive_root = settings.POINT_ARCHIVE_ROOT
+        dry_run = options['dry_run']
+
+        first_kept_month = timezone.localdate().replace(day=1) - relativedelta(months=options['keep_months'])
+        cutoff = timezone.make_aware(datetime.combine(first_kept_month, time.min))
+
+        months = (
+            PointTransaction.objects
+            .filter(created_at__lt=cutoff)
+            .annotate(month=TruncMonth('created_at'))
+            .values_list('month', flat=True)
+            .distinct()
+            .order_by('month')
+        )
+
+        total_archived = 0
+        for month_start in months:
+            total_archived += self.archive_month(month_start, dry_run)
+
+        verb = 'Would archive' if dry_run else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total_archived} transactions older than {first_kept_month:%Y-%m}'))
+
+    def archive_month(self, month_start, dry_run):
+        """Archive every ledger row of one calendar month"""
+        month = timezone.localtime(month_start).date()
+        month_end = month_start + relativedelta(months=1)
+        queryset = PointTransaction.objects.filter(created_at__gte=month_start, created_at__lt=month_end)
+
+        last_id = queryset.aggregate(last_id=Max('id'))['last_id']
+        if last_id is None:
+            return 0
+        queryset = queryset.filter(id__lte=last_id)
+
+        if dry_run:
+            count = queryset.count()
+            self.stdout.write(f'{month:%Y-%m}: {count} transactions')
+            return count
+
+        # The file name carries the last archived id, so re-running after a
+        # failed delete overwrites the same archive instead of duplicating it.
+        path = os.path.join(self.archive_root, f'point_transactions-{month:%Y-%m}-{last_id}.jsonl.gz')
+        written = self.write_archive(queryset, path)
+
+        with transaction.atomic():
+            corrected = self.reconcile_snapshots(queryset, month)
+            deleted, _ = queryset.delete()
+
+        self.stdout.write(f'{month:%Y-%m}: archived {written} transactions to {path}')
+        if corrected:
+            self.stdout.write(self.style.WARNING(f'{month:%Y-%m}: corrected {corrected} snapshot rows from the ledger'))
+        return deleted
+
+    def write_archive(self, queryset, path):
+        """Stream the rows to a gzipped JSON Lines file in id order"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        fields = [field.attname for field in PointTransaction._meta.concrete_fields]
+
+        written = 0
+        last_seen = 0
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive:
+            while True:
+                rows = list(queryset.filter(id__gt=last_seen).order_by('id').values(*fields)[:self.batch_size])
+                if not rows:
+                    break
+                for row in rows:
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                written += len(rows)
+                last_seen = rows[-1]['id']
+
+        os.replace(tmp_path, path)
+        return written
+
+    def reconcile_snapshots(self, queryset, month):
+        """Make the month's snapshots match the ledger rows about to be removed"""
+        ledger_totals = {
+            (row['user_id'], row['source'], row['transaction_type']): (row['points'], row['transaction_count'])
+            for row in queryset.values('user_id', 'source', 'transaction_type').annotate(
+                points=Sum('points'), transaction_count=Count('id')
+            ).order_by()
+        }
+        snapshots = {
+            (snapshot.user_id, snapshot.source, snapshot.transaction_type): snapshot
+            for snapshot in PointSnapshot.objects.filter(month=month)
+        }
+
+        corrected = 0
+        for key, (points, count) in ledger_totals.items():
+            snapshot = snapshots.pop(key, None)
+            if snapshot and snapshot.points == points and snapshot.transaction_count == count:
+                continue
+            user_id, source, transaction_type = key
+            PointSnapshot.objects.update_or_create(
+                user_id=user_id, month=month, source=source, transaction_type=transaction_type,
+                defaults={'points': points, 'transaction_count': count}
+            )
+            corrected += 1
+
+        # Snapshots with no ledger rows behind them would inflate the sums
+        if snapshots:
+            PointSnapshot.objects.filter(id__in=[s.id for s in snapshots.values()]).delete()
+            corrected += len(snapshots)
+
+        return corrected
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from gamification.models import LearningStreak
+
+
+class Command(BaseCommand):
+    help = 'Reset lapsed learning streaks and sync user streak columns (run nightly, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        streaks_reset, users_synced = LearningStreak.reset_broken_streaks()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Reset {streaks_reset} broken streaks and synced {users_synced} users')
+        )
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import TruncDate
+from accounts.models import User
+from courses.models import Enrollment
+from gamification import activity
+from gamification.models import LearningStreak, PointBucket
+from quizzes.models import QuizAttempt
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user activity bitmaps from points, quiz attempts and enrollments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Users processed per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--recompute-streaks', action='store_true',
+            help='Also rebuild current/longest streak counters from the bitmaps'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        recompute = options['recompute_streaks']
+
+        update_fields = ['activity_bitmap', 'activity_bitmap_start']
+        if recompute:
+            update_fields += [
+                'current_streak', 'current_streak_start', 'longest_streak',
+                'longest_streak_start', 'longest_streak_end', 'last_activity_date',
+                'total_active_days',
+            ]
+
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        rebuilt = 0
+        for offset in range(0, len(user_ids), batch_size):
+            batch = user_ids[offset:offset + batch_size]
+            activity_days = self.collect_activity_days(batch)
+            if not activity_days:
+                continue
+
+            existing = LearningStreak.objects.filter(user_id__in=activity_days).values_list('user_id', flat=True)
+            LearningStreak.objects.bulk_create([
+                LearningStreak(user_id=user_id)
+                for user_id in activity_days.keys() - set(existing)
+            ])
+
+            streaks = list(LearningStreak.objects.filter(user_id__in=activity_days))
+            for streak in streaks:
+                days = activity_days[streak.user_id]
+                origin = min(days)
+                bits = 0
+                for day in days:
+                    bits |= 1 << (day - origin).days
+                streak.activity_bitmap = activity.to_bytes(bits)
+                streak.activity_bitmap_start = origin
+                if recompute:
+                    streak.recompute_from_bitmap()
+
+            LearningStreak.objects.bulk_update(streaks, update_fields)
+            rebuilt += len(streaks)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt activity bitmaps for {rebuilt} users'))
+
+    def collect_activity_days(self, user_ids):
+        """Map user id to the set of dates with any recorded activity"""
+        activity_days = {}
+        sources = [
+            PointBucket.objects.filter(user_id__in=user_ids).values_list('user_id', 'day'),
+            QuizAttempt.objects.filter(user_id__in=user_ids).annotate(
+                day=TruncDate('started_at')
+            ).values_list('user_id', 'day'),
+            Enrollment.objects.filter(user_id__in=user_ids).annotate(
+                day=TruncDate('enrolled_at')
+            ).values_list('user_id', 'day'),
+        ]
+        for rows in sources:
+            for user_id, day in rows.distinct().order_by():
+                activity_days.setdefault(user_id, set()).add(day)
+        return activity_days
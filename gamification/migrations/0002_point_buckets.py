@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_point_buckets(apps, schema_editor):
+    PointTransaction = apps.get_model('gamification', 'PointTransaction')
+    PointBucket = apps.get_model('gamification', 'PointBucket')
+    totals = (
+        PointTransaction.objects
+        .annotate(day=TruncDate('created_at'))
+        .values('user_id', 'day')
+        .annotate(points=Sum('points'))
+        .order_by()
+    )
+    PointBucket.objects.bulk_create(
+        (PointBucket(user_id=row['user_id'], day=row['day'], points=row['points']) for row in totals),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_buckets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Point Bucket',
+                'verbose_name_plural': 'Point Buckets',
+                'db_table': 'point_buckets',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'user'], name='point_bucket_day_user_idx')],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_point_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_point_snapshots(apps, schema_editor):
+    PointTransaction = apps.get_model('gamification', 'PointTransaction')
+    PointSnapshot = apps.get_model('gamification', 'PointSnapshot')
+    totals = (
+        PointTransaction.objects
+        .annotate(month=TruncMonth('created_at'))
+        .values('user_id', 'month', 'source', 'transaction_type')
+        .annotate(points=Sum('points'), transaction_count=Count('id'))
+        .order_by()
+    )
+    PointSnapshot.objects.bulk_create(
+        (
+            PointSnapshot(
+                user_id=row['user_id'],
+                month=row['month'].date(),
+                source=row['source'],
+                transaction_type=row['transaction_type'],
+                points=row['points'],
+                transaction_count=row['transaction_count'],
+            )
+            for row in totals
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0002_point_buckets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month this snapshot covers')),
+                ('source', models.CharField(choices=[('quiz_completion', 'Quiz Completion'), ('course_completion', 'Course Completion'), ('lesson_completion', 'Lesson Completion'), ('streak_bonus', 'Streak Bonus'), ('badge_earned', 'Badge Earned'), ('daily_login', 'Daily Login'), ('admin_adjustment', 'Admin Adjustment')], max_length=30)),
+                ('transaction_type', models.CharField(choices=[('earned', 'Points Earned'), ('spent', 'Points Spent'), ('bonus', 'Bonus Points'), ('penalty', 'Penalty'), ('adjustment', 'Manual Adjustment')], max_length=20)),
+                ('points', models.IntegerField(default=0)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Point Snapshot',
+                'verbose_name_plural': 'Point Snapshots',
+                'db_table': 'point_snapshots',
+                'ordering': ['-month', 'source'],
+                'unique_together': {('user', 'month', 'source', 'transaction_type')},
+            },
+        ),
+        migrations.RunPython(backfill_point_snapshots, migrations.RunPython.noop),
+    ]
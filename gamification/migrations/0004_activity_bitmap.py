@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0003_point_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningstreak',
+            name='activity_bitmap',
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.AddField(
+            model_name='learningstreak',
+            name='activity_bitmap_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery
 from django.conf import settings
 from django.utils import timezone
 from datetime import datetime, timedelta
+from . import activity
 
 
 class Badge(models.Model):
@@ -145,6 +147,53 @@ class PointTransaction(models.Model):
         ordering = ['-created_at']
 
 
+class PointBucket(models.Model):
+    """Per-user daily point totals, kept in step with the ledger"""
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='point_buckets')
+    day = models.DateField()
+    points = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.points} points on {self.day}"
+    
+    class Meta:
+        db_table = 'point_buckets'
+        verbose_name = 'Point Bucket'
+        verbose_name_plural = 'Point Buckets'
+        unique_together = ['user', 'day']
+        indexes = [
+            models.Index(fields=['day', 'user'], name='point_bucket_day_user_idx'),
+        ]
+        ordering = ['-day']
+
+
+class PointSnapshot(models.Model):
+    """Monthly per-user, per-source point totals that outlive archived ledger rows"""
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='point_snapshots')
+    month = models.DateField(help_text="First day of the month this snapshot covers")
+    source = models.CharField(max_length=30, choices=PointTransaction.SOURCE_CHOICES)
+    transaction_type = models.CharField(max_length=20, choices=PointTransaction.TRANSACTION_TYPE_CHOICES)
+    
+    points = models.IntegerField(default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.points} points from {self.source} ({self.month:%Y-%m})"
+    
+    class Meta:
+        db_table = 'point_snapshots'
+        verbose_name = 'Point Snapshot'
+        verbose_name_plural = 'Point Snapshots'
+        unique_together = ['user', 'month', 'source', 'transaction_type']
+        ordering = ['-month', 'source']
+
+
 class LearningStreak(models.Model):
     """Track learning streaks for users"""
     
@@ -163,6 +212,10 @@ class LearningStreak(models.Model):
     last_activity_date = models.DateField(blank=True, null=True)
     total_active_days = models.PositiveIntegerField(default=0)
     
+    # One bit per day since activity_bitmap_start (see gamification.activity)
+    activity_bitmap = models.BinaryField(default=bytes, blank=True)
+    activity_bitmap_start = models.DateField(blank=True, null=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -171,44 +224,14 @@ class LearningStreak(models.Model):
         return f"{self.user.username} - {self.current_streak} day streak"
     
     def update_streak(self, activity_date=None):
-        """Update streak based on activity"""
+        """Record activity on a day and recount the streaks from the activity bitmap"""
+        today = timezone.now().date()
         if activity_date is None:
-            activity_date = timezone.now().date()
+            activity_date = today
         
-        # If first activity
-        if not self.last_activity_date:
-            self.current_streak = 1
-            self.current_streak_start = activity_date
-            self.last_activity_date = activity_date
-            self.total_active_days = 1
-        else:
-            # Check if activity is consecutive
-            days_diff = (activity_date - self.last_activity_date).days
-            
-            if days_diff == 1:  # Consecutive day
-                self.current_streak += 1
-                self.total_active_days += 1
-            elif days_diff == 0:  # Same day, no change
-                pass
-            else:  # Streak broken
-                # Check if current streak is the longest
-                if self.current_streak > self.longest_streak:
-                    self.longest_streak = self.current_streak
-                    self.longest_streak_start = self.current_streak_start
-                    self.longest_streak_end = self.last_activity_date
-                
-                # Reset current streak
-                self.current_streak = 1
-                self.current_streak_start = activity_date
-                self.total_active_days += 1
-            
-            self.last_activity_date = activity_date
-        
-        # Update longest streak if current is longer
-        if self.current_streak > self.longest_streak:
-            self.longest_streak = self.current_streak
-            self.longest_streak_start = self.current_streak_start
-            self.longest_streak_end = activity_date
+        # Late-delivered earlier days fill their gap instead of being ignored
+        self.mark_active(activity_date)
+        self.recompute_from_bitmap(today=max(today, activity_date))
         
         self.save()
         return self.current_streak
@@ -230,6 +253,109 @@ class LearningStreak(models.Model):
                 return True
         return False
     
+    def mark_active(self, day):
+        """Set the activity bit for a day (does not save)"""
+        bits = activity.from_bytes(self.activity_bitmap)
+        if self.activity_bitmap_start is None:
+            self.activity_bitmap_start = day
+        elif day < self.activity_bitmap_start:
+            # Move the origin back so every index stays non-negative
+            bits <<= (self.activity_bitmap_start - day).days
+            self.activity_bitmap_start = day
+        bits |= 1 << (day - self.activity_bitmap_start).days
+        self.activity_bitmap = activity.to_bytes(bits)
+    
+    def _bitmap_index(self, day):
+        return (day - self.activity_bitmap_start).days
+    
+    def was_active_on(self, day):
+        """Whether the user had any learning activity on a day"""
+        if self.activity_bitmap_start is None:
+            return False
+        return activity.is_set(activity.from_bytes(self.activity_bitmap), self._bitmap_index(day))
+    
+    def activity_calendar(self, start, end):
+        """Map each date from start to end (inclusive) to its activity flag"""
+        length = (end - start).days + 1
+        if self.activity_bitmap_start is None or length <= 0:
+            return {start + timedelta(days=i): False for i in range(max(length, 0))}
+        flags = activity.window(
+            activity.from_bytes(self.activity_bitmap), self._bitmap_index(start), length
+        )
+        return {start + timedelta(days=i): flag for i, flag in enumerate(flags)}
+    
+    def recompute_from_bitmap(self, today=None):
+        """Set the streak counters from the activity bitmap (does not save)"""
+        if self.activity_bitmap_start is None:
+            return
+        if today is None:
+            today = timezone.now().date()
+        
+        bits = activity.from_bytes(self.activity_bitmap)
+        origin = self.activity_bitmap_start
+        
+        self.total_active_days = activity.count(bits)
+        if bits:
+            self.last_activity_date = origin + timedelta(days=bits.bit_length() - 1)
+        
+        # A streak is still current if it reaches yesterday or today
+        current = 0
+        for day in (today, today - timedelta(days=1)):
+            current = activity.run_ending_at(bits, self._bitmap_index(day))
+            if current:
+                end = day
+                break
+        self.current_streak = current
+        self.current_streak_start = end - timedelta(days=current - 1) if current else None
+        
+        length, start_index = activity.longest_run(bits)
+        self.longest_streak = length
+        if length:
+            self.longest_streak_start = origin + timedelta(days=start_index)
+            self.longest_streak_end = self.longest_streak_start + timedelta(days=length - 1)
+        else:
+            self.longest_streak_start = self.longest_streak_end = None
+    
+    @classmethod
+    def reset_broken_streaks(cls, today=None):
+        """
+        Break every lapsed streak at once with set-based UPDATEs.
+        
+        Same rules as check_streak_broken(), applied to all users in one
+        pass, and the denormalized User.current_streak/longest_streak
+        columns are synced afterwards. Returns (streaks_reset, users_synced).
+        """
+        if today is None:
+            today = timezone.now().date()
+        
+        user_model = cls._meta.get_field('user').related_model
+        broken = cls.objects.filter(
+            last_activity_date__lt=today - timedelta(days=1),
+            current_streak__gt=0
+        )
+        
+        with transaction.atomic():
+            # Record the lapsed streak as the best one where it beats it
+            broken.filter(current_streak__gt=F('longest_streak')).update(
+                longest_streak=F('current_streak'),
+                longest_streak_start=F('current_streak_start'),
+                longest_streak_end=F('last_activity_date')
+            )
+            streaks_reset = broken.update(current_streak=0, current_streak_start=None)
+            
+            streak = cls.objects.filter(user=OuterRef('pk'))
+            users_synced = user_model.objects.filter(
+                learning_streak__isnull=False
+            ).exclude(
+                current_streak=F('learning_streak__current_streak'),
+                longest_streak=F('learning_streak__longest_streak')
+            ).update(
+                current_streak=Subquery(streak.values('current_streak')[:1]),
+                longest_streak=Subquery(streak.values('longest_streak')[:1])
+            )
+        
+        return streaks_reset, users_synced
+    
     class Meta:
         db_table = 'learning_streaks'
         verbose_name = 'Learning Streak'
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from .models import Badge, UserBadge, PointTransaction, LearningStreak, Leaderboard
+from . import badge_cache
 from accounts.models import User
 
 
 class BadgeSerializer(serializers.ModelSerializer):
     """Serializer for Badge model"""
     earned_count = serializers.SerializerMethodField()
+    earned_percentage = serializers.SerializerMethodField()
     rarity_display = serializers.CharField(source='get_rarity_display', read_only=True)
     badge_type_display = serializers.CharField(source='get_badge_type_display', read_only=True)
     
@@ -15,11 +17,14 @@ class BadgeSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'icon', 'color', 'badge_type', 'badge_type_display',
             'rarity', 'rarity_display', 'points_value', 'requirement_description',
             'requirement_value', 'is_active', 'is_hidden', 'created_at', 'updated_at',
-            'earned_count'
+            'earned_count', 'earned_percentage'
         ]
     
     def get_earned_count(self, obj):
-        return obj.user_badges.count()
+        return badge_cache.earned_count(obj.id)
+    
+    def get_earned_percentage(self, obj):
+        return badge_cache.earned_percentage(obj.id)
 
 
 class UserBadgeSerializer(serializers.ModelSerializer):
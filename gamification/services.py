@@ -0,0 +1,192 @@
+"""
+Points ledger service.
+
+Every change to a user's points balance goes through this module so the
+``PointTransaction`` ledger and ``User.total_points`` never drift apart.
+Balances are bumped with a single ``UPDATE ... SET total_points =
+total_points + n`` per user instead of a read-modify-write ``user.save()``,
+so concurrent awards cannot lose updates and only the balance column is
+written.
+
+Each write also bumps the user's ``PointBucket`` for the current day, so
+period leaderboards can sum a handful of daily buckets instead of scanning
+the ledger, and the monthly per-source ``PointSnapshot`` rows that
+aggregate views read and that survive ledger archival. A ``PointsAwarded``
+event is written to the outbox for every entry.
+"""
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import User
+from events.bus import publish_many, POINTS_AWARDED
+from quizzes.models import UserQuizStats
+from .models import Badge, UserBadge, PointTransaction, PointBucket, PointSnapshot
+
+
+def award_points(user, points, source, description, transaction_type='earned',
+                 context_object_type='', context_object_id=None):
+    """Append a single ledger entry and update the user's balance"""
+    entry = PointTransaction(
+        user=user,
+        transaction_type=transaction_type,
+        source=source,
+        points=points,
+        description=description,
+        context_object_type=context_object_type,
+        context_object_id=context_object_id,
+    )
+    return award_points_batch([entry])[0]
+
+
+def award_points_batch(entries):
+    """
+    Record many unsaved ``PointTransaction`` entries in one transaction.
+
+    Entries are grouped per user so each balance is bumped by one UPDATE,
+    then every entry gets its running ``balance_after`` and the whole batch
+    is written with a single ``bulk_create``. Users are locked in primary
+    key order so concurrent batches cannot deadlock each other.
+    """
+    entries = [entry for entry in entries if entry.points]
+    if not entries:
+        return []
+
+    deltas = OrderedDict()
+    for entry in sorted(entries, key=lambda e: e.user_id):
+        deltas[entry.user_id] = deltas.get(entry.user_id, 0) + entry.points
+
+    with transaction.atomic():
+        balances = {}
+        for user_id, delta in deltas.items():
+            User.objects.filter(pk=user_id).update(
+                total_points=F('total_points') + delta
+            )
+            # The UPDATE above holds the row lock until commit, so this read
+            # sees exactly our own write.
+            balances[user_id] = User.objects.filter(pk=user_id).values_list(
+                'total_points', flat=True
+            ).get()
+
+        running = {
+            user_id: balances[user_id] - delta for user_id, delta in deltas.items()
+        }
+        for entry in entries:
+            running[entry.user_id] += entry.points
+            entry.balance_after = running[entry.user_id]
+
+        today = timezone.localdate()
+        for user_id, delta in deltas.items():
+            _bump_point_bucket(user_id, today, delta)
+
+        snapshot_deltas = OrderedDict()
+        for entry in entries:
+            key = (entry.user_id, entry.source, entry.transaction_type)
+            points, count = snapshot_deltas.get(key, (0, 0))
+            snapshot_deltas[key] = (points + entry.points, count + 1)
+        month = today.replace(day=1)
+        for (user_id, source, transaction_type), (points, count) in snapshot_deltas.items():
+            _bump_point_snapshot(user_id, month, source, transaction_type, points, count)
+
+        created = PointTransaction.objects.bulk_create(entries)
+
+        publish_many(
+            (POINTS_AWARDED, {
+                'user_id': entry.user_id,
+                'points': entry.points,
+                'source': entry.source,
+                'transaction_type': entry.transaction_type,
+                'balance_after': entry.balance_after,
+                'context_object_type': entry.context_object_type,
+                'context_object_id': entry.context_object_id,
+            })
+            for entry in entries
+        )
+
+    # Keep in-memory user instances (e.g. ``request.user``) in sync
+    for entry in entries:
+        if PointTransaction.user.is_cached(entry):
+            entry.user.total_points = balances[entry.user_id]
+
+    return created
+
+
+def check_and_award_badges(user):
+    """Award every active badge whose requirement the user now meets"""
+    earned_badge_ids = UserBadge.objects.filter(user=user).values_list('badge_id', flat=True)
+    available_badges = Badge.objects.filter(is_active=True).exclude(id__in=earned_badge_ids)
+
+    new_badges = []
+    point_entries = []
+    with transaction.atomic():
+        for badge in available_badges:
+            if not meets_badge_requirement(user, badge):
+                continue
+            UserBadge.objects.create(
+                user=user,
+                badge=badge,
+                points_awarded=badge.points_value
+            )
+            point_entries.append(PointTransaction(
+                user=user,
+                transaction_type='earned',
+                source='badge_earned',
+                points=badge.points_value,
+                description=f'Badge earned: {badge.name}',
+                context_object_type='badge',
+                context_object_id=badge.id
+            ))
+            new_badges.append(badge)
+
+        # Credit all badge points with a single balance update
+        award_points_batch(point_entries)
+
+    return new_badges
+
+
+def meets_badge_requirement(user, badge):
+    """Check if user meets badge requirements (simplified logic)"""
+    if badge.badge_type == 'completion':
+        completed_courses = user.enrollments.filter(status='completed').count()
+        return completed_courses >= badge.requirement_value
+
+    elif badge.badge_type == 'quiz':
+        if 'master' in badge.name.lower():
+            stats = UserQuizStats.objects.filter(user=user).first()
+            high_scores = stats.high_score_count if stats else 0
+            return high_scores >= badge.requirement_value
+
+    elif badge.badge_type == 'streak':
+        current_streak = getattr(user, 'current_streak', 0)
+        return current_streak >= badge.requirement_value
+
+    return False
+
+
+def _bump_point_bucket(user_id, day, delta):
+    """Add ``delta`` to the user's bucket for ``day``, creating it if needed"""
+    # Callers hold the user's row lock, so two writers can never race to
+    # create the same bucket.
+    updated = PointBucket.objects.filter(user_id=user_id, day=day).update(
+        points=F('points') + delta
+    )
+    if not updated:
+        PointBucket.objects.create(user_id=user_id, day=day, points=delta)
+
+
+def _bump_point_snapshot(user_id, month, source, transaction_type, points, count):
+    """Add to the user's monthly snapshot for a source, creating it if needed"""
+    lookup = {
+        'user_id': user_id,
+        'month': month,
+        'source': source,
+        'transaction_type': transaction_type,
+    }
+    updated = PointSnapshot.objects.filter(**lookup).update(
+        points=F('points') + points,
+        transaction_count=F('transaction_count') + count,
+    )
+    if not updated:
+        PointSnapshot.objects.create(points=points, transaction_count=count, **lookup)
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import badge_cache
+from .models import Badge, UserBadge
+
+
+@receiver([post_save, post_delete], sender=Badge)
+def invalidate_badge_catalog(sender, **kwargs):
+    transaction.on_commit(badge_cache.invalidate)
+
+
+@receiver(post_save, sender=UserBadge)
+def count_badge_earned(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: badge_cache.record_earned(instance.badge_id))
+
+
+@receiver(post_delete, sender=UserBadge)
+def uncount_badge_earned(sender, instance, **kwargs):
+    transaction.on_commit(lambda: badge_cache.record_earned(instance.badge_id, -1))
@@ -1,3 +1,118 @@
+from datetime import timedelta
+
+from django.db.models import Sum
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from events.bus import POINTS_AWARDED
+from events.models import OutboxEvent
+from .models import LearningStreak, PointBucket, PointSnapshot, PointTransaction
+from .services import award_points, award_points_batch
+
+
+def entry(user, points, source='quiz_completion', transaction_type='earned'):
+    return PointTransaction(
+        user=user, points=points, source=source, transaction_type=transaction_type,
+        description=f'{points} points'
+    )
+
+
+class AwardPointsBatchTests(TestCase):
+    """Balances, buckets and snapshots stay in step with the ledger"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass')
+        self.bob = User.objects.create_user(username='bob', password='pass')
+
+    def ledger_total(self, user):
+        return PointTransaction.objects.filter(user=user).aggregate(total=Sum('points'))['total'] or 0
+
+    def test_balances_match_ledger(self):
+        award_points(self.alice, 10, 'daily_login', 'Welcome back')
+        award_points_batch([
+            entry(self.alice, 25),
+            entry(self.bob, 40, source='course_completion'),
+            entry(self.alice, 5, source='badge_earned'),
+            entry(self.bob, -15, source='admin_adjustment', transaction_type='penalty'),
+            entry(self.alice, 0),  # skipped
+        ])
+
+        for user, expected in ((self.alice, 40), (self.bob, 25)):
+            user.refresh_from_db()
+            self.assertEqual(user.total_points, expected)
+            self.assertEqual(self.ledger_total(user), expected)
+        self.assertEqual(PointTransaction.objects.count(), 5)
+        self.assertEqual(OutboxEvent.objects.filter(event_type=POINTS_AWARDED).count(), 5)
+
+    def test_balance_after_runs_in_entry_order(self):
+        award_points(self.alice, 10, 'daily_login', 'Welcome back')
+        created = award_points_batch([entry(self.alice, 25), entry(self.alice, 5)])
+
+        self.assertEqual([transaction.balance_after for transaction in created], [35, 40])
+        latest = PointTransaction.objects.filter(user=self.alice).order_by('-id').first()
+        self.assertEqual(latest.balance_after, 40)
+
+    def test_buckets_and_snapshots_match_ledger(self):
+        award_points_batch([entry(self.alice, 25), entry(self.alice, 5), entry(self.bob, 40)])
+        award_points_batch([entry(self.alice, 10, source='badge_earned')])
+
+        today = timezone.localdate()
+        for user in (self.alice, self.bob):
+            bucket = PointBucket.objects.get(user=user, day=today)
+            self.assertEqual(bucket.points, self.ledger_total(user))
+
+        month = today.replace(day=1)
+        snapshots = {
+            (snapshot.source, snapshot.transaction_type): (snapshot.points, snapshot.transaction_count)
+            for snapshot in PointSnapshot.objects.filter(user=self.alice, month=month)
+        }
+        self.assertEqual(snapshots, {
+            ('quiz_completion', 'earned'): (30, 2),
+            ('badge_earned', 'earned'): (10, 1),
+        })
+
+    def test_updates_cached_user(self):
+        award_points(self.alice, 10, 'daily_login', 'Welcome back')
+        self.assertEqual(self.alice.total_points, 10)
+
+
+class LearningStreakTests(TestCase):
+    """Streak counters are read from the activity bitmap"""
+
+    def setUp(self):
+        self.streak = LearningStreak.objects.create(
+            user=User.objects.create_user(username='learner', password='pass')
+        )
+        self.today = timezone.now().date()
+
+    def days_ago(self, *days):
+        for day in days:
+            self.streak.update_streak(self.today - timedelta(days=day))
+
+    def test_counts_current_and_longest_runs(self):
+        self.days_ago(10, 9, 8, 5, 4, 1)
+
+        self.assertEqual(self.streak.current_streak, 1)
+        self.assertEqual(self.streak.longest_streak, 3)
+        self.assertEqual(self.streak.longest_streak_start, self.today - timedelta(days=10))
+        self.assertEqual(self.streak.total_active_days, 6)
+
+    def test_late_day_joins_runs(self):
+        self.days_ago(5, 4, 2, 1)
+        self.assertEqual(self.streak.current_streak, 2)
+
+        self.days_ago(3)
+        self.assertEqual(self.streak.current_streak, 5)
+        self.assertEqual(self.streak.current_streak_start, self.today - timedelta(days=5))
+        self.assertEqual(self.streak.longest_streak, 5)
+
+    def test_same_day_counts_once(self):
+        self.streak.update_streak()
+        self.streak.update_streak()
 
-# Create your tests here.
+        self.streak.refresh_from_db()
+        self.assertEqual(self.streak.current_streak, 1)
+        self.assertEqual(self.streak.total_active_days, 1)
+        self.assertTrue(self.streak.was_active_on(self.today))
+        self.assertFalse(self.streak.was_active_on(self.today - timedelta(days=1)))
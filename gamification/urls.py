@@ -35,5 +35,6 @@ urlpatterns = [
     path('api/points/history/', api_views.points_history, name='api_points_history'),
     path('api/leaderboard/', api_views.leaderboard, name='api_leaderboard'),
     path('api/streak/', api_views.learning_streak, name='api_streak'),
+    path('api/streak/calendar/', api_views.streak_calendar, name='api_streak_calendar'),
     path('api/user/stats/', api_views.user_stats, name='api_user_stats'),
 ]
\ No newline at end of file
@@ -2,12 +2,15 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import TemplateView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.db.models import Q, Sum, Avg, Count, F
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Badge, UserBadge, PointTransaction, LearningStreak, Leaderboard
+from .models import Badge, UserBadge, PointTransaction, PointSnapshot, LearningStreak, Leaderboard
+from .services import award_points, check_and_award_badges
+from . import badge_cache
 from accounts.models import User
+from quizzes.models import UserQuizStats
 
 
 class BadgeListView(ListView):
@@ -17,21 +20,22 @@ class BadgeListView(ListView):
     context_object_name = 'badges'
     
     def get_queryset(self):
-        return Badge.objects.filter(is_active=True).order_by('badge_type', 'name')
+        return badge_cache.active_badges()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         if self.request.user.is_authenticated:
             # Get user's earned badges
-            user_badges = UserBadge.objects.filter(
+            user_badges = set(UserBadge.objects.filter(
                 user=self.request.user
-            ).values_list('badge_id', flat=True)
+            ).values_list('badge_id', flat=True))
             
             # Add earned status to badges
             for badge in context['badges']:
                 badge.is_earned = badge.id in user_badges
-                badge.earned_count = badge.user_badges.count()
+                badge.earned_count = badge_cache.earned_count(badge.id)
+                badge.earned_percentage = badge_cache.earned_percentage(badge.id)
                 
                 # Calculate progress for some badges (simplified logic)
                 if not badge.is_earned:
@@ -54,9 +58,8 @@ class BadgeListView(ListView):
         
         elif badge.badge_type == 'quiz':
             if 'perfect' in badge.name.lower():
-                best_score = user.quiz_attempts.filter(
-                    status='completed'
-                ).aggregate(best=models.Max('percentage'))['best'] or 0
+                stats = UserQuizStats.objects.filter(user=user).first()
+                best_score = stats.best_percentage if stats else 0
                 return min(best_score, 100)
         
         elif badge.badge_type == 'streak':
@@ -75,11 +78,14 @@ class BadgeDetailView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        badge = get_object_or_404(Badge, id=kwargs['badge_id'], is_active=True)
+        badge = badge_cache.get_badge(kwargs['badge_id'])
+        if badge is None:
+            raise Http404('Badge not found')
         
         context['badge'] = badge
-        context['earned_count'] = badge.user_badges.count()
-        context['total_users'] = User.objects.filter(is_active=True).count()
+        context['earned_count'] = badge_cache.earned_count(badge.id)
+        context['earned_percentage'] = badge_cache.earned_percentage(badge.id)
+        context['total_users'] = badge_cache.active_user_count()
         
         if self.request.user.is_authenticated:
             context['is_earned'] = UserBadge.objects.filter(
@@ -130,20 +136,25 @@ class LeaderboardView(TemplateView):
         metric = kwargs.get('metric', 'total_points')
         period = kwargs.get('period', 'all_time')
         
-        # Calculate period dates
+        # Calculate period dates; point buckets are whole local days, the
+        # weekly one being today and the six days before it
         now = timezone.now()
+        today = timezone.localdate()
         if period == 'daily':
             period_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            first_day = today
         elif period == 'weekly':
             period_start = now - timedelta(days=7)
+            first_day = today - timedelta(days=6)
         elif period == 'monthly':
             period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            first_day = today.replace(day=1)
         else:  # all_time
-            period_start = None
+            period_start = first_day = None
         
         # Get leaderboard data based on metric
         if metric == 'total_points':
-            leaderboard = self.get_points_leaderboard(period_start)
+            leaderboard = self.get_points_leaderboard(first_day)
         elif metric == 'courses_completed':
             leaderboard = self.get_courses_leaderboard(period_start)
         elif metric == 'quiz_average':
@@ -162,16 +173,16 @@ class LeaderboardView(TemplateView):
         
         return context
     
-    def get_points_leaderboard(self, period_start=None):
+    def get_points_leaderboard(self, first_day=None):
         """Get leaderboard based on total points"""
         queryset = User.objects.filter(is_active=True)
         
-        if period_start:
-            # Calculate points for specific period
+        if first_day:
+            # Sum the daily point buckets (at most 31 per user) for the period
             queryset = queryset.annotate(
                 period_points=Sum(
-                    'point_transactions__points',
-                    filter=Q(point_transactions__created_at__gte=period_start)
+                    'point_buckets__points',
+                    filter=Q(point_buckets__day__gte=first_day)
                 )
             ).filter(period_points__gt=0).order_by('-period_points')
         else:
@@ -205,11 +216,9 @@ class LeaderboardView(TemplateView):
     
     def get_quiz_leaderboard(self, period_start=None):
         """Get leaderboard based on quiz average scores"""
+        # All-time averages come from the running per-user quiz stats
         queryset = User.objects.filter(is_active=True).annotate(
-            quiz_average=Avg(
-                'quiz_attempts__percentage',
-                filter=Q(quiz_attempts__status='completed')
-            )
+            quiz_average=F('quiz_stats__percentage_sum') / F('quiz_stats__attempt_count')
         )
         
         if period_start:
@@ -223,7 +232,7 @@ class LeaderboardView(TemplateView):
                 )
             ).filter(period_average__isnull=False).order_by('-period_average')
         else:
-            queryset = queryset.filter(quiz_average__isnull=False).order_by('-quiz_average')
+            queryset = queryset.filter(quiz_stats__attempt_count__gt=0).order_by('-quiz_average')
         
         return list(queryset[:50])
     
@@ -256,8 +265,9 @@ class PointsView(LoginRequiredMixin, TemplateView):
             user=self.request.user
         ).order_by('-created_at')[:20]
         
-        # Calculate points by source
-        points_by_source = PointTransaction.objects.filter(
+        # Calculate points by source from the monthly snapshots, which also
+        # cover transactions that have been archived out of the ledger
+        points_by_source = PointSnapshot.objects.filter(
             user=self.request.user,
             transaction_type='earned'
         ).values('source').annotate(
@@ -274,15 +284,35 @@ class PointsView(LoginRequiredMixin, TemplateView):
 
 
 class PointsHistoryView(LoginRequiredMixin, ListView):
-    """Complete points transaction history"""
+    """Complete points transaction history, paged with a ``?before=<id>`` cursor"""
     template_name = 'gamification/points_history.html'
     context_object_name = 'transactions'
-    paginate_by = 50
+    page_size = 50
     
     def get_queryset(self):
-        return PointTransaction.objects.filter(
+        queryset = PointTransaction.objects.filter(
             user=self.request.user
-        ).order_by('-created_at')
+        ).order_by('-id')
+        
+        before = self.request.GET.get('before', '')
+        if before.isdigit():
+            queryset = queryset.filter(id__lt=int(before))
+        
+        # Fetch one extra row to know whether there is an older page
+        return list(queryset[:self.page_size + 1])
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        transactions = context['transactions']
+        has_more = len(transactions) > self.page_size
+        transactions = transactions[:self.page_size]
+        
+        context.update({
+            'transactions': transactions,
+            'next_before': transactions[-1].id if has_more else None,
+        })
+        
+        return context
 
 
 class StreakView(LoginRequiredMixin, TemplateView):
@@ -300,7 +330,10 @@ class StreakView(LoginRequiredMixin, TemplateView):
         # Check if streak needs to be updated
         streak.check_streak_broken()
         
+        # Last 12 weeks of activity for the heatmap
+        today = timezone.now().date()
         context['streak'] = streak
+        context['activity_calendar'] = streak.activity_calendar(today - timedelta(days=83), today)
         return context
 
 
@@ -318,18 +351,14 @@ class UpdateStreakView(LoginRequiredMixin, TemplateView):
         if new_streak > 0 and new_streak % 7 == 0:  # Weekly milestone
             bonus_points = int(new_streak * 10)  # 10 points per day in streak
             
-            PointTransaction.objects.create(
-                user=request.user,
-                transaction_type='bonus',
+            award_points(
+                request.user,
+                bonus_points,
                 source='streak_bonus',
-                points=bonus_points,
                 description=f'Weekly streak bonus: {new_streak} days',
-                balance_after=request.user.total_points + bonus_points
+                transaction_type='bonus'
             )
             
-            request.user.total_points += bonus_points
-            request.user.save()
-            
             messages.success(request, f'Streak milestone reached! +{bonus_points} bonus points!')
         
         return JsonResponse({
@@ -372,7 +401,7 @@ class CheckAchievementsView(LoginRequiredMixin, TemplateView):
     """Check for new achievements and award them"""
     
     def post(self, request, *args, **kwargs):
-        new_badges = self.check_and_award_badges(request.user)
+        new_badges = check_and_award_badges(request.user)
         
         if new_badges:
             messages.success(
@@ -388,64 +417,3 @@ class CheckAchievementsView(LoginRequiredMixin, TemplateView):
                 'status': 'info',
                 'message': 'No new achievements found. Keep learning!'
             })
-    
-    def check_and_award_badges(self, user):
-        """Check if user qualifies for any new badges"""
-        new_badges = []
-        
-        # Get all badges user hasn't earned yet
-        earned_badge_ids = UserBadge.objects.filter(user=user).values_list('badge_id', flat=True)
-        available_badges = Badge.objects.filter(
-            is_active=True
-        ).exclude(id__in=earned_badge_ids)
-        
-        for badge in available_badges:
-            if self.check_badge_requirement(user, badge):
-                # Award the badge
-                UserBadge.objects.create(
-                    user=user,
-                    badge=badge,
-                    points_awarded=badge.points_value
-                )
-                
-                # Add points to user
-                user.total_points += badge.points_value
-                
-                # Create point transaction
-                PointTransaction.objects.create(
-                    user=user,
-                    transaction_type='earned',
-                    source='badge_earned',
-                    points=badge.points_value,
-                    description=f'Badge earned: {badge.name}',
-                    balance_after=user.total_points,
-                    context_object_type='badge',
-                    context_object_id=badge.id
-                )
-                
-                new_badges.append(badge)
-        
-        if new_badges:
-            user.save()
-        
-        return new_badges
-    
-    def check_badge_requirement(self, user, badge):
-        """Check if user meets badge requirements (simplified logic)"""
-        if badge.badge_type == 'completion':
-            completed_courses = user.enrollments.filter(status='completed').count()
-            return completed_courses >= badge.requirement_value
-        
-        elif badge.badge_type == 'quiz':
-            if 'master' in badge.name.lower():
-                high_scores = user.quiz_attempts.filter(
-                    status='completed',
-                    percentage__gte=90
-                ).count()
-                return high_scores >= badge.requirement_value
-        
-        elif badge.badge_type == 'streak':
-            current_streak = getattr(user, 'current_streak', 0)
-            return current_streak >= badge.requirement_value
-        
-        return False
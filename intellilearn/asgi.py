@@ -3,6 +3,13 @@ ASGI config for intellilearn project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+This is the production entry point. The AI tutor message, stream and
+history views are async, so under an ASGI server they wait on the AI
+provider without blocking a thread, and one worker process can hold many
+tutor conversations at once:
+
+    gunicorn intellilearn.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'quizzes',
     'gamification',
     'ai_tutor',
+    'events',
     # REST Framework
     'rest_framework',
     'rest_framework.authtoken',
@@ -107,6 +108,27 @@ DATABASES = {
 # }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Set REDIS_URL in production so every worker shares one cache
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -163,12 +185,59 @@ LOGOUT_REDIRECT_URL = '/'
 # AI Configuration
 AI_API_KEY = config('AI_API_KEY', default='')
 AI_API_URL = config('AI_API_URL', default='https://api.openai.com/v1/')
+AI_MODEL = config('AI_MODEL', default='gpt-4o-mini')
+AI_TIMEOUT = config('AI_TIMEOUT', default=30.0, cast=float)  # seconds per provider call
+
+# Timeouts, retries and hedging per kind of provider call (see ai_tutor.gateway)
+AI_ENDPOINTS = {
+    'tutor': {
+        'timeout': config('AI_TUTOR_TIMEOUT', default=20.0, cast=float),
+        'retries': 2,
+        'hedge_after': config('AI_TUTOR_HEDGE_AFTER', default=0.0, cast=float),  # seconds, 0 to disable
+    },
+    'generate': {
+        'timeout': config('AI_GENERATE_TIMEOUT', default=60.0, cast=float),
+        'retries': 3,
+        'hedge_after': 0.0,
+    },
+}
+AI_CIRCUIT_FAILURES = config('AI_CIRCUIT_FAILURES', default=5, cast=int)  # consecutive failures that open the circuit
+AI_CIRCUIT_COOLDOWN = config('AI_CIRCUIT_COOLDOWN', default=30.0, cast=float)  # seconds before a trial call
+
+# Conversation history sent with each tutor question (see ai_tutor.context)
+AI_CONTEXT_TOKENS = config('AI_CONTEXT_TOKENS', default=2000, cast=int)  # recent messages plus summary
+AI_SUMMARY_TOKENS = config('AI_SUMMARY_TOKENS', default=300, cast=int)  # rolling summary of older turns
+
+# Shared BM25 index of lesson passages used to ground tutor answers (see ai_tutor.retrieval)
+AI_RETRIEVAL_INDEX_DIR = config('AI_RETRIEVAL_INDEX_DIR', default=str(BASE_DIR / 'indexes' / 'lessons'))
+
+# Semantic cache of tutor answers (see ai_tutor.response_cache)
+AI_RESPONSE_CACHE_SIZE = config('AI_RESPONSE_CACHE_SIZE', default=5000, cast=int)  # entries per worker
+AI_RESPONSE_CACHE_TTL = config('AI_RESPONSE_CACHE_TTL', default=86400, cast=int)  # seconds
+AI_RESPONSE_CACHE_THRESHOLD = config('AI_RESPONSE_CACHE_THRESHOLD', default=0.85, cast=float)  # cosine similarity
+
+# Background content generation (see ai_tutor.generation)
+AI_GENERATION_BATCH_SIZE = config('AI_GENERATION_BATCH_SIZE', default=5, cast=int)  # topics per provider call
+AI_GENERATION_CONCURRENCY = config('AI_GENERATION_CONCURRENCY', default=4, cast=int)  # provider calls in flight per worker
+
+# Per-user limits on AI calls (see ai_tutor.limits)
+AI_RATE_LIMITS = {
+    'tutor': {'per_minute': config('AI_TUTOR_RATE_PER_MINUTE', default=10, cast=int), 'burst': 5},
+    'generate': {'per_minute': config('AI_GENERATE_RATE_PER_MINUTE', default=2, cast=int), 'burst': 3},
+}
+AI_DAILY_TOKEN_QUOTA = config('AI_DAILY_TOKEN_QUOTA', default=50000, cast=int)  # per user, 0 for no quota
+
+# Cold storage for archived recommendations (see sweep_recommendations)
+RECOMMENDATION_ARCHIVE_ROOT = config('RECOMMENDATION_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive' / 'recommendations'))
 
 # IntelliLearn specific settings
 DEFAULT_POINTS_PER_QUIZ = 10
 DEFAULT_POINTS_PER_COURSE_COMPLETION = 50
 STREAK_BONUS_MULTIPLIER = 1.5
 
+# Cold storage for archived point transactions (see archive_point_transactions)
+POINT_ARCHIVE_ROOT = config('POINT_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive' / 'point_transactions'))
+
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_SAVE_EVERY_REQUEST = True
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Avg, Count
-from .models import Quiz, Question, Choice, QuizAttempt, Answer
+from .models import Quiz, Question, Choice, QuizAttempt, Answer, UserQuizStats, UserQuizScore, QuizStats
 
 
 class ChoiceInline(admin.TabularInline):
@@ -299,3 +299,75 @@ class AnswerAdmin(admin.ModelAdmin):
             'fields': ('is_correct', 'points_earned', 'ai_evaluated', 'ai_feedback')
         }),
     )
+
+
+@admin.register(UserQuizStats)
+class UserQuizStatsAdmin(admin.ModelAdmin):
+    """Admin for per-user quiz totals (maintained when attempts complete)"""
+    
+    list_display = (
+        'user', 'attempt_count', 'average_display', 'best_percentage',
+        'high_score_count', 'last_attempt_at'
+    )
+    search_fields = ('user__username',)
+    readonly_fields = (
+        'user', 'attempt_count', 'percentage_sum', 'best_percentage', 'last_percentage',
+        'high_score_count', 'last_attempt_at', 'updated_at'
+    )
+    
+    def average_display(self, obj):
+        return f"{obj.average_percentage:.1f}%"
+    average_display.short_description = 'Average'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(UserQuizScore)
+class UserQuizScoreAdmin(admin.ModelAdmin):
+    """Admin for per-user, per-quiz totals (maintained when attempts complete)"""
+    
+    list_display = (
+        'user', 'quiz', 'attempt_count', 'best_percentage', 'last_percentage',
+        'high_score_count', 'last_attempt_at'
+    )
+    list_filter = ('quiz',)
+    search_fields = ('user__username', 'quiz__title')
+    readonly_fields = (
+        'user', 'quiz', 'attempt_count', 'percentage_sum', 'best_percentage', 'last_percentage',
+        'high_score_count', 'last_attempt_at', 'updated_at'
+    )
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'quiz')
+
+
+@admin.register(QuizStats)
+class QuizStatsAdmin(admin.ModelAdmin):
+    """Admin for per-quiz totals (maintained when attempts complete)"""
+    
+    list_display = (
+        'quiz', 'attempt_count', 'average_display', 'best_percentage',
+        'high_score_count', 'last_attempt_at'
+    )
+    search_fields = ('quiz__title',)
+    readonly_fields = (
+        'quiz', 'attempt_count', 'percentage_sum', 'best_percentage', 'last_percentage',
+        'high_score_count', 'last_attempt_at', 'updated_at'
+    )
+    
+    def average_display(self, obj):
+        return f"{obj.average_percentage:.1f}%"
+    average_display.short_description = 'Average'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('quiz')
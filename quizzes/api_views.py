@@ -90,10 +90,8 @@ def complete_quiz_attempt(request, attempt_id):
     """API endpoint for completing a quiz attempt"""
     attempt = get_object_or_404(QuizAttempt, id=attempt_id, user=request.user, status='in_progress')
     
-    # Calculate score
-    attempt.calculate_score()
-    attempt.status = 'completed'
-    attempt.save()
+    # Calculate score and publish QuizCompleted
+    attempt.complete_attempt()
     
     serializer = QuizAttemptSerializer(attempt)
     return Response({
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+HIGH_SCORE_PERCENTAGE = 90.0
+
+
+def backfill_quiz_stats(apps, schema_editor):
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+    UserQuizStats = apps.get_model('quizzes', 'UserQuizStats')
+    UserQuizScore = apps.get_model('quizzes', 'UserQuizScore')
+
+    per_user = {}
+    per_quiz = {}
+    attempts = (
+        QuizAttempt.objects
+        .filter(status='completed')
+        .order_by('completed_at', 'id')
+        .values_list('user_id', 'quiz_id', 'percentage', 'completed_at')
+    )
+    for user_id, quiz_id, percentage, completed_at in attempts.iterator(chunk_size=2000):
+        for totals, key in ((per_user, user_id), (per_quiz, (user_id, quiz_id))):
+            row = totals.setdefault(key, {
+                'attempt_count': 0,
+                'percentage_sum': 0.0,
+                'best_percentage': 0.0,
+                'high_score_count': 0,
+            })
+            row['attempt_count'] += 1
+            row['percentage_sum'] += percentage
+            row['best_percentage'] = max(row['best_percentage'], percentage)
+            row['last_percentage'] = percentage
+            row['high_score_count'] += percentage >= HIGH_SCORE_PERCENTAGE
+            row['last_attempt_at'] = completed_at
+
+    UserQuizStats.objects.bulk_create(
+        (UserQuizStats(user_id=user_id, **row) for user_id, row in per_user.items()),
+        batch_size=1000,
+    )
+    UserQuizScore.objects.bulk_create(
+        (UserQuizScore(user_id=user_id, quiz_id=quiz_id, **row) for (user_id, quiz_id), row in per_quiz.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserQuizScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('percentage_sum', models.FloatField(default=0.0)),
+                ('best_percentage', models.FloatField(default=0.0)),
+                ('last_percentage', models.FloatField(default=0.0)),
+                ('high_score_count', models.PositiveIntegerField(default=0)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_scores', to='quizzes.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Quiz Score',
+                'verbose_name_plural': 'User Quiz Scores',
+                'db_table': 'user_quiz_scores',
+                'unique_together': {('user', 'quiz')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserQuizStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('percentage_sum', models.FloatField(default=0.0)),
+                ('best_percentage', models.FloatField(default=0.0)),
+                ('last_percentage', models.FloatField(default=0.0)),
+                ('high_score_count', models.PositiveIntegerField(default=0)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Quiz Stats',
+                'verbose_name_plural': 'User Quiz Stats',
+                'db_table': 'user_quiz_stats',
+            },
+        ),
+        migrations.RunPython(backfill_quiz_stats, migrations.RunPython.noop),
+    ]
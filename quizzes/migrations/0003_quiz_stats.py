@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+HIGH_SCORE_PERCENTAGE = 90.0
+
+
+def backfill_quiz_stats(apps, schema_editor):
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+    QuizStats = apps.get_model('quizzes', 'QuizStats')
+
+    per_quiz = {}
+    attempts = (
+        QuizAttempt.objects
+        .filter(status='completed')
+        .order_by('completed_at', 'id')
+        .values_list('quiz_id', 'percentage', 'completed_at')
+    )
+    for quiz_id, percentage, completed_at in attempts.iterator(chunk_size=2000):
+        row = per_quiz.setdefault(quiz_id, {
+            'attempt_count': 0,
+            'percentage_sum': 0.0,
+            'best_percentage': 0.0,
+            'high_score_count': 0,
+        })
+        row['attempt_count'] += 1
+        row['percentage_sum'] += percentage
+        row['best_percentage'] = max(row['best_percentage'], percentage)
+        row['last_percentage'] = percentage
+        row['high_score_count'] += percentage >= HIGH_SCORE_PERCENTAGE
+        row['last_attempt_at'] = completed_at
+
+    QuizStats.objects.bulk_create(
+        (QuizStats(quiz_id=quiz_id, **row) for quiz_id, row in per_quiz.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0002_user_quiz_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('percentage_sum', models.FloatField(default=0.0)),
+                ('best_percentage', models.FloatField(default=0.0)),
+                ('last_percentage', models.FloatField(default=0.0)),
+                ('high_score_count', models.PositiveIntegerField(default=0)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quiz', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='quizzes.quiz')),
+            ],
+            options={
+                'verbose_name': 'Quiz Stats',
+                'verbose_name_plural': 'Quiz Stats',
+                'db_table': 'quiz_stats',
+            },
+        ),
+        migrations.RunPython(backfill_quiz_stats, migrations.RunPython.noop),
+    ]
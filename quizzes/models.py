@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.functions import Greatest
 from django.utils import timezone
 import json
 
@@ -204,11 +205,35 @@ class QuizAttempt(models.Model):
         return total_score
     
     def complete_attempt(self):
-        """Mark attempt as completed and calculate final score"""
-        self.status = 'completed'
-        self.completed_at = timezone.now()
-        self.time_taken = self.completed_at - self.started_at
-        self.calculate_score()
+        """Mark attempt as completed, calculate final score, update quiz stats and publish QuizCompleted"""
+        from events.bus import publish, QUIZ_COMPLETED
+        
+        with transaction.atomic():
+            # Lock the attempt so a double submit cannot complete (and count) it twice
+            status = QuizAttempt.objects.select_for_update().values_list(
+                'status', flat=True
+            ).get(pk=self.pk)
+            if status == 'completed':
+                return
+            
+            self.status = 'completed'
+            self.completed_at = timezone.now()
+            self.time_taken = self.completed_at - self.started_at
+            self.calculate_score()
+            
+            UserQuizStats.record(self, user_id=self.user_id)
+            UserQuizScore.record(self, user_id=self.user_id, quiz_id=self.quiz_id)
+            QuizStats.record(self, quiz_id=self.quiz_id)
+            
+            publish(
+                QUIZ_COMPLETED,
+                user_id=self.user_id,
+                quiz_id=self.quiz_id,
+                quiz_title=self.quiz.title,
+                attempt_id=self.id,
+                score=self.score,
+                percentage=self.percentage
+            )
     
     class Meta:
         db_table = 'quiz_attempts'
@@ -261,3 +286,86 @@ class Answer(models.Model):
         verbose_name = 'Answer'
         verbose_name_plural = 'Answers'
         unique_together = ['attempt', 'question']
+
+
+class QuizStatsBase(models.Model):
+    """Running totals over completed attempts, updated in O(1) per attempt"""
+    
+    HIGH_SCORE_PERCENTAGE = 90.0
+    
+    attempt_count = models.PositiveIntegerField(default=0)
+    percentage_sum = models.FloatField(default=0.0)
+    best_percentage = models.FloatField(default=0.0)
+    last_percentage = models.FloatField(default=0.0)
+    high_score_count = models.PositiveIntegerField(default=0)
+    last_attempt_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    @property
+    def average_percentage(self):
+        if not self.attempt_count:
+            return 0.0
+        return self.percentage_sum / self.attempt_count
+    
+    @classmethod
+    def record(cls, attempt, **lookup):
+        """Fold one completed attempt into the row identified by ``lookup``"""
+        cls.objects.get_or_create(**lookup)
+        cls.objects.filter(**lookup).update(
+            attempt_count=models.F('attempt_count') + 1,
+            percentage_sum=models.F('percentage_sum') + attempt.percentage,
+            best_percentage=Greatest('best_percentage', models.Value(attempt.percentage)),
+            last_percentage=attempt.percentage,
+            high_score_count=models.F('high_score_count') + int(
+                attempt.percentage >= cls.HIGH_SCORE_PERCENTAGE
+            ),
+            last_attempt_at=attempt.completed_at,
+            updated_at=timezone.now()
+        )
+    
+    class Meta:
+        abstract = True
+
+
+class UserQuizStats(QuizStatsBase):
+    """Per-user totals across every completed quiz attempt"""
+    
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_stats')
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.attempt_count} attempts"
+    
+    class Meta:
+        db_table = 'user_quiz_stats'
+        verbose_name = 'User Quiz Stats'
+        verbose_name_plural = 'User Quiz Stats'
+
+
+class UserQuizScore(QuizStatsBase):
+    """Per-user totals for a single quiz"""
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_scores')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='user_scores')
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.quiz.title} (best {self.best_percentage:.0f}%)"
+    
+    class Meta:
+        db_table = 'user_quiz_scores'
+        verbose_name = 'User Quiz Score'
+        verbose_name_plural = 'User Quiz Scores'
+        unique_together = ['user', 'quiz']
+
+
+class QuizStats(QuizStatsBase):
+    """Totals for a quiz across every user's completed attempts"""
+    
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, related_name='stats')
+    
+    def __str__(self):
+        return f"{self.quiz.title} - {self.attempt_count} attempts"
+    
+    class Meta:
+        db_table = 'quiz_stats'
+        verbose_name = 'Quiz Stats'
+        verbose_name_plural = 'Quiz Stats'
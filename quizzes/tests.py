@@ -1,3 +1,63 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from events.bus import QUIZ_COMPLETED
+from events.models import OutboxEvent
+from .models import Answer, Choice, Question, Quiz, QuizAttempt, QuizStats, UserQuizScore, UserQuizStats
+
+
+class CompleteAttemptTests(TestCase):
+    """QuizAttempt.complete_attempt scores the attempt and counts it exactly once"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='pass')
+        mentor = User.objects.create_user(username='mentor', password='pass', role='mentor')
+        self.quiz = Quiz.objects.create(title='Python basics', created_by=mentor)
+        self.attempt = QuizAttempt.objects.create(user=self.user, quiz=self.quiz)
+
+        for order, correct in enumerate((True, True, False)):
+            question = Question.objects.create(quiz=self.quiz, text=f'Question {order}', order=order)
+            choice = Choice.objects.create(question=question, text='Answer', is_correct=correct)
+            Answer.objects.create(
+                attempt=self.attempt, question=question, selected_choice=choice, is_correct=correct
+            )
+
+    def test_scores_attempt(self):
+        self.attempt.complete_attempt()
+
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.status, 'completed')
+        self.assertEqual(self.attempt.score, 20)
+        self.assertAlmostEqual(self.attempt.percentage, 200 / 3)
+        self.assertIsNotNone(self.attempt.time_taken)
+
+    def test_second_completion_is_ignored(self):
+        # Loaded while still in progress, like a second request submitting it
+        stale = QuizAttempt.objects.get(pk=self.attempt.pk)
+
+        self.attempt.complete_attempt()
+        self.attempt.complete_attempt()
+        stale.complete_attempt()
+
+        for stats in (
+            UserQuizStats.objects.get(user=self.user),
+            UserQuizScore.objects.get(user=self.user, quiz=self.quiz),
+            QuizStats.objects.get(quiz=self.quiz),
+        ):
+            self.assertEqual(stats.attempt_count, 1)
+            self.assertAlmostEqual(stats.average_percentage, 200 / 3)
+        self.assertEqual(OutboxEvent.objects.filter(event_type=QUIZ_COMPLETED).count(), 1)
+
+    def test_running_stats_match_attempts(self):
+        self.attempt.complete_attempt()
+        second = QuizAttempt.objects.create(user=self.user, quiz=self.quiz, attempt_number=2)
+        for question in self.quiz.questions.all():
+            Answer.objects.create(attempt=second, question=question, is_correct=True)
+        second.complete_attempt()
+
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.attempt_count, 2)
+        self.assertAlmostEqual(stats.average_percentage, (200 / 3 + 100) / 2)
+        self.assertEqual(stats.best_percentage, 100)
+        self.assertEqual(stats.last_percentage, 100)
+        self.assertEqual(stats.high_score_count, 1)
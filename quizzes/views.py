@@ -3,9 +3,9 @@ from django.views.generic import TemplateView, ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.http import JsonResponse, Http404
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Count
 from django.utils import timezone
-from .models import Quiz, Question, Choice, QuizAttempt, Answer
+from .models import Quiz, Question, Choice, QuizAttempt, Answer, UserQuizScore, QuizStats
 from courses.models import Course, Category
 import json
 
@@ -19,7 +19,7 @@ class QuizListView(ListView):
     
     def get_queryset(self):
         queryset = Quiz.objects.filter(is_active=True).select_related(
-            'created_by', 'course'
+            'created_by', 'course', 'stats'
         ).prefetch_related('questions')
         
         # Search functionality
@@ -49,9 +49,9 @@ class QuizListView(ListView):
         for quiz in context['quizzes']:
             quiz.question_count = quiz.questions.count()
             quiz.attempt_count = quiz.attempts.count()
-            quiz.average_score = quiz.attempts.filter(
-                status='completed'
-            ).aggregate(avg_score=Avg('percentage'))['avg_score'] or 0
+            # Running totals kept by QuizAttempt.complete_attempt; no row until the first completion
+            stats = getattr(quiz, 'stats', None)
+            quiz.average_score = stats.average_percentage if stats else 0
             
         # Add categories for the filter section
         categories = Category.objects.filter(is_active=True).order_by('order')
@@ -81,9 +81,8 @@ class QuizDetailView(DetailView):
         # Add quiz statistics
         context['question_count'] = quiz.questions.count()
         context['attempt_count'] = quiz.attempts.count()
-        context['average_score'] = quiz.attempts.filter(
-            status='completed'
-        ).aggregate(avg_score=Avg('percentage'))['avg_score'] or 0
+        stats = QuizStats.objects.filter(quiz=quiz).first()
+        context['average_score'] = stats.average_percentage if stats else 0
         
         # Calculate pass grade (70% of total points)
         total_points = quiz.get_total_points()
@@ -96,10 +95,8 @@ class QuizDetailView(DetailView):
                 user=self.request.user
             ).order_by('-started_at')[:5]
             
-            context['best_score'] = quiz.attempts.filter(
-                user=self.request.user,
-                status='completed'
-            ).aggregate(best=Avg('percentage'))['best'] or 0
+            score = UserQuizScore.objects.filter(user=self.request.user, quiz=quiz).first()
+            context['best_score'] = score.best_percentage if score else 0
         
         return context
 
@@ -335,28 +332,10 @@ class SubmitQuizView(LoginRequiredMixin, TemplateView):
                     # Evaluate answer
                     answer.evaluate_answer()
             
-            # Complete the attempt
+            # Complete the attempt; points, streak and badges are handled by
+            # the QuizCompleted event consumers
             attempt.complete_attempt()
             
-            # Award points to user
-            if attempt.status == 'completed':
-                points_earned = attempt.score
-                request.user.total_points += points_earned
-                request.user.save()
-                
-                # Create point transaction
-                from gamification.models import PointTransaction
-                PointTransaction.objects.create(
-                    user=request.user,
-                    transaction_type='earned',
-                    source='quiz_completion',
-                    points=points_earned,
-                    description=f'Completed quiz: {quiz.title}',
-                    balance_after=request.user.total_points,
-                    context_object_type='quiz',
-                    context_object_id=quiz.id
-                )
-            
             messages.success(request, 'Quiz submitted successfully!')
         except Exception as e:
             messages.error(request, f'Error submitting quiz: {str(e)}')
@@ -442,7 +421,7 @@ class QuizSearchView(ListView):
     
     def get_queryset(self):
         queryset = Quiz.objects.filter(is_active=True).select_related(
-            'created_by', 'course'
+            'created_by', 'course', 'stats'
         ).prefetch_related('questions')
         
         # Search functionality
@@ -472,9 +451,9 @@ class QuizSearchView(ListView):
         for quiz in context['quizzes']:
             quiz.question_count = quiz.questions.count()
             quiz.attempt_count = quiz.attempts.count()
-            quiz.average_score = quiz.attempts.filter(
-                status='completed'
-            ).aggregate(avg_score=Avg('percentage'))['avg_score'] or 0
+            # Running totals kept by QuizAttempt.complete_attempt; no row until the first completion
+            stats = getattr(quiz, 'stats', None)
+            quiz.average_score = stats.average_percentage if stats else 0
             
         # Add categories for the filter section
         categories = Category.objects.filter(is_active=True).order_by('order')